@@ -0,0 +1,45 @@
+"""Benchmarks of prefetching a big synthetic catalog from slow mock commands.
+
+Run with `python -m src.benchmarks.bench_catalog [countries] [latency]`.
+"""
+import asyncio
+import sys
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.mock_commands import AsyncMockNordvpnCommands
+from src.nordvpn.commands.mock_config import MockConfig, synthetic_catalog
+
+from .timing import Timing, measure
+
+
+def mock_nordvpn(countries: int, latency: float) -> AsyncNordvpn:
+    """Logged in facade over `countries` synthetic countries of 10 cities."""
+    cmds = AsyncMockNordvpnCommands(
+        config=MockConfig.uniform(latency, latency / 10),
+        catalog=synthetic_catalog(countries, 10),
+    )
+    cmds.sync.nordvpn_login()
+    return AsyncNordvpn(test=True, cmds=cmds)
+
+
+def run(
+    countries: int = 200, latency: float = 0.01, concurrencies=(1, 8, 32)
+) -> list[Timing]:
+    timings = []
+    for concurrency in concurrencies:
+
+        def prefetch():
+            nordvpn = mock_nordvpn(countries, latency)
+            result = asyncio.run(nordvpn.prefetch_catalog(concurrency))
+            assert result.ok and len(result.index) == countries * 11
+
+        name = f"prefetch_catalog {countries} x{concurrency}"
+        timings.append(measure(name, prefetch, number=1, repeat=3))
+    return timings
+
+
+if __name__ == "__main__":
+    countries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    for timing in run(countries, latency):
+        print(timing)
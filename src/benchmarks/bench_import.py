@@ -0,0 +1,58 @@
+"""Benchmarks of the cold import of the TUI, with `python -X importtime`.
+
+Run with `python -m src.benchmarks.bench_import [module]`.
+"""
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# Like "import time:       323 |       2306 |   src.tui", in microseconds.
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportTime:
+    """Seconds importing a module took, by itself and with its imports."""
+
+    name: str
+    self_time: float
+    cumulative: float
+    depth: int
+
+
+def parse_importtime(stderr: str) -> dict[str, ImportTime]:
+    """The modules in the `-X importtime` report, by name."""
+    times = {}
+    for line in stderr.splitlines():
+        if re_match := IMPORTTIME_RE.match(line):
+            self_us, cumulative_us, indent, name = re_match.groups()
+            times[name] = ImportTime(
+                name, int(self_us) / 1e6, int(cumulative_us) / 1e6, len(indent) // 2
+            )
+    return times
+
+
+def import_times(module: str = "src.tui.app") -> dict[str, ImportTime]:
+    """Import `module` in a fresh interpreter and report every module imported."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def run(module: str = "src.tui.app", repeat: int = 5) -> list[ImportTime]:
+    """The best of `repeat` imports of `module` and its slowest imports."""
+    runs = [import_times(module) for _ in range(repeat)]
+    best = min(runs, key=lambda times: times[module].cumulative)
+    slowest = sorted(best.values(), key=lambda t: t.cumulative, reverse=True)
+    return [t for t in slowest if t.depth <= 1][:15]
+
+
+if __name__ == "__main__":
+    module = sys.argv[1] if len(sys.argv) > 1 else "src.tui.app"
+    for t in run(module):
+        print(f"{t.name:<50} {t.cumulative * 1e3:9.3f} ms")
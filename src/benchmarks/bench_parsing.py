@@ -0,0 +1,90 @@
+"""Benchmarks of the nordvpn output parsers over large synthetic outputs.
+
+Run with `python -m src.benchmarks.bench_parsing [size]`.
+"""
+import sys
+
+from src.nordvpn import parsing
+
+from .timing import Timing, measure
+
+SPINNER = b"\r-\r  \r\r-\r\\\r|\r/\r  \r"
+
+
+def synthetic_list_output(size: int) -> bytes:
+    """Output of `nordvpn countries/cities` with `size` entries."""
+    items = [f"Location_{k}".encode() for k in range(size)]
+    rows = [b"\t\t".join(items[k : k + 6]) for k in range(0, size, 6)]
+    return SPINNER + b"\n".join(rows) + b"\n"
+
+
+def synthetic_status_output(size: int) -> bytes:
+    """Output of `nordvpn status` padded with `size` unknown fields."""
+    lines = [
+        b"Status: Connected",
+        b"Hostname: mc123.nordvpn.com",
+        b"IP: 123.123.123.1",
+        b"Country: Mock_Country_1",
+        b"City: Mock_City_1_1",
+        b"Current technology: NORDLYNX",
+        b"Transfer: 39.91 KiB received, 48.27 KiB sent",
+        b"Uptime: 18 seconds",
+    ]
+    lines += [f"Field_{k}: value {k}".encode() for k in range(size)]
+    return SPINNER + b"\n".join(lines) + b"\n"
+
+
+def synthetic_account_output(size: int) -> bytes:
+    """Output of `nordvpn account` after `size` spinner frames."""
+    return (
+        SPINNER * size
+        + b"Account Information:\n"
+        + b"Email Address: mock@mail.com\n"
+        + b"VPN Service: Active (Expires on Jul 15th, 2025)\n"
+    )
+
+
+def run(size: int = 5000, number: int = 10, repeat: int = 5) -> list[Timing]:
+    list_raw = synthetic_list_output(size)
+    status_raw = synthetic_status_output(size)
+    account_raw = synthetic_account_output(size)
+    list_text = parsing.strip_spinner(list_raw)
+    status_text = parsing.strip_spinner(status_raw)
+    account_text = parsing.strip_spinner(account_raw)
+    return [
+        measure(
+            f"strip_spinner list ({size})",
+            lambda: parsing.strip_spinner(list_raw),
+            number,
+            repeat,
+        ),
+        measure(
+            f"parse_list ({size})",
+            lambda: parsing.parse_list(list_text),
+            number,
+            repeat,
+        ),
+        measure(
+            f"parse_status ({size})",
+            lambda: parsing.parse_status(status_text),
+            number,
+            repeat,
+        ),
+        measure(
+            f"strip_spinner account ({size})",
+            lambda: parsing.strip_spinner(account_raw),
+            number,
+            repeat,
+        ),
+        measure(
+            f"parse_account ({size})",
+            lambda: parsing.parse_account(account_text),
+            number,
+            repeat,
+        ),
+    ]
+
+
+if __name__ == "__main__":
+    for timing in run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000):
+        print(timing)
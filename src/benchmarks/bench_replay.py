@@ -0,0 +1,56 @@
+"""Benchmarks of the facade over a recorded session of the nordvpn cli.
+
+Record one with `NORDVPN_TUI_RECORD=<path>` or `python -m src.nordvpn
+--record <path> ...`, then run with
+`python -m src.benchmarks.bench_replay [path] [timing]`.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.replay import (
+    AsyncReplayNordvpnCommands,
+    Recording,
+    load_fixture,
+)
+
+from .timing import Timing, measure
+
+SESSION = Path(__file__).parents[1] / "nordvpn" / "tests" / "fixtures" / "session.jsonl"
+
+
+async def replay(recordings: list[Recording], timing: float) -> None:
+    """Run every command of the session through a fresh facade, in order."""
+    nordvpn = AsyncNordvpn(
+        test=True, cmds=AsyncReplayNordvpnCommands(recordings, timing)
+    )
+    for recording in recordings:
+        match recording.argv[1:]:
+            case ["account"]:
+                await nordvpn.check_account()
+            case ["status"]:
+                await nordvpn.get_status()
+            case ["countries"]:
+                await nordvpn.get_countries(refresh=True)
+            case ["cities", country]:
+                await nordvpn.get_cities(country, refresh=True)
+            case ["connect", location]:
+                await nordvpn.connect_to_location(location)
+            case ["disconnect"]:
+                await nordvpn.disconnect_from_nordvpn()
+
+
+def run(path: Path | str = SESSION, timing: float = 0.0) -> list[Timing]:
+    recordings = load_fixture(path)
+    name = f"replay {Path(path).name} x{timing:g}"
+    number, repeat = (1, 3) if timing else (20, 5)
+    return [
+        measure(name, lambda: asyncio.run(replay(recordings, timing)), number, repeat)
+    ]
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else SESSION
+    for timing in run(path, float(sys.argv[2]) if len(sys.argv) > 2 else 0.0):
+        print(timing)
@@ -0,0 +1,70 @@
+"""Benchmarks of the location search, typed a keystroke at a time.
+
+Run with `python -m src.benchmarks.bench_search [countries] [cities]`: it
+times every prefix of a city name as typed, and a typo for the slower
+fuzzy path, and exits with 1 if a keystroke goes over KEYSTROKE_BUDGET.
+"""
+import random
+import string
+import sys
+from functools import partial
+
+from src.nordvpn.catalog import LocationIndex
+from src.nordvpn.search import SearchIndex
+
+from .timing import Timing, measure
+
+# Each keystroke has to filter the whole catalog well under a frame.
+KEYSTROKE_BUDGET = 1 / 60 / 4
+
+
+def synthetic_locations(countries: int = 100, cities: int = 50) -> LocationIndex:
+    """Locations of random names of one to three words, all different."""
+    rng = random.Random(0)
+    index = LocationIndex()
+    names = set()
+
+    def name() -> str:
+        while True:
+            words = rng.randint(1, 3)
+            val = "_".join(
+                "".join(
+                    rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))
+                ).title()
+                for _ in range(words)
+            )
+            if val not in names:
+                names.add(val)
+                return val
+
+    country_names = [name() for _ in range(countries)]
+    index.set_countries(country_names)
+    for country in country_names:
+        index.set_cities(country, [name() for _ in range(cities)])
+    return index
+
+
+def run(countries: int = 100, cities: int = 50) -> list[Timing]:
+    locations = synthetic_locations(countries, cities)
+    index = SearchIndex.from_locations(locations)
+    target = locations.cities(locations.countries[countries // 2])[cities // 2]
+    query = target.replace("_", " ").lower()
+    assert index.search(query)[0] == target
+    queries = [query[:k] for k in range(1, len(query) + 1)]
+    queries.append(query[:-1] + "q")
+    return [
+        measure(f"search {text!r}", partial(index.search, text), number=3, repeat=5)
+        for text in queries
+    ]
+
+
+if __name__ == "__main__":
+    countries = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    cities = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    over = False
+    for timing in run(countries, cities):
+        print(timing)
+        over = over or timing.best >= KEYSTROKE_BUDGET
+    if over:
+        print(f"over the budget of {KEYSTROKE_BUDGET * 1e3:.1f} ms per keystroke")
+        sys.exit(1)
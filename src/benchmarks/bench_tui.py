@@ -0,0 +1,326 @@
+"""Benchmarks of the TUI driven headless through scripted scenarios.
+
+Every scenario runs a fresh NordvpnTUI over the mock commands with
+Textual's `run_test` pilot, and counts what its steps cost: the wall
+time, the nordvpn commands run, the `watch_*` methods of the repo's app
+and widgets called and those widgets rendered (their `render` called,
+not answered from the cache). The startup of the app is only counted in the "startup" scenario.
+
+Run with `python -m src.benchmarks.bench_tui [--update] [scenario ...]`:
+it compares every scenario with the stored baselines and exits with 1 if
+one got worse than the THRESHOLDS allow, or stores them with `--update`.
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator
+from unittest import mock
+
+from textual import widgets as tw
+from textual.dom import DOMNode
+from textual.pilot import Pilot
+from textual.screen import Screen
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.mock_commands import AsyncMockNordvpnCommands
+from src.nordvpn.commands.tracing import CommandTracer
+from src.tui.app import NordvpnTUI
+from src.tui.widgets import CountriesList
+
+BASELINES = Path(__file__).parent / "baselines" / "tui.json"
+METRICS = ("wall_time", "cli_calls", "watchers", "renders")
+# How much worse than its baseline a metric may get: a fraction of the
+# baseline plus an absolute slack, so small counts don't fail on noise.
+THRESHOLDS = {
+    "wall_time": (1.0, 0.25),
+    "cli_calls": (0.0, 0),
+    "watchers": (0.25, 2),
+    "renders": (0.25, 5),
+}
+
+
+@dataclass
+class ScenarioResult:
+    """What the steps of a scenario cost."""
+
+    name: str
+    wall_time: float = 0.0
+    cli_calls: int = 0
+    watchers: int = 0
+    renders: int = 0
+    commands: dict[str, int] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<16} {self.wall_time * 1e3:9.1f} ms"
+            f" {self.cli_calls:4d} cli calls {self.watchers:5d} watchers"
+            f" {self.renders:5d} renders"
+        )
+
+
+@dataclass
+class Scenario:
+    """Steps driven through the pilot, from a mock in the given state."""
+
+    name: str
+    steps: Callable[[Pilot], Awaitable[None]]
+    # Run before the counting starts, after the app settled.
+    setup: Callable[[Pilot], Awaitable[None]] | None = None
+    logged_in: bool = False
+    connected_to: str | None = None
+    measure_startup: bool = False
+
+
+def repo_classes() -> list[type[DOMNode]]:
+    """The app and widgets of the tui package. Not the screens, they're
+    imported the first time they're shown."""
+    found, todo = [], [DOMNode]
+    while todo:
+        for cls in todo.pop().__subclasses__():
+            todo.append(cls)
+            if (
+                cls.__module__.startswith("src.tui.")
+                and not issubclass(cls, Screen)
+                and cls not in found
+            ):
+                found.append(cls)
+    return found
+
+
+class Counters:
+    """Counts the repo's watchers called and its widgets rendered."""
+
+    def __init__(self):
+        self.watchers = Counter()
+        self.renders = Counter()
+        self.enabled = False
+
+    def _counted(self, counter: Counter, key: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def counted(*args, **kwargs):
+            if self.enabled:
+                counter[key] += 1
+            return func(*args, **kwargs)
+
+        return counted
+
+    @contextlib.contextmanager
+    def patched(self) -> Iterator["Counters"]:
+        """Wrap the `watch_*` methods and `render` of the repo's classes."""
+        patches = []
+        for cls in repo_classes():
+            for name, func in vars(cls).items():
+                if name.startswith("watch_") and callable(func):
+                    counted = self._counted(self.watchers, func.__qualname__, func)
+                    patches.append(mock.patch.object(cls, name, counted))
+            # Their own render or the inherited one, never a wrapped one.
+            render = getattr(cls, "render")
+            patches.append(
+                mock.patch.object(
+                    cls, "render", self._counted(self.renders, cls.__name__, render)
+                )
+            )
+        with contextlib.ExitStack() as stack:
+            for patch in patches:
+                stack.enter_context(patch)
+            yield self
+
+
+async def settle(pilot: Pilot) -> None:
+    await pilot.app.workers.wait_for_complete()
+    await pilot.pause()
+
+
+async def _startup(pilot: Pilot) -> None:
+    await settle(pilot)
+
+
+async def _login(pilot: Pilot) -> None:
+    await pilot.click("#button-login")
+    await settle(pilot)
+
+
+async def _select_country(pilot: Pilot) -> None:
+    pilot.app.query_one(tw.OptionList).focus()
+    await pilot.press("down", "enter")
+    await settle(pilot)
+
+
+async def _connect(pilot: Pilot) -> None:
+    await _select_country(pilot)
+    await pilot.click("#button-connect")
+    await settle(pilot)
+
+
+async def _disconnect(pilot: Pilot) -> None:
+    await pilot.click("#button-disconnect")
+    await settle(pilot)
+
+
+async def _logout(pilot: Pilot) -> None:
+    await pilot.click("#button-logout")
+    await pilot.pause()
+    await pilot.click("#button-logout-confirm")
+    await settle(pilot)
+
+
+BIG_CATALOG = [f"Country_{k:05}" for k in range(5000)]
+
+
+async def _show_big_catalog(pilot: Pilot) -> None:
+    pilot.app.query_one(CountriesList).set_countries(BIG_CATALOG)
+    await pilot.pause()
+
+
+async def _update_countries(pilot: Pilot) -> None:
+    # A removal and an insertion near the end of thousands of options.
+    names = BIG_CATALOG[:10] + BIG_CATALOG[11:]
+    names.insert(4900, "Country_new")
+    pilot.app.query_one(CountriesList).set_countries(names)
+    await pilot.pause()
+
+
+async def _quit(pilot: Pilot) -> None:
+    await pilot.press("q")
+    await pilot.pause()
+    await pilot.click("#button-quit-confirm")
+
+
+SCENARIOS = [
+    Scenario("startup", _startup, measure_startup=True),
+    Scenario("login", _login),
+    Scenario("select_country", _select_country, logged_in=True),
+    Scenario("connect", _connect, logged_in=True),
+    Scenario("disconnect", _disconnect, logged_in=True, connected_to="Mock_Country_1"),
+    Scenario("logout", _logout, logged_in=True),
+    Scenario("quit", _quit, logged_in=True),
+    Scenario("update_countries", _update_countries, _show_big_catalog, logged_in=True),
+]
+
+
+def make_app(scenario: Scenario, tracer: CommandTracer) -> NordvpnTUI:
+    cmds = AsyncMockNordvpnCommands()
+    cmds.tracer = tracer
+    if scenario.logged_in:
+        cmds.sync.nordvpn_login()
+    if scenario.connected_to is not None:
+        cmds.sync.nordvpn_connect(scenario.connected_to)
+    nordvpn = AsyncNordvpn(test=True, cmds=cmds)
+    # No background polls, only what the steps do is counted.
+    nordvpn.status_monitor.fast_interval = 60.0
+    nordvpn.status_monitor.interval = 60.0
+    return NordvpnTUI(nordvpn=nordvpn)
+
+
+async def run_scenario(scenario: Scenario) -> ScenarioResult:
+    tracer = CommandTracer()
+    app = make_app(scenario, tracer)
+    with Counters().patched() as counters:
+        start = time.perf_counter()
+        counters.enabled = scenario.measure_startup
+        async with app.run_test() as pilot:
+            if not scenario.measure_startup:
+                await settle(pilot)
+                if scenario.setup is not None:
+                    await scenario.setup(pilot)
+                tracer.reset()
+                counters.enabled = True
+                start = time.perf_counter()
+            await scenario.steps(pilot)
+            wall_time = time.perf_counter() - start
+            counters.enabled = False
+    return ScenarioResult(
+        scenario.name,
+        wall_time,
+        tracer.total_count,
+        sum(counters.watchers.values()),
+        sum(counters.renders.values()),
+        {name: stats.count for name, stats in tracer.stats.items()},
+    )
+
+
+def run(names: list[str] | None = None, repeat: int = 3) -> list[ScenarioResult]:
+    """The best of `repeat` runs of each scenario (or of those in `names`),
+    every metric on its own."""
+    results = []
+    for scenario in SCENARIOS:
+        if names and scenario.name not in names:
+            continue
+        runs = [asyncio.run(run_scenario(scenario)) for _ in range(repeat)]
+        best = min(runs, key=lambda result: result.wall_time)
+        for metric in METRICS:
+            setattr(best, metric, min(getattr(result, metric) for result in runs))
+        results.append(best)
+    return results
+
+
+def load_baselines(path: Path | str = BASELINES) -> dict[str, dict]:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baselines(results: list[ScenarioResult], path: Path | str = BASELINES) -> None:
+    """Store the results, keeping the baselines of the other scenarios."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baselines = load_baselines(path) if path.exists() else {}
+    for result in results:
+        baselines[result.name] = {m: round(getattr(result, m), 4) for m in METRICS}
+    path.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+
+
+def regressions(
+    results: list[ScenarioResult],
+    baselines: dict[str, dict],
+    metrics: tuple[str, ...] = METRICS,
+) -> list[str]:
+    """The metrics worse than their baseline allows, described."""
+    found = []
+    for result in results:
+        baseline = baselines.get(result.name)
+        if baseline is None:
+            continue
+        for metric in metrics:
+            fraction, slack = THRESHOLDS[metric]
+            limit = baseline[metric] * (1 + fraction) + slack
+            if (value := getattr(result, metric)) > limit:
+                found.append(
+                    f"{result.name}: {metric} {value:g} over {limit:g}"
+                    f" (baseline {baseline[metric]:g})"
+                )
+    return found
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.benchmarks.bench_tui")
+    parser.add_argument("scenarios", nargs="*", help="only these scenarios")
+    parser.add_argument(
+        "--update", action="store_true", help="store the results as baselines"
+    )
+    parser.add_argument("--baselines", default=BASELINES, help="baselines file")
+    parser.add_argument("--json", action="store_true", help="print json results")
+    args = parser.parse_args(argv)
+    results = run(args.scenarios)
+    if args.json:
+        print(json.dumps([asdict(result) for result in results], indent=2))
+    else:
+        for result in results:
+            print(result)
+    if args.update:
+        save_baselines(results, args.baselines)
+        return 0
+    found = regressions(results, load_baselines(args.baselines))
+    for regression in found:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
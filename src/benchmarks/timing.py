@@ -0,0 +1,30 @@
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass
+class Timing:
+    """Seconds per call of a benchmarked function."""
+
+    name: str
+    best: float
+    median: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<40} best {self.best * 1e3:9.3f} ms"
+            f"   median {self.median * 1e3:9.3f} ms"
+        )
+
+
+def measure(name: str, func: Callable[[], object], number=10, repeat=5) -> Timing:
+    """Time `func`, `number` calls per round, and keep the best and median round."""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return Timing(name, min(rounds), statistics.median(rounds))
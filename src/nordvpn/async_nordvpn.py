@@ -0,0 +1,408 @@
+import asyncio
+import contextlib
+import sqlite3
+import subprocess
+import time
+from typing import Awaitable, Callable
+
+from . import history, log, parsing
+from .catalog import PrefetchResult
+from .catalog_cache import CatalogCache
+from .commands.async_commands import AsyncNordvpnCommands
+from .commands.circuit_breaker import AsyncBreakerNordvpnCommands, CircuitBreaker
+from .commands.coalescing import CoalescingNordvpnCommands
+from .exceptions import CommandTimeoutError, DaemonUnavailableError, NotLoggedInError
+from .history import ConnectionHistory
+from .nordvpn import NordvpnBase
+from .parsing import (
+    CONNECTING,
+    DISCONNECTING,
+    FAILED,
+    Account,
+    Progress,
+    Status,
+)
+from .status_monitor import CONNECTION_KEYS, StatusMonitor
+from .telemetry import TelemetrySampler
+
+logger = log.get_logger(__name__)
+
+ProgressCallback = Callable[[Progress], None]
+
+
+class AsyncNordvpn(NordvpnBase):
+    """Awaitable twin of the `Nordvpn` class.
+
+    It has the same methods with the same results and exceptions, but
+    they are coroutines that run the commands with `AsyncNordvpnCommands`
+    so they don't block the event loop.
+    """
+
+    def __init__(
+        self,
+        test=False,
+        login_ttl: float = 30.0,
+        catalog_cache: CatalogCache | None = None,
+        cmds=None,
+        history: ConnectionHistory | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
+        super().__init__(test, login_ttl, catalog_cache, history, breaker)
+        if cmds is None and test:
+            # Only imported in test mode, it pulls in unittest.mock.
+            from .commands.mock_commands import AsyncMockNordvpnCommands
+
+            cmds = AsyncMockNordvpnCommands()
+        elif cmds is None:
+            cmds = AsyncNordvpnCommands()
+        if self.breaker is not None:
+            cmds = AsyncBreakerNordvpnCommands(cmds, self.breaker)
+        # Concurrent identical reads share one process, and count once
+        # for the breaker.
+        self.cmds = CoalescingNordvpnCommands(cmds)
+        self._revalidating: dict[str, asyncio.Task] = {}
+        self.status_monitor = StatusMonitor(self)
+        self.telemetry = TelemetrySampler()
+        # Sampled on every status, the rates need the unchanged ones too.
+        self.status_monitor.observers.append(self.telemetry.add)
+        self.status_monitor.listeners.append(self._record_status)
+        # Seconds connect and disconnect may take, those of the commands
+        # (TIMEOUTS) when None.
+        self.connect_timeout: float | None = None
+
+    def _record_status(self, status: Status | None, changed: set[str]) -> None:
+        """Append the connection changes seen by the monitor to the history."""
+        if self.history is None or status is None:
+            return
+        if not changed.intersection(CONNECTION_KEYS):
+            return
+        try:
+            self.history.observe_status(status)
+        except sqlite3.Error as exc:
+            logger.warning("Couldn't record the status: %s", exc)
+
+    def _revalidate(self, key: str, fetch: Callable[[], Awaitable]) -> None:
+        """Run `fetch` in the background, unless it's already running.
+
+        The stale entries of the catalog cache are returned at once and
+        refreshed this way.
+        """
+        if key in self._revalidating:
+            return
+
+        def _done(task: asyncio.Task) -> None:
+            del self._revalidating[key]
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning("Couldn't refresh %s: %s", key, task.exception())
+
+        task = asyncio.create_task(fetch())
+        self._revalidating[key] = task
+        task.add_done_callback(_done)
+
+    async def get_logged_in(self) -> bool:
+        cached = self._cached_logged_in()
+        if cached is not None:
+            return cached
+        try:
+            await self.check_account()
+        except (DaemonUnavailableError, CommandTimeoutError):
+            raise
+        except Exception as exc:
+            logger.info("Not logged in: %s", exc)
+            return False
+        else:
+            return True
+
+    async def get_connected(self) -> bool:
+        try:
+            status = await self.get_status()
+            return self.is_connected(status)
+        except NotLoggedInError:
+            return False
+
+    async def check_account(self) -> Account:
+        """Run nordvpn account.
+
+        Like in `Nordvpn.check_account`, do not require being logged in
+        here or there will be an infinite recursion.
+        """
+        completed = await self.cmds.nordvpn_account()
+        return self._parse_account(completed)
+
+    async def login_required(self, func_name: str) -> None:
+        """Check for logged in status."""
+        if not await self.get_logged_in():
+            raise self._login_required_error(func_name)
+
+    async def logout_required(self, func_name: str) -> None:
+        """Check for logged out status."""
+        if await self.get_logged_in():
+            raise self._logout_required_error(func_name)
+
+    async def run_logout(self) -> str:
+        await self.login_required("run_logout")
+        completed = await self.cmds.nordvpn_logout()
+        self.status_monitor.kick()
+        return self._parse_logout(completed)
+
+    async def run_login(self) -> str:
+        await self.logout_required("run_login")
+        completed = await self.cmds.nordvpn_login()
+        self.status_monitor.kick()
+        return self._parse_login(completed)
+
+    async def get_status(self) -> Status:
+        try:
+            await self.login_required("get_status")
+            completed = await self.cmds.nordvpn_status()
+            status = self._parse_status(completed)
+        except NotLoggedInError:
+            self.status_monitor.observe(None)
+            raise
+        self.status_monitor.observe(status)
+        return status
+
+    async def get_countries(self, refresh: bool = False) -> list[str]:
+        """Get the countries, from the catalog cache unless `refresh`."""
+        cache = self.catalog_cache
+        if not refresh and cache is not None:
+            countries = cache.get_countries()
+            if countries is not None:
+                if cache.countries_stale():
+                    self._revalidate("countries", self._fetch_countries)
+                return countries
+        return await self._fetch_countries()
+
+    async def _fetch_countries(self) -> list[str]:
+        await self.login_required("get_countries")
+        completed = await self.cmds.nordvpn_countries()
+        countries = self._parse_list(completed)
+        self._store_countries(countries)
+        return countries
+
+    async def get_cities(self, country: str, refresh: bool = False) -> list[str]:
+        """Get the cities of a country, from the catalog cache unless `refresh`."""
+        cache = self.catalog_cache
+        if not refresh and cache is not None:
+            cities = cache.get_cities(country)
+            if cities is not None:
+                if cache.cities_stale(country):
+                    self._revalidate(
+                        f"cities {country}", lambda: self._fetch_cities(country)
+                    )
+                return cities
+        return await self._fetch_cities(country)
+
+    async def _fetch_cities(self, country: str) -> list[str]:
+        await self.login_required("get_cities")
+        completed = await self.cmds.nordvpn_cities(country)
+        cities = self._parse_cities(country, completed)
+        self._store_cities(country, cities)
+        return cities
+
+    async def connect_to_location(
+        self,
+        location: str,
+        progress: ProgressCallback | None = None,
+        timeout: float | None = None,
+    ) -> str:
+        """Connect, calling `progress` with every step the cli prints.
+
+        Raises CommandTimeoutError (after terminating the cli) if it takes
+        longer than `timeout` seconds, `connect_timeout` by default (the
+        timeout of the command itself if that's None too).
+        """
+        await self.login_required("connect_to_location")
+        message = f"Connecting to {location}"
+        first = Progress(stage=CONNECTING, message=message, server=None, hostname=None)
+        try:
+            completed = await self._stream(
+                self.cmds.nordvpn_connect_stream,
+                (location,),
+                first,
+                progress,
+                timeout,
+                history.CONNECT,
+                location,
+            )
+        finally:
+            self.status_monitor.kick()
+        return self._decode_output(completed)
+
+    async def disconnect_from_nordvpn(
+        self,
+        progress: ProgressCallback | None = None,
+        timeout: float | None = None,
+    ) -> str:
+        """Disconnect, with progress and timeout like `connect_to_location`."""
+        await self.login_required("disconnect_from_nordvpn")
+        first = Progress(
+            stage=DISCONNECTING, message="Disconnecting", server=None, hostname=None
+        )
+        try:
+            completed = await self._stream(
+                self.cmds.nordvpn_disconnect_stream,
+                (),
+                first,
+                progress,
+                timeout,
+                history.DISCONNECT,
+            )
+        finally:
+            self.status_monitor.kick()
+        return self._decode_output(completed)
+
+    async def _stream(
+        self,
+        command: Callable[..., Awaitable[subprocess.CompletedProcess]],
+        args: tuple,
+        first: Progress,
+        progress: ProgressCallback | None,
+        timeout: float | None,
+        kind: str,
+        location: str | None = None,
+    ) -> subprocess.CompletedProcess:
+        """Run a streaming command, parsing its output into progress events.
+
+        The command and how it ended go to the history, with `location`.
+        """
+        lines = parsing.OutputLines()
+        events = []
+
+        def emit(event: Progress) -> None:
+            events.append(event)
+            logger.debug("progress %s", event)
+            if progress is not None:
+                progress(event)
+
+        def parse(new_lines: list[str]) -> None:
+            for line in new_lines:
+                if (event := parsing.parse_progress(line)) is not None:
+                    emit(event)
+
+        def on_output(chunk: bytes) -> None:
+            parse(lines.feed(chunk))
+
+        emit(first)
+        timeout = self.connect_timeout if timeout is None else timeout
+        started = time.monotonic()
+        outcome = "error"
+        try:
+            completed = await self._with_timeout(command(*args, on_output), timeout)
+            parse(lines.close())
+            if completed.returncode != 0 and events[-1]["stage"] != FAILED:
+                message = f"Failed with return code {completed.returncode}"
+                emit(
+                    Progress(stage=FAILED, message=message, server=None, hostname=None)
+                )
+            outcome = events[-1]["stage"]
+        except CommandTimeoutError as exc:
+            outcome = "timeout"
+            emit(Progress(stage=FAILED, message=str(exc), server=None, hostname=None))
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            self._record_command(kind, location, started, outcome, events)
+        return completed
+
+    async def _with_timeout(
+        self, call: Awaitable[subprocess.CompletedProcess], timeout: float | None
+    ) -> subprocess.CompletedProcess:
+        """Await `call`, raising CommandTimeoutError after `timeout` seconds.
+
+        With no timeout the command's own one applies. The breaker only
+        sees the cancellation of a call stopped here, so it's told about
+        the timeout.
+        """
+        if timeout is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            error = CommandTimeoutError(f"Timed out after {timeout}s")
+            if self.breaker is not None:
+                self.breaker.failure(error)
+            raise error from None
+
+    async def probe(
+        self,
+    ) -> tuple[Account | None, Status, list[str]]:
+        """Run nordvpn account, status and countries concurrently.
+
+        Unlike the other methods this doesn't check the login first, so
+        the three commands are in flight at the same time. Returns the
+        account (None if logged out), the status and the countries.
+
+        The countries come from the catalog cache when it has them, then
+        only account and status are run.
+        """
+        cached = self.cached_countries()
+        account_cp, status_cp, countries_cp = await asyncio.gather(
+            self.cmds.nordvpn_account(),
+            self.cmds.nordvpn_status(),
+            self.cmds.nordvpn_countries() if cached is None else asyncio.sleep(0),
+        )
+        try:
+            account = self._parse_account(account_cp)
+        except NotLoggedInError:
+            self.status_monitor.observe(None)
+            return None, self._parse_status(status_cp), cached or []
+        status = self._parse_status(status_cp)
+        self.status_monitor.observe(status)
+        if cached is not None:
+            if self.catalog_cache.countries_stale():
+                self._revalidate("countries", self._fetch_countries)
+            return account, status, cached
+        countries = self._parse_list(countries_cp)
+        self._store_countries(countries)
+        return account, status, countries
+
+    async def prefetch_catalog(
+        self,
+        concurrency: int = 8,
+        progress: Callable[[int, int, str], None] | None = None,
+        refresh: bool = False,
+    ) -> PrefetchResult:
+        """Fetch the cities of all the countries into the `locations` index.
+
+        At most `concurrency` commands run at the same time, and
+        `progress(done, total, country)` is called as each country
+        finishes. A country that fails is recorded in the result's
+        `failures` without discarding the others. The cities fresh in the
+        catalog cache aren't fetched again.
+        """
+        countries = await self.get_countries(refresh=refresh)
+        cache = self.catalog_cache
+        # Stale cities are fetched here under the semaphore, get_cities
+        # would revalidate them in the background, all at once.
+        fresh = set()
+        if not refresh and cache is not None:
+            fresh = {
+                c
+                for c in countries
+                if cache.get_cities(c) is not None and not cache.cities_stale(c)
+            }
+        if len(fresh) < len(countries):
+            # Check the login once, instead of in every concurrent command.
+            await self.get_logged_in()
+        semaphore = asyncio.Semaphore(concurrency)
+        result = PrefetchResult(self.locations)
+        done = 0
+
+        async def _fetch(country: str) -> None:
+            nonlocal done
+            if country not in fresh:
+                async with semaphore:
+                    try:
+                        await self._fetch_cities(country)
+                    except Exception as exc:
+                        result.failures[country] = exc
+            done += 1
+            if progress is not None:
+                progress(done, len(countries), country)
+
+        with cache.batch() if cache is not None else contextlib.nullcontext():
+            await asyncio.gather(*(_fetch(country) for country in countries))
+        return result
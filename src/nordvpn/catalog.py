@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+
+
+class LocationIndex:
+    """In-memory index of the countries and their cities.
+
+    Keeps the country -> cities index and the city -> country reverse
+    index (like `MOCK_CITIES` for the mocks) so both directions are
+    answered in O(1). Countries whose cities aren't known yet are kept
+    with an empty list of cities. `version` goes up on every change, so
+    derived indexes know when to rebuild.
+    """
+
+    def __init__(self):
+        self._cities: dict[str, list[str]] = {}
+        self._countries: dict[str, str] = {}
+        self._complete: set[str] = set()
+        self.version = 0
+
+    def __contains__(self, location: str) -> bool:
+        return location in self._cities or location in self._countries
+
+    def __len__(self) -> int:
+        return len(self._cities) + len(self._countries)
+
+    @property
+    def countries(self) -> list[str]:
+        return list(self._cities)
+
+    @property
+    def cities_by_country(self) -> dict[str, str]:
+        """City -> country, for all the known cities."""
+        return dict(self._countries)
+
+    def set_countries(self, countries: list[str]) -> None:
+        for country in countries:
+            self._cities.setdefault(country, [])
+        self.version += 1
+
+    def set_cities(self, country: str, cities: list[str]) -> None:
+        for city in self._cities.get(country, []):
+            self._countries.pop(city, None)
+        self._cities[country] = list(cities)
+        for city in cities:
+            self._countries[city] = country
+        self._complete.add(country)
+        self.version += 1
+
+    def cities(self, country: str) -> list[str] | None:
+        """Cities of a country, or None if they aren't known yet."""
+        if country not in self._complete:
+            return None
+        return self._cities[country]
+
+    def country_of(self, city: str) -> str | None:
+        return self._countries.get(city)
+
+    def is_country(self, location: str) -> bool:
+        return location in self._cities
+
+    def is_city(self, location: str) -> bool:
+        return location in self._countries
+
+
+@dataclass
+class PrefetchResult:
+    """Result of prefetching the cities of all the countries."""
+
+    index: LocationIndex
+    failures: dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
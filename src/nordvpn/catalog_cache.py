@@ -0,0 +1,155 @@
+import contextlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from . import log
+
+logger = log.get_logger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_TTL = 7 * 24 * 3600.0
+
+
+def default_cache_path() -> Path:
+    """Path of the cache file under the XDG cache dir."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "nordvpn-textual-ui" / "catalog.json"
+
+
+def _valid_entry(entry) -> bool:
+    """Whether `entry` is a list of names with the time it was updated."""
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("items"), list)
+        and all(isinstance(item, str) for item in entry["items"])
+        and isinstance(entry.get("updated_at"), (int, float))
+    )
+
+
+class CatalogCache:
+    """On-disk cache of the countries and their cities.
+
+    The lists change maybe weekly, so they are kept in a versioned json
+    file and considered fresh for `ttl` seconds. Stale entries are still
+    returned by the getters, it's up to the caller to refresh them. The
+    file is replaced atomically on every change, and a missing, corrupt
+    or old-version file is just treated as empty.
+
+    Callables in `listeners` are called with no arguments after every
+    change, so the UI can pick up refreshed lists. Changes made within a
+    `batch()` block are saved and notified once at the end.
+    """
+
+    def __init__(self, path: Path | str | None = None, ttl: float = DEFAULT_TTL):
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.ttl = ttl
+        self.listeners: list[Callable[[], None]] = []
+        self._countries: list[str] | None = None
+        self._countries_at = 0.0
+        self._cities: dict[str, dict] = {}
+        self._batch_depth = 0
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        countries = data.get("countries")
+        if _valid_entry(countries):
+            self._countries = countries["items"]
+            self._countries_at = countries["updated_at"]
+        cities = data.get("cities")
+        if isinstance(cities, dict):
+            # Entries of the wrong shape are dropped, the others kept.
+            self._cities = {
+                country: entry
+                for country, entry in cities.items()
+                if _valid_entry(entry)
+            }
+
+    def save(self) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "countries": {"items": self._countries, "updated_at": self._countries_at},
+            "cities": self._cities,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file in the same dir and rename it, so
+        # readers never see a half written file.
+        file = tempfile.NamedTemporaryFile(
+            "w", dir=self.path.parent, suffix=".tmp", delete=False, encoding="utf-8"
+        )
+        try:
+            with file:
+                json.dump(data, file)
+            os.replace(file.name, self.path)
+        except BaseException:
+            Path(file.name).unlink(missing_ok=True)
+            raise
+
+    def _is_stale(self, updated_at: float) -> bool:
+        return time.time() - updated_at > self.ttl
+
+    def get_countries(self) -> list[str] | None:
+        return self._countries
+
+    def countries_stale(self) -> bool:
+        return self._countries is None or self._is_stale(self._countries_at)
+
+    def set_countries(self, countries: list[str]) -> None:
+        self._countries = countries
+        self._countries_at = time.time()
+        self._changed()
+
+    def get_cities(self, country: str) -> list[str] | None:
+        entry = self._cities.get(country)
+        return entry["items"] if entry else None
+
+    def all_cities(self) -> dict[str, list[str]]:
+        """Cities of every country in the cache, fresh or not."""
+        return {country: entry["items"] for country, entry in self._cities.items()}
+
+    def cities_stale(self, country: str) -> bool:
+        entry = self._cities.get(country)
+        return entry is None or self._is_stale(entry["updated_at"])
+
+    def set_cities(self, country: str, cities: list[str]) -> None:
+        self._cities[country] = {"items": cities, "updated_at": time.time()}
+        self._changed()
+
+    def clear(self) -> None:
+        self._countries = None
+        self._countries_at = 0.0
+        self._cities = {}
+        self._changed()
+
+    @contextlib.contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._changed()
+
+    def _changed(self) -> None:
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._dirty = False
+        try:
+            self.save()
+        except OSError as exc:
+            logger.warning("Couldn't save the catalog cache: %s", exc)
+        for listener in self.listeners:
+            listener()
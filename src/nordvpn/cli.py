@@ -0,0 +1,172 @@
+"""Headless command line interface, for scripts.
+
+Run with `python -m src.nordvpn <command>`. Every command prints a single
+json document to stdout (connect and disconnect with an "ok" field, false
+if the cli didn't get there), and errors are printed as json to stderr with
+one of the exit codes below. The countries and cities come from the
+on-disk catalog cache while it's fresh, so repeated calls don't run the
+cli. The logged in state isn't cached across calls: every command that
+needs a login checks it with `nordvpn account` first. Nothing here
+imports textual.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Callable
+
+from . import log, parsing
+from .catalog_cache import CatalogCache
+from .exceptions import (
+    CommandTimeoutError,
+    DaemonUnavailableError,
+    NotLoggedInError,
+    NotLoggedOutError,
+    ReplayMissError,
+    UnknownLocationError,
+)
+from .nordvpn import Nordvpn
+
+logger = log.get_logger(__name__)
+
+EXIT_OK = 0
+# The nordvpn cli answered, but the command failed (like a connect).
+EXIT_FAILED = 1
+# Bad arguments, as argparse does.
+EXIT_USAGE = 2
+EXIT_NOT_LOGGED_IN = 3
+# The nordvpn cli couldn't be run, or it or its daemon didn't answer.
+EXIT_UNAVAILABLE = 4
+
+
+def _status(nordvpn: Nordvpn, args: argparse.Namespace) -> dict:
+    status = nordvpn.get_status()
+    return {"connected": nordvpn.is_connected(status), "status": status}
+
+
+def _account(nordvpn: Nordvpn, args: argparse.Namespace) -> dict:
+    # Raises NotLoggedInError by itself when logged out.
+    return {"account": nordvpn.check_account()}
+
+
+def _countries(nordvpn: Nordvpn, args: argparse.Namespace) -> dict:
+    return {"countries": nordvpn.get_countries(refresh=args.refresh)}
+
+
+def _cities(nordvpn: Nordvpn, args: argparse.Namespace) -> dict:
+    cities = nordvpn.get_cities(args.country, refresh=args.refresh)
+    return {"country": args.country, "cities": cities}
+
+
+def _result(output: str, expected_stage: str) -> dict:
+    progress = parsing.last_progress(output)
+    ok = progress is not None and progress["stage"] == expected_stage
+    return {"ok": ok, "progress": progress, "output": output}
+
+
+def _connect(nordvpn: Nordvpn, args: argparse.Namespace) -> dict:
+    output = nordvpn.connect_to_location(args.location)
+    return {"location": args.location, **_result(output, parsing.CONNECTED)}
+
+
+def _disconnect(nordvpn: Nordvpn, args: argparse.Namespace) -> dict:
+    output = nordvpn.disconnect_from_nordvpn()
+    return _result(output, parsing.DISCONNECTED)
+
+
+COMMANDS: dict[str, Callable[[Nordvpn, argparse.Namespace], dict]] = {
+    "status": _status,
+    "account": _account,
+    "countries": _countries,
+    "cities": _cities,
+    "connect": _connect,
+    "disconnect": _disconnect,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.nordvpn",
+        description="Scriptable nordvpn, json output.",
+        epilog=(
+            "The countries and cities are cached on disk, the login isn't:"
+            " the commands that need it run `nordvpn account` first."
+        ),
+    )
+    parser.add_argument("--pretty", action="store_true", help="indent the json")
+    parser.add_argument(
+        "--cache", metavar="PATH", help="catalog cache file, instead of the default"
+    )
+    parser.add_argument(
+        "--mock", action="store_true", help="use the mock commands, logged in"
+    )
+    parser.add_argument(
+        "--record", metavar="PATH", help="record the commands run to a fixture"
+    )
+    parser.add_argument(
+        "--replay", metavar="PATH", help="answer from a fixture, not the cli"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="connection status")
+    subparsers.add_parser("account", help="account details")
+    for name in ("countries", "cities"):
+        subparser = subparsers.add_parser(name, help=f"list the {name}")
+        if name == "cities":
+            subparser.add_argument("country")
+        subparser.add_argument(
+            "--refresh", action="store_true", help="ask the cli, not the cache"
+        )
+    subparsers.add_parser("connect", help="connect to a location").add_argument(
+        "location"
+    )
+    subparsers.add_parser("disconnect", help="disconnect")
+    return parser
+
+
+def make_nordvpn(args: argparse.Namespace) -> Nordvpn:
+    if args.mock:
+        nordvpn = Nordvpn(test=True)
+        nordvpn.cmds.nordvpn_login()
+        return nordvpn
+    if args.replay:
+        from .commands.replay import ReplayNordvpnCommands, load_fixture
+
+        return Nordvpn(test=True, cmds=ReplayNordvpnCommands(load_fixture(args.replay)))
+    cmds = None
+    if args.record:
+        from .commands.replay import RecordingNordvpnCommands
+
+        cmds = RecordingNordvpnCommands(args.record)
+    return Nordvpn(catalog_cache=CatalogCache(args.cache), cmds=cmds)
+
+
+def _print(data: Any, pretty: bool, file=None) -> None:
+    print(json.dumps(data, indent=2 if pretty else None), file=file or sys.stdout)
+
+
+def main(argv: list[str] | None = None, nordvpn: Nordvpn | None = None) -> int:
+    """Run the command in `argv` and return the exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    log.configure_from_env()
+    try:
+        if nordvpn is None:
+            nordvpn = make_nordvpn(args)
+        result = COMMANDS[args.command](nordvpn, args)
+    except NotLoggedInError as exc:
+        code, error = EXIT_NOT_LOGGED_IN, exc
+    except (
+        FileNotFoundError,
+        CommandTimeoutError,
+        DaemonUnavailableError,
+        ReplayMissError,
+    ) as exc:
+        code, error = EXIT_UNAVAILABLE, exc
+    except (NotLoggedOutError, UnknownLocationError) as exc:
+        code, error = EXIT_FAILED, exc
+    else:
+        _print(result, args.pretty)
+        return EXIT_OK if result.get("ok", True) else EXIT_FAILED
+    logger.info("%s failed: %r", args.command, error)
+    data = {"error": type(error).__name__, "message": str(error), "exit_code": code}
+    _print(data, args.pretty, sys.stderr)
+    return code
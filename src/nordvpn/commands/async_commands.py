@@ -0,0 +1,133 @@
+import asyncio
+import subprocess
+from typing import Callable
+
+from ..exceptions import CommandTimeoutError
+from . import tracing
+from .commands import DEFAULT_TIMEOUT, TIMEOUTS, timeout_message
+
+OutputCallback = Callable[[bytes], None]
+# Bytes read at a time from the output of the streaming commands.
+STREAM_CHUNK = 4096
+TERMINATE_GRACE = 1.0
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is not None:
+        return
+    process.terminate()
+    try:
+        await asyncio.wait_for(process.wait(), TERMINATE_GRACE)
+    except asyncio.TimeoutError:
+        process.kill()
+
+
+class AsyncNordvpnCommands:
+    """Asyncio version of `NordvpnCommands`.
+
+    The commands run with `asyncio.create_subprocess_exec`, so awaiting
+    them doesn't block the event loop and several commands can be in
+    flight at the same time. They return the same
+    `subprocess.CompletedProcess` objects as the blocking commands.
+
+    The `*_stream` commands also pass every chunk of stdout to
+    `on_output` as soon as it is read.
+
+    Cancelling a command terminates its process, and kills it if it's
+    still running after `TERMINATE_GRACE` seconds. Every command run is
+    recorded in `tracer`. Like the blocking commands, a command still
+    running after its timeout is cancelled, terminating its process, and
+    raises CommandTimeoutError.
+    """
+
+    tracer = tracing.tracer
+    timeouts = TIMEOUTS
+    default_timeout = DEFAULT_TIMEOUT
+
+    def timeout_for(self, cmd: list[str]) -> float:
+        return self.timeouts.get(cmd[0], self.default_timeout)
+
+    async def nordvpn_command(
+        self, cmd: list[str], on_output: OutputCallback | None = None
+    ) -> subprocess.CompletedProcess:
+        """Generic nordvpn command."""
+        timeout = self.timeout_for(cmd)
+        with self.tracer.trace(cmd[0]) as span:
+            try:
+                completed = await asyncio.wait_for(
+                    self._run(["nordvpn"] + cmd, on_output), timeout
+                )
+            except asyncio.TimeoutError:
+                raise CommandTimeoutError(timeout_message(cmd, timeout)) from None
+            span.done(completed)
+        return completed
+
+    async def _run(
+        self, full_cmd: list[str], on_output: OutputCallback | None = None
+    ) -> subprocess.CompletedProcess:
+        process = await asyncio.create_subprocess_exec(
+            *full_cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            if on_output is None:
+                stdout, stderr = await process.communicate()
+            else:
+                stdout, stderr = await self._read_streaming(process, on_output)
+        except asyncio.CancelledError:
+            # Don't leave the process behind when the caller gives up.
+            await _terminate(process)
+            raise
+        return subprocess.CompletedProcess(
+            full_cmd, process.returncode, stdout=stdout, stderr=stderr
+        )
+
+    @staticmethod
+    async def _read_streaming(
+        process: asyncio.subprocess.Process, on_output: OutputCallback
+    ) -> tuple[bytes, bytes]:
+        stderr = asyncio.ensure_future(process.stderr.read())
+        try:
+            chunks = []
+            while chunk := await process.stdout.read(STREAM_CHUNK):
+                chunks.append(chunk)
+                on_output(chunk)
+            await process.wait()
+            return b"".join(chunks), await stderr
+        finally:
+            stderr.cancel()
+
+    async def nordvpn_account(self) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["account"])
+
+    async def nordvpn_login(self) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["login"])
+
+    async def nordvpn_logout(self) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["logout"])
+
+    async def nordvpn_status(self) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["status"])
+
+    async def nordvpn_countries(self) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["countries"])
+
+    async def nordvpn_cities(self, country: str) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["cities", country])
+
+    async def nordvpn_connect(self, place: str) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["connect", place])
+
+    async def nordvpn_disconnect(self) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["disconnect"])
+
+    async def nordvpn_connect_stream(
+        self, place: str, on_output: OutputCallback
+    ) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["connect", place], on_output)
+
+    async def nordvpn_disconnect_stream(
+        self, on_output: OutputCallback
+    ) -> subprocess.CompletedProcess:
+        return await self.nordvpn_command(["disconnect"], on_output)
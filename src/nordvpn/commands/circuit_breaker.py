@@ -0,0 +1,192 @@
+"""Circuit breaker failing the nordvpn commands fast while the daemon is down.
+
+When nordvpnd is stuck or restarting, every command hangs until its
+timeout or answers that the daemon can't be reached. After
+`failure_threshold` such failures in a row the breaker opens, and for
+`cooldown` seconds the commands raise DaemonUnavailableError at once
+instead of piling up. Then a single trial command is let through: the
+breaker closes if it works, and opens for another cooldown if not.
+"""
+import subprocess
+import time
+from typing import Callable
+
+from .. import log, parsing
+from ..exceptions import CommandTimeoutError, DaemonUnavailableError
+
+logger = log.get_logger(__name__)
+
+# Failures that mean the daemon (or the cli) isn't answering.
+FAILURES = (CommandTimeoutError, OSError)
+
+BreakerListener = Callable[[bool], None]
+
+
+class CircuitBreaker:
+    """Tracks whether the daemon answers, failing fast while it doesn't.
+
+    `before_call` raises DaemonUnavailableError while open, and the
+    outcome of every call let through is reported to `success`,
+    `failure` or `cancelled` with the token `before_call` returned. While
+    open only the trial call's outcome counts, not those of the calls
+    still in flight from before. The `listeners` are called with whether
+    the daemon is available whenever that changes.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.listeners: list[BreakerListener] = []
+        self._trial: object | None = None
+
+    @property
+    def available(self) -> bool:
+        return self.opened_at is None
+
+    def retry_in(self) -> float:
+        """Seconds until a trial command is let through, 0 if closed."""
+        if self.opened_at is None:
+            return 0.0
+        return max(self.opened_at + self.cooldown - self.clock(), 0.0)
+
+    def before_call(self, command: str) -> object | None:
+        """Let `command` through or raise, returning the token of the
+        trial call (None for the calls while closed)."""
+        if self.opened_at is None:
+            return None
+        if self._trial is not None or self.retry_in() > 0:
+            raise DaemonUnavailableError(
+                f"nordvpn daemon unavailable, not running {command}"
+                f" (retrying in {self.retry_in():.0f}s)"
+            )
+        logger.info("trying the daemon again with %s", command)
+        self._trial = object()
+        return self._trial
+
+    def _outcome_counts(self, token: object | None) -> bool:
+        """Whether the outcome of the call with `token` counts, ending the
+        trial if it was that call."""
+        if token is not None and token is self._trial:
+            self._trial = None
+            return True
+        return self.opened_at is None
+
+    def success(self, token: object | None = None) -> None:
+        if not self._outcome_counts(token):
+            return
+        self.failures = 0
+        if self.opened_at is not None:
+            logger.info("daemon available again")
+            self.opened_at = None
+            self._notify()
+
+    def failure(self, error: object, token: object | None = None) -> None:
+        if not self._outcome_counts(token):
+            return
+        self.failures += 1
+        if self.opened_at is None and self.failures < self.failure_threshold:
+            return
+        logger.warning(
+            "daemon unavailable after %d failures, last: %s", self.failures, error
+        )
+        notify = self.opened_at is None
+        self.opened_at = self.clock()
+        if notify:
+            self._notify()
+
+    def cancelled(self, token: object | None = None) -> None:
+        """The call let through gave up, neither a success nor a failure."""
+        if token is not None and token is self._trial:
+            self._trial = None
+
+    def _notify(self) -> None:
+        for listener in self.listeners:
+            listener(self.available)
+
+    def observe(
+        self, completed: subprocess.CompletedProcess, token: object | None = None
+    ) -> None:
+        """Report a finished command, raising DaemonUnavailableError if it
+        says the daemon can't be reached."""
+        output = (completed.stdout or b"") + (getattr(completed, "stderr", b"") or b"")
+        if not parsing.daemon_unreachable(output):
+            self.success(token)
+            return
+        message = parsing.strip_spinner(output).strip() or "daemon unreachable"
+        self.failure(message, token)
+        raise DaemonUnavailableError(message)
+
+
+def _is_command(name: str) -> bool:
+    return name.startswith("nordvpn_")
+
+
+class BreakerNordvpnCommands:
+    """Wrapper of blocking nordvpn commands guarded by `breaker`.
+
+    Any other attribute is looked up in the wrapped commands.
+    """
+
+    def __init__(self, cmds, breaker: CircuitBreaker):
+        self.cmds = cmds
+        self.breaker = breaker
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.cmds, name)
+        if not _is_command(name):
+            return attr
+
+        def guarded(*args, **kwargs):
+            token = self.breaker.before_call(name)
+            try:
+                completed = attr(*args, **kwargs)
+            except FAILURES as exc:
+                self.breaker.failure(exc, token)
+                raise
+            except Exception:
+                # Any other error came with an answer, the daemon is up.
+                self.breaker.success(token)
+                raise
+            except BaseException:
+                self.breaker.cancelled(token)
+                raise
+            self.breaker.observe(completed, token)
+            return completed
+
+        return guarded
+
+
+class AsyncBreakerNordvpnCommands(BreakerNordvpnCommands):
+    """Wrapper of async nordvpn commands guarded by `breaker`."""
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.cmds, name)
+        if not _is_command(name):
+            return attr
+
+        async def guarded(*args, **kwargs):
+            token = self.breaker.before_call(name)
+            try:
+                completed = await attr(*args, **kwargs)
+            except FAILURES as exc:
+                self.breaker.failure(exc, token)
+                raise
+            except Exception:
+                # Any other error came with an answer, the daemon is up.
+                self.breaker.success(token)
+                raise
+            except BaseException:
+                self.breaker.cancelled(token)
+                raise
+            self.breaker.observe(completed, token)
+            return completed
+
+        return guarded
@@ -0,0 +1,118 @@
+import asyncio
+import subprocess
+from typing import Awaitable, Callable
+
+
+class CoalescingNordvpnCommands:
+    """Single-flight wrapper of async nordvpn commands.
+
+    Concurrent callers of the same read-only command (account, status,
+    countries, cities of a country) share one process and its result.
+    Mutating commands (login, logout, connect, disconnect, their streaming
+    versions and the generic `nordvpn_command`) act as barriers: reads
+    issued while one runs wait for it to finish, and reads in flight
+    before it are never shared with callers after it. Status reads only
+    wait `status_wait` seconds for a mutation, so polling the status
+    during a long connect still shows its progress.
+
+    Any other attribute is looked up in the wrapped commands.
+    """
+
+    def __init__(self, cmds):
+        self.cmds = cmds
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+        self._mutating = 0
+        # Made in the running loop on first use, the instance may outlive
+        # the loop it was created in.
+        self._idle: asyncio.Event | None = None
+        self.status_wait = 1.0
+
+    def __getattr__(self, name: str):
+        return getattr(self.cmds, name)
+
+    def _idle_event(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if not self._mutating:
+                self._idle.set()
+        return self._idle
+
+    async def _read(
+        self,
+        key: tuple,
+        func: Callable[..., Awaitable],
+        *args,
+        wait: float | None = None,
+    ) -> subprocess.CompletedProcess:
+        idle = self._idle_event()
+        if not idle.is_set():
+            try:
+                await asyncio.wait_for(idle.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(*args))
+            self._in_flight[key] = future
+
+            def _done(_future: asyncio.Future) -> None:
+                if self._in_flight.get(key) is _future:
+                    del self._in_flight[key]
+                if not _future.cancelled():
+                    # Mark the exception as retrieved, callers got it.
+                    _future.exception()
+
+            future.add_done_callback(_done)
+        # A caller giving up doesn't cancel the command for the others.
+        return await asyncio.shield(future)
+
+    async def _mutate(
+        self, func: Callable[..., Awaitable], *args
+    ) -> subprocess.CompletedProcess:
+        self._in_flight.clear()
+        self._mutating += 1
+        self._idle_event().clear()
+        try:
+            return await func(*args)
+        finally:
+            self._mutating -= 1
+            if not self._mutating:
+                self._idle_event().set()
+            self._in_flight.clear()
+
+    async def nordvpn_command(self, cmd: list[str]) -> subprocess.CompletedProcess:
+        return await self._mutate(self.cmds.nordvpn_command, cmd)
+
+    async def nordvpn_account(self) -> subprocess.CompletedProcess:
+        return await self._read(("account",), self.cmds.nordvpn_account)
+
+    async def nordvpn_login(self) -> subprocess.CompletedProcess:
+        return await self._mutate(self.cmds.nordvpn_login)
+
+    async def nordvpn_logout(self) -> subprocess.CompletedProcess:
+        return await self._mutate(self.cmds.nordvpn_logout)
+
+    async def nordvpn_status(self) -> subprocess.CompletedProcess:
+        return await self._read(
+            ("status",), self.cmds.nordvpn_status, wait=self.status_wait
+        )
+
+    async def nordvpn_countries(self) -> subprocess.CompletedProcess:
+        return await self._read(("countries",), self.cmds.nordvpn_countries)
+
+    async def nordvpn_cities(self, country: str) -> subprocess.CompletedProcess:
+        return await self._read(("cities", country), self.cmds.nordvpn_cities, country)
+
+    async def nordvpn_connect(self, place: str) -> subprocess.CompletedProcess:
+        return await self._mutate(self.cmds.nordvpn_connect, place)
+
+    async def nordvpn_disconnect(self) -> subprocess.CompletedProcess:
+        return await self._mutate(self.cmds.nordvpn_disconnect)
+
+    async def nordvpn_connect_stream(
+        self, place: str, on_output
+    ) -> subprocess.CompletedProcess:
+        return await self._mutate(self.cmds.nordvpn_connect_stream, place, on_output)
+
+    async def nordvpn_disconnect_stream(self, on_output) -> subprocess.CompletedProcess:
+        return await self._mutate(self.cmds.nordvpn_disconnect_stream, on_output)
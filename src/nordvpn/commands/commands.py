@@ -1,19 +1,55 @@
 import subprocess
 
+from ..exceptions import CommandTimeoutError
+from . import tracing
+
+# Seconds each subcommand may take before it's killed, DEFAULT_TIMEOUT for
+# those not listed. Connect has its own shorter timeout in the facades,
+# this one is only a backstop.
+TIMEOUTS = {"connect": 90.0, "disconnect": 30.0, "login": 30.0}
+DEFAULT_TIMEOUT = 10.0
+
+
+def timeout_message(cmd: list[str], timeout: float) -> str:
+    return f"nordvpn {cmd[0]} timed out after {timeout}s"
+
 
 class NordvpnCommands:
     """Commands to interact with the nordvpn cli.
 
     It's contained within a class so it's easier to mock for tests, this
     way all commands can be mocked at once easily.
+
+    Every command run is recorded in `tracer`. A command still running
+    after its timeout (from `timeouts`, else `default_timeout`) is killed
+    and raises CommandTimeoutError.
     """
 
+    tracer = tracing.tracer
+    timeouts = TIMEOUTS
+    default_timeout = DEFAULT_TIMEOUT
+
+    def timeout_for(self, cmd: list[str]) -> float:
+        return self.timeouts.get(cmd[0], self.default_timeout)
+
     def nordvpn_command(self, cmd: list[str]) -> subprocess.CompletedProcess:
         """Generic nordvpn command."""
-        full_cmd = ["nordvpn"] + cmd
-        completed = subprocess.run(full_cmd, capture_output=True, check=False)
+        timeout = self.timeout_for(cmd)
+        with self.tracer.trace(cmd[0]) as span:
+            try:
+                completed = self._run(["nordvpn"] + cmd, timeout)
+            except subprocess.TimeoutExpired:
+                raise CommandTimeoutError(timeout_message(cmd, timeout)) from None
+            span.done(completed)
         return completed
 
+    def _run(
+        self, full_cmd: list[str], timeout: float | None = None
+    ) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            full_cmd, capture_output=True, check=False, timeout=timeout
+        )
+
     def nordvpn_account(self) -> subprocess.CompletedProcess:
         return self.nordvpn_command(["account"])
 
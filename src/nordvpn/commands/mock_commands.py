@@ -1,7 +1,16 @@
 """Mocks for the commands module."""
+import asyncio
+import functools
+import re
+import time
 from typing import Callable
 from unittest import mock
 
+from ..exceptions import CommandTimeoutError
+from . import tracing
+from .commands import timeout_message
+from .mock_config import FAILURE_STDOUT, MockConfig, Outcome
+
 MOCK_COUNTRIES = {
     "Mock_Country_1": ["Mock_City_1_1", "Mock_City_1_2"],
     "Mock_Country_2": ["Mock_City_2_1", "Mock_City_2_2"],
@@ -9,6 +18,9 @@ MOCK_COUNTRIES = {
     "Mock_Country_4": ["Mock_City_4_1", "Mock_City_4_2"],
 }
 
+# A spinner frame or a line.
+OUTPUT_CHUNK_RE = re.compile(rb"[^\r\n]*[\r\n]|[^\r\n]+")
+
 MOCK_CITIES = {}
 for _country, _cities in MOCK_COUNTRIES.items():
     for _city in _cities:
@@ -25,15 +37,98 @@ class MockCompletedProcess:
         self.kwargs = kwargs
 
 
+def _failure(outcome: Outcome, command: str) -> MockCompletedProcess | None:
+    """Result of a failed or timed out outcome, None if it succeeded."""
+    if outcome.timed_out:
+        cmd = [command.removeprefix("nordvpn_")]
+        raise CommandTimeoutError(timeout_message(cmd, outcome.delay))
+    if outcome.failed:
+        return MockCompletedProcess(FAILURE_STDOUT, 1)
+    return None
+
+
+def _subcommand(func: Callable) -> str:
+    return func.__name__.removeprefix("nordvpn_")
+
+
+def _simulated(func: Callable) -> Callable:
+    """Apply the latency and failures of the mock's `config`, if any.
+
+    The call is recorded in the mock's `tracer`, unless it's None.
+    """
+
+    def simulate(self, *args):
+        if self.config is not None:
+            outcome = self.config.sample(func.__name__)
+            time.sleep(outcome.delay)
+            if (failure := _failure(outcome, func.__name__)) is not None:
+                return failure
+        return func(self, *args)
+
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        if self.tracer is None:
+            return simulate(self, *args)
+        with self.tracer.trace(_subcommand(func)) as span:
+            completed = simulate(self, *args)
+            span.done(completed)
+        return completed
+
+    return wrapper
+
+
+def output_chunks(stdout: bytes) -> list[bytes]:
+    """The output split like a terminal would get it: frame by frame."""
+    return OUTPUT_CHUNK_RE.findall(stdout)
+
+
+def _streamed(func: Callable) -> Callable:
+    """Also pass the output to `on_output`, `output_interval` seconds apart."""
+
+    @functools.wraps(func)
+    def wrapper(self, *args, on_output: Callable[[bytes], None] | None = None):
+        completed = func(self, *args)
+        if on_output is not None:
+            for chunk in output_chunks(completed.stdout):
+                time.sleep(self.output_interval)
+                on_output(chunk)
+        return completed
+
+    return wrapper
+
+
 class MockNordvpnCommands:
     """Mock commands for NordVpn.
 
     Before using this, it needs to be instantiated and it starts with
     status logged out and disconnected. To change that, the attributes
     `logged_in` and `connected` can be set to True as desired.
+
+    The countries and cities are those of `catalog` (`MOCK_COUNTRIES` by
+    default, see `synthetic_catalog` for big ones), and `config` adds
+    latency and failures to every command (none by default). Like the
+    real commands, the calls are recorded in `tracer` (none if it's None).
+
+    Connect and disconnect take an `on_output` callback that gets their
+    output frame by frame, `output_interval` seconds apart.
     """
 
-    def __init__(self):
+    tracer = tracing.tracer
+
+    def __init__(
+        self,
+        catalog: dict[str, list[str]] | None = None,
+        config: MockConfig | None = None,
+        output_interval: float = 0.0,
+        tracer: tracing.CommandTracer | None = tracing.tracer,
+    ):
+        self.tracer = tracer
+        self.catalog = catalog if catalog is not None else MOCK_COUNTRIES
+        self.cities = {
+            city: country for country, cities in self.catalog.items() for city in cities
+        }
+        self.config = config
+        self.output_interval = output_interval
         self.__logged_in = False
         self.__connected = False
         self.__connected_country = None
@@ -43,8 +138,8 @@ class MockNordvpnCommands:
         self, val: bool, country: str | None = None, city: str | None = None
     ):
         if val:
-            assert country in MOCK_COUNTRIES
-            assert city in MOCK_CITIES
+            assert country in self.catalog
+            assert city in self.cities
         else:  # False
             assert country is None
             assert city is None
@@ -58,6 +153,7 @@ class MockNordvpnCommands:
     nordvpn_command = mock.MagicMock()
     nordvpn_command.return_value = MockCompletedProcess(b"", 0)
 
+    @_simulated
     def nordvpn_account(self):
         if self.__logged_in:
             return MockCompletedProcess(
@@ -80,6 +176,7 @@ class MockNordvpnCommands:
                 returncode=1,
             )
 
+    @_simulated
     def nordvpn_login(self):
         if self.__logged_in:
             return MockCompletedProcess(
@@ -103,6 +200,7 @@ class MockNordvpnCommands:
                 returncode=0,
             )
 
+    @_simulated
     def nordvpn_logout(self):
         if self.__logged_in:
             self.__logged_in = False
@@ -127,6 +225,7 @@ class MockNordvpnCommands:
                 returncode=1,
             )
 
+    @_simulated
     def nordvpn_status(self):
         if self.__connected:
             if not self.__logged_in:
@@ -159,23 +258,29 @@ class MockNordvpnCommands:
                 returncode=0,
             )
 
+    @_simulated
     def nordvpn_countries(self):
+        countries_bytes = "\t\t".join(self.catalog).encode()
         return MockCompletedProcess(
             # fmt: off
             stdout=(
                 b"\r-\r  \r\r-\r  \r"
-                b"Mock_Country_1\t\t"
-                b"Mock_Country_2\t\t"
-                b"Mock_Country_3\t\t\t"
-                b"Mock_Country_4\n"
+                + countries_bytes
+                + b"\n"
             ),
             # fmt: on
             returncode=0,
         )
 
+    @_simulated
     def nordvpn_cities(self, country: str):
         assert isinstance(country, str)
-        cities = MOCK_COUNTRIES[country]
+        if country not in self.catalog:
+            return MockCompletedProcess(
+                stdout=b"\r-\r  \rThe specified country does not exist.\n",
+                returncode=1,
+            )
+        cities = self.catalog[country]
         cities_bytes = "\t\t".join(cities).encode()
         return MockCompletedProcess(
             # fmt: off
@@ -188,17 +293,20 @@ class MockNordvpnCommands:
             returncode=0,
         )
 
+    @_streamed
+    @_simulated
     def nordvpn_connect(self, location: str):
         assert isinstance(location, str)
-        if location in MOCK_COUNTRIES:
+        if location in self.catalog:
             country = location
-            city = MOCK_COUNTRIES[country][0]
-        elif location in MOCK_CITIES:
+            city = self.catalog[country][0]
+        elif location in self.cities:
             city = location
-            country = MOCK_CITIES[city]
+            country = self.cities[city]
         else:
-            raise ValueError(
-                f"Bad value for location: {location}. Not country nor city"
+            return MockCompletedProcess(
+                stdout=b"\r-\r  \rThe specified server does not exist.\n",
+                returncode=1,
             )
 
         if self.__logged_in:
@@ -223,6 +331,8 @@ class MockNordvpnCommands:
                 returncode=1,
             )
 
+    @_streamed
+    @_simulated
     def nordvpn_disconnect(self):
         if not self.__logged_in:
             raise ValueError("Cannot be connected if logged out.")
@@ -247,3 +357,85 @@ class MockNordvpnCommands:
                 # fmt: on
                 returncode=0,
             )
+
+
+class AsyncMockNordvpnCommands:
+    """Async mock commands for NordVpn.
+
+    Wraps a `MockNordvpnCommands` instance (available as `sync`) so both
+    mocks share the same behaviour. Every command yields to the event
+    loop once before answering, like a real subprocess would, or waits
+    the latency drawn from `config` without blocking the loop. The calls
+    are recorded in `tracer` (and not again by `sync`, unless a `sync`
+    recording its own calls is given). The streaming
+    commands pass the output frame by frame to `on_output`, waiting the
+    `output_interval` of `sync` before each frame.
+    """
+
+    tracer = tracing.tracer
+
+    def __init__(
+        self,
+        sync: MockNordvpnCommands | None = None,
+        config: MockConfig | None = None,
+        catalog: dict[str, list[str]] | None = None,
+    ):
+        if sync is None:
+            sync = MockNordvpnCommands(catalog, tracer=None)
+        self.sync = sync
+        self.config = config
+
+    async def _run(self, func: Callable, *args):
+        with self.tracer.trace(_subcommand(func)) as span:
+            span.done(await self._simulate(func, *args))
+        return span.completed
+
+    async def _simulate(self, func: Callable, *args):
+        if self.config is None:
+            await asyncio.sleep(0)
+            return func(*args)
+        outcome = self.config.sample(func.__name__)
+        await asyncio.sleep(outcome.delay)
+        if (failure := _failure(outcome, func.__name__)) is not None:
+            return failure
+        return func(*args)
+
+    async def nordvpn_command(self, cmd: list[str]):
+        return await self._run(self.sync.nordvpn_command, cmd)
+
+    async def nordvpn_account(self):
+        return await self._run(self.sync.nordvpn_account)
+
+    async def nordvpn_login(self):
+        return await self._run(self.sync.nordvpn_login)
+
+    async def nordvpn_logout(self):
+        return await self._run(self.sync.nordvpn_logout)
+
+    async def nordvpn_status(self):
+        return await self._run(self.sync.nordvpn_status)
+
+    async def nordvpn_countries(self):
+        return await self._run(self.sync.nordvpn_countries)
+
+    async def nordvpn_cities(self, country: str):
+        return await self._run(self.sync.nordvpn_cities, country)
+
+    async def nordvpn_connect(self, location: str):
+        return await self._run(self.sync.nordvpn_connect, location)
+
+    async def nordvpn_disconnect(self):
+        return await self._run(self.sync.nordvpn_disconnect)
+
+    async def nordvpn_connect_stream(self, location: str, on_output):
+        return await self._stream(on_output, self.sync.nordvpn_connect, location)
+
+    async def nordvpn_disconnect_stream(self, on_output):
+        return await self._stream(on_output, self.sync.nordvpn_disconnect)
+
+    async def _stream(self, on_output, func: Callable, *args):
+        completed = await self._run(func, *args)
+        for chunk in output_chunks(completed.stdout):
+            await asyncio.sleep(self.sync.output_interval)
+            on_output(chunk)
+        return completed
@@ -0,0 +1,112 @@
+"""Simulated latency, failures and catalog sizes for the mock commands."""
+import random
+from dataclasses import dataclass, field
+
+# What the real cli answers when its daemon isn't running.
+FAILURE_STDOUT = b"\r-\r  \rWhoops! Cannot reach System Daemon.\n"
+
+DISTRIBUTIONS = ("constant", "uniform", "normal", "exponential")
+
+
+@dataclass
+class CommandProfile:
+    """Latency distribution and failure rates of a mock command.
+
+    The latency is `latency` seconds for "constant", `latency` +- `jitter`
+    for "uniform", a normal distribution of `jitter` deviation for
+    "normal" and an exponential distribution of mean `latency` for
+    "exponential". It is never negative.
+
+    A command fails (with the output of an unreachable daemon and return
+    code 1) with probability `failure_rate`, and times out (hanging for
+    `MockConfig.hang` seconds and raising CommandTimeoutError, like the
+    real commands) with probability `timeout_rate`.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    distribution: str = "uniform"
+    failure_rate: float = 0.0
+    timeout_rate: float = 0.0
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.distribution == "constant":
+            latency = self.latency
+        elif self.distribution == "uniform":
+            latency = self.latency + rng.uniform(-self.jitter, self.jitter)
+        elif self.distribution == "normal":
+            latency = rng.gauss(self.latency, self.jitter)
+        else:  # exponential
+            latency = rng.expovariate(1 / self.latency) if self.latency else 0.0
+        return max(latency, 0.0)
+
+
+@dataclass(frozen=True)
+class Outcome:
+    """What a single mock command call does."""
+
+    delay: float
+    failed: bool = False
+    timed_out: bool = False
+
+
+@dataclass
+class MockConfig:
+    """Simulated behaviour of the mock commands.
+
+    `commands` overrides the `default` profile per command, keyed by the
+    command name with or without the "nordvpn_" prefix (so "status" or
+    "nordvpn_status"). Outcomes are drawn from a generator seeded with
+    `seed`, so a run with the same calls is reproducible.
+    """
+
+    default: CommandProfile = field(default_factory=CommandProfile)
+    commands: dict[str, CommandProfile] = field(default_factory=dict)
+    seed: int | None = 0
+    hang: float = 30.0
+
+    def __post_init__(self):
+        self.commands = {
+            name.removeprefix("nordvpn_"): profile
+            for name, profile in self.commands.items()
+        }
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def uniform(cls, latency: float, jitter: float = 0.0, **kwargs) -> "MockConfig":
+        """The same latency profile for every command."""
+        return cls(default=CommandProfile(latency=latency, jitter=jitter), **kwargs)
+
+    def profile(self, command: str) -> CommandProfile:
+        return self.commands.get(command.removeprefix("nordvpn_"), self.default)
+
+    def sample(self, command: str) -> Outcome:
+        profile = self.profile(command)
+        delay = profile.sample_latency(self._rng)
+        draw = self._rng.random()
+        if draw < profile.timeout_rate:
+            return Outcome(self.hang, timed_out=True)
+        if draw < profile.timeout_rate + profile.failure_rate:
+            return Outcome(delay, failed=True)
+        return Outcome(delay)
+
+
+def synthetic_catalog(
+    countries: int = 1000, cities_per_country: int = 10
+) -> dict[str, list[str]]:
+    """A catalog like `MOCK_COUNTRIES` with many countries and cities.
+
+    Names are deterministic and unique, like "Country_0042" and
+    "City_0042_07".
+    """
+    width = len(str(max(countries, cities_per_country)))
+    return {
+        f"Country_{k:0{width}}": [
+            f"City_{k:0{width}}_{j:0{width}}" for j in range(cities_per_country)
+        ]
+        for k in range(countries)
+    }
@@ -0,0 +1,192 @@
+"""Record the nordvpn commands run to a fixture, and replay them offline.
+
+A fixture is a json lines file, one command per line: its argv, return
+code, stdout and stderr (decoded as utf-8 with surrogateescape, so any
+bytes round trip) and the seconds it took. The recording commands run the
+real cli and append every command to a fixture as it finishes. The replay
+commands run nothing, they answer from a fixture, sleeping the recorded
+durations times `timing` (0, the default, doesn't sleep).
+"""
+import asyncio
+import json
+import subprocess
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from ..exceptions import CommandTimeoutError, ReplayMissError
+from .async_commands import AsyncNordvpnCommands, OutputCallback
+from .commands import NordvpnCommands, timeout_message
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("utf-8", "surrogateescape")
+
+
+@dataclass
+class Recording:
+    """A command run, and what it answered."""
+
+    argv: list[str]
+    returncode: int
+    stdout: bytes
+    stderr: bytes = b""
+    duration: float = 0.0
+
+    @classmethod
+    def of(cls, completed: subprocess.CompletedProcess, duration: float):
+        return cls(
+            list(completed.args),
+            completed.returncode,
+            completed.stdout or b"",
+            completed.stderr or b"",
+            duration,
+        )
+
+    def completed(self) -> subprocess.CompletedProcess:
+        return subprocess.CompletedProcess(
+            self.argv, self.returncode, stdout=self.stdout, stderr=self.stderr
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "argv": self.argv,
+                "returncode": self.returncode,
+                "stdout": _decode(self.stdout),
+                "stderr": _decode(self.stderr),
+                "duration": self.duration,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "Recording":
+        data = json.loads(line)
+        return cls(
+            data["argv"],
+            data["returncode"],
+            _encode(data["stdout"]),
+            _encode(data.get("stderr", "")),
+            data.get("duration", 0.0),
+        )
+
+
+def load_fixture(path: Path | str) -> list[Recording]:
+    with open(path, encoding="utf-8") as file:
+        return [Recording.from_json(line) for line in file if line.strip()]
+
+
+class FixtureWriter:
+    """Appends recordings to a fixture file, each as soon as it's made."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, recording: Recording) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(recording.to_json() + "\n")
+
+
+class Replayer:
+    """The recordings of a fixture, in the order they were made per argv.
+
+    Once the recordings of an argv run out, the last one is answered
+    again, so a status can be polled more often than when recorded. An
+    argv never recorded raises ReplayMissError.
+    """
+
+    def __init__(self, recordings: Iterable[Recording]):
+        self._queues: dict[tuple[str, ...], deque[Recording]] = defaultdict(deque)
+        for recording in recordings:
+            self._queues[tuple(recording.argv)].append(recording)
+
+    def next(self, argv: list[str]) -> Recording:
+        queue = self._queues.get(tuple(argv))
+        if not queue:
+            raise ReplayMissError(f"No recording of {' '.join(argv)!r}")
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+
+class RecordingNordvpnCommands(NordvpnCommands):
+    """The real commands, recorded to the fixture at `path`."""
+
+    def __init__(self, path: Path | str):
+        self.writer = FixtureWriter(path)
+
+    def _run(
+        self, full_cmd: list[str], timeout: float | None = None
+    ) -> subprocess.CompletedProcess:
+        start = time.perf_counter()
+        completed = super()._run(full_cmd, timeout)
+        self.writer.write(Recording.of(completed, time.perf_counter() - start))
+        return completed
+
+
+class AsyncRecordingNordvpnCommands(AsyncNordvpnCommands):
+    """The real asyncio commands, recorded to the fixture at `path`."""
+
+    def __init__(self, path: Path | str):
+        self.writer = FixtureWriter(path)
+
+    async def _run(
+        self, full_cmd: list[str], on_output: OutputCallback | None = None
+    ) -> subprocess.CompletedProcess:
+        start = time.perf_counter()
+        completed = await super()._run(full_cmd, on_output)
+        self.writer.write(Recording.of(completed, time.perf_counter() - start))
+        return completed
+
+
+class ReplayNordvpnCommands(NordvpnCommands):
+    """Commands answered from `recordings`, taking `timing` times as long."""
+
+    def __init__(self, recordings: Iterable[Recording], timing: float = 0.0):
+        self.replayer = Replayer(recordings)
+        self.timing = timing
+
+    def _run(
+        self, full_cmd: list[str], timeout: float | None = None
+    ) -> subprocess.CompletedProcess:
+        recording = self.replayer.next(full_cmd)
+        delay = recording.duration * self.timing
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise CommandTimeoutError(timeout_message(full_cmd[1:], timeout))
+        time.sleep(delay)
+        return recording.completed()
+
+
+class AsyncReplayNordvpnCommands(AsyncNordvpnCommands):
+    """Asyncio commands answered from `recordings`, taking `timing` times
+    as long.
+
+    The streaming commands pass the output on a line at a time, spread
+    over the duration.
+    """
+
+    def __init__(self, recordings: Iterable[Recording], timing: float = 0.0):
+        self.replayer = Replayer(recordings)
+        self.timing = timing
+
+    async def _run(
+        self, full_cmd: list[str], on_output: OutputCallback | None = None
+    ) -> subprocess.CompletedProcess:
+        recording = self.replayer.next(full_cmd)
+        delay = recording.duration * self.timing
+        if on_output is None:
+            if delay:
+                await asyncio.sleep(delay)
+        else:
+            lines = recording.stdout.splitlines(keepends=True)
+            for line in lines:
+                if delay:
+                    await asyncio.sleep(delay / len(lines))
+                on_output(line)
+        return recording.completed()
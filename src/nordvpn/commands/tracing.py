@@ -0,0 +1,143 @@
+"""Counts and timings of the nordvpn commands that are run."""
+import contextlib
+import json
+import math
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+# Durations kept per command for the percentiles.
+SAMPLES = 1024
+
+
+@dataclass
+class CommandStats:
+    """Stats of one nordvpn subcommand (like "status" or "cities").
+
+    The percentiles are computed from the last `SAMPLES` durations, the
+    count, total and max from all of them. A command that raised (or was
+    cancelled) instead of returning is counted in `errors` and its
+    return code is None.
+    """
+
+    count: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    output_bytes: int = 0
+    max_output: int = 0
+    returncodes: Counter = field(default_factory=Counter)
+    durations: deque = field(default_factory=lambda: deque(maxlen=SAMPLES))
+
+    def add(self, duration: float, returncode: int | None, output_size: int) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.durations.append(duration)
+        self.returncodes[returncode] += 1
+        if returncode is None:
+            self.errors += 1
+        self.output_bytes += output_size
+        self.max_output = max(self.max_output, output_size)
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile of the sampled durations, q in [0, 100]."""
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        rank = max(math.ceil(q / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_s": self.total_time,
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "max_s": self.max_time,
+            "returncodes": {str(code): n for code, n in self.returncodes.items()},
+            "output_bytes": self.output_bytes,
+            "max_output_bytes": self.max_output,
+        }
+
+
+class _Span:
+    completed = None
+
+    def done(self, completed) -> None:
+        """Record the finished process, anything else counts as an error."""
+        self.completed = completed
+
+
+class CommandTracer:
+    """Records every command run, by subcommand.
+
+    The commands use it like this, from sync or async code:
+
+        with tracer.trace("status") as span:
+            span.done(run_the_command())
+
+    `stats` maps each subcommand to its CommandStats, and `as_dict`,
+    `to_json` and `export` give all of them plus their totals.
+    """
+
+    def __init__(self):
+        self.stats: dict[str, CommandStats] = {}
+        self.started_at = time.time()
+
+    @contextlib.contextmanager
+    def trace(self, command: str) -> Iterator[_Span]:
+        span = _Span()
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            completed = span.completed
+            self.record(
+                command,
+                time.perf_counter() - start,
+                None if completed is None else completed.returncode,
+                0 if completed is None else len(completed.stdout or b""),
+            )
+
+    def record(
+        self, command: str, duration: float, returncode: int | None, output_size: int
+    ) -> None:
+        self.stats.setdefault(command, CommandStats()).add(
+            duration, returncode, output_size
+        )
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self.started_at = time.time()
+
+    @property
+    def total_count(self) -> int:
+        return sum(stats.count for stats in self.stats.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "total_count": self.total_count,
+            "commands": {
+                command: stats.as_dict()
+                for command, stats in sorted(self.stats.items())
+            },
+        }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+    def export(self, path: Path | str) -> Path:
+        """Write the stats as json to `path`, creating its directory."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_json(), encoding="utf-8")
+        return path
+
+
+# Shared by all the commands unless they are given another one.
+tracer = CommandTracer()
@@ -4,3 +4,19 @@ class NotLoggedInError(Exception):
 
 class NotLoggedOutError(Exception):
     ...
+
+
+class CommandTimeoutError(Exception):
+    ...
+
+
+class ReplayMissError(LookupError):
+    ...
+
+
+class DaemonUnavailableError(Exception):
+    ...
+
+
+class UnknownLocationError(LookupError):
+    ...
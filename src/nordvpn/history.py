@@ -0,0 +1,189 @@
+"""Append-only history of the connections, in SQLite."""
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from . import log
+from .parsing import Status
+
+logger = log.get_logger(__name__)
+
+# Kinds of events.
+CONNECT = "connect"
+DISCONNECT = "disconnect"
+STATUS = "status"
+SESSION = "session"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    location TEXT,
+    hostname TEXT,
+    ip TEXT,
+    technology TEXT,
+    duration REAL,
+    outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS events_kind_location ON events (kind, location, ts);
+CREATE INDEX IF NOT EXISTS events_kind_ts ON events (kind, ts);
+"""
+
+
+def default_history_path() -> Path:
+    """Path of the history database under the XDG data dir."""
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(data_home) / "nordvpn-textual-ui" / "history.sqlite3"
+
+
+class ConnectionHistory:
+    """Every connect, disconnect and status change, appended to SQLite.
+
+    Rows are only ever inserted, one per event, with the `kind` of the
+    event ("connect" and "disconnect" for the commands, "status" for every
+    change of the connection seen, "session" when a connection ends),
+    the location, server hostname, IP, technology, a duration in seconds
+    (of the command, or of the session) and the outcome.
+
+    The queries run in SQLite on the indexes, so nothing but their
+    answers is loaded. The database is only opened on first use.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path) if path is not None else default_history_path()
+        self._db: sqlite3.Connection | None = None
+        # The last status event, loaded on the first status seen.
+        self._last_status: sqlite3.Row | None = None
+        self._last_status_loaded = False
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if str(self.path) != ":memory:":
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, isolation_level=None)
+            self._db.row_factory = sqlite3.Row
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def record(
+        self,
+        kind: str,
+        location: str | None = None,
+        hostname: str | None = None,
+        ip: str | None = None,
+        technology: str | None = None,
+        duration: float | None = None,
+        outcome: str | None = None,
+        ts: float | None = None,
+    ) -> None:
+        self.db.execute(
+            "INSERT INTO events"
+            " (ts, kind, location, hostname, ip, technology, duration, outcome)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                time.time() if ts is None else ts,
+                kind,
+                location,
+                hostname,
+                ip,
+                technology,
+                duration,
+                outcome,
+            ),
+        )
+
+    def observe_status(self, status: Status, ts: float | None = None) -> None:
+        """Record a status if its connection changed since the last one.
+
+        When a connection ends, a "session" event with its duration is
+        recorded too, even if it started in another process.
+        """
+        ts = time.time() if ts is None else ts
+        location = status["City"] or status["Country"]
+        values = (status["Status"], location, status["Hostname"], status["IP"])
+        last = self._load_last_status()
+        if last is not None and values == (
+            last["outcome"],
+            last["location"],
+            last["hostname"],
+            last["ip"],
+        ):
+            return
+        if last is not None and last["outcome"] == "Connected":
+            self.record(
+                SESSION,
+                last["location"],
+                last["hostname"],
+                last["ip"],
+                last["technology"],
+                duration=ts - last["ts"],
+                outcome="ended",
+                ts=ts,
+            )
+        logger.debug("history status %s", values)
+        self.record(
+            STATUS,
+            location,
+            status["Hostname"],
+            status["IP"],
+            status["Technology"],
+            outcome=status["Status"],
+            ts=ts,
+        )
+        self._last_status_loaded = False
+
+    def _load_last_status(self) -> sqlite3.Row | None:
+        if not self._last_status_loaded:
+            self._last_status = self.db.execute(
+                "SELECT * FROM events WHERE kind = ? ORDER BY ts DESC LIMIT 1",
+                (STATUS,),
+            ).fetchone()
+            self._last_status_loaded = True
+        return self._last_status
+
+    def recent_locations(self, limit: int = 5) -> list[str]:
+        """Locations connected to, the most recent first."""
+        rows = self.db.execute(
+            "SELECT location FROM events WHERE kind = ? AND outcome = 'connected'"
+            " GROUP BY location ORDER BY MAX(ts) DESC LIMIT ?",
+            (CONNECT, limit),
+        )
+        return [row["location"] for row in rows]
+
+    def most_used_locations(self, limit: int = 5) -> list[tuple[str, int]]:
+        """Locations connected to and how many times, the most used first."""
+        rows = self.db.execute(
+            "SELECT location, COUNT(*) AS n FROM events"
+            " WHERE kind = ? AND outcome = 'connected'"
+            " GROUP BY location ORDER BY n DESC, MAX(ts) DESC LIMIT ?",
+            (CONNECT, limit),
+        )
+        return [(row["location"], row["n"]) for row in rows]
+
+    def success_rates(self) -> dict[str, float]:
+        """Fraction of the connects to each location that connected."""
+        rows = self.db.execute(
+            "SELECT location, AVG(outcome = 'connected') AS rate FROM events"
+            " WHERE kind = ? GROUP BY location",
+            (CONNECT,),
+        )
+        return {row["location"]: row["rate"] for row in rows}
+
+    def total_uptime(self, now: float | None = None) -> float:
+        """Seconds connected, in the ended sessions and the current one."""
+        total = self.db.execute(
+            "SELECT COALESCE(SUM(duration), 0) FROM events WHERE kind = ?",
+            (SESSION,),
+        ).fetchone()[0]
+        last = self._load_last_status()
+        if last is not None and last["outcome"] == "Connected":
+            total += (time.time() if now is None else now) - last["ts"]
+        return total
@@ -0,0 +1,114 @@
+"""Logging of the nordvpn and tui packages.
+
+Modules log with `log.get_logger(__name__)` and %-style arguments, like
+`logger.debug("watch_state %s", state)`. The arguments are only formatted
+if a handler takes the record. Importing this only adds a handler that
+drops them, the level is left to the application (warnings by default),
+so a disabled call costs a level check.
+
+`configure` (or `configure_from_env`) turns it on with any of these
+sinks: a rotating text file, a rotating json lines file with timestamps
+and durations, and extra handlers (the TUI adds the Textual devtools one).
+"""
+import contextlib
+import json
+import logging
+import logging.handlers
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# The parent of the nordvpn loggers, and the tui ones next to it.
+ROOT = __name__.rpartition(".")[0]
+ROOTS = (ROOT, ROOT.rpartition(".")[0] + ".tui")
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+MAX_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+
+for _root in ROOTS:
+    logging.getLogger(_root).addHandler(logging.NullHandler())
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One json object per record, with the `duration` of timed blocks."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if (duration := getattr(record, "duration", None)) is not None:
+            data["duration"] = duration
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+def _rotating(path: Path | str, formatter: logging.Formatter) -> logging.Handler:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"
+    )
+    handler.setFormatter(formatter)
+    return handler
+
+
+def configure(
+    level: int | str = logging.DEBUG,
+    file: Path | str | None = None,
+    json_file: Path | str | None = None,
+    handlers: Iterable[logging.Handler] = (),
+) -> list[logging.Handler]:
+    """Log from `level` up to the given sinks, replacing the previous ones."""
+    roots = [logging.getLogger(name) for name in ROOTS]
+    old_handlers = set()
+    for root in roots:
+        for handler in list(root.handlers):
+            if not isinstance(handler, logging.NullHandler):
+                root.removeHandler(handler)
+                old_handlers.add(handler)
+    for handler in old_handlers:
+        handler.close()
+    new_handlers = list(handlers)
+    if file is not None:
+        new_handlers.append(_rotating(file, logging.Formatter(TEXT_FORMAT)))
+    if json_file is not None:
+        new_handlers.append(_rotating(json_file, JsonLinesFormatter()))
+    for root in roots:
+        for handler in new_handlers:
+            root.addHandler(handler)
+        root.setLevel(level if isinstance(level, int) else level.upper())
+    return new_handlers
+
+
+def configure_from_env(handlers: Iterable[logging.Handler] = ()) -> None:
+    """Configure from `NORDVPN_TUI_LOG` (the level), `NORDVPN_TUI_LOG_FILE`
+    and `NORDVPN_TUI_LOG_JSON` (the paths of the sinks), if any is set."""
+    level = os.environ.get("NORDVPN_TUI_LOG")
+    file = os.environ.get("NORDVPN_TUI_LOG_FILE")
+    json_file = os.environ.get("NORDVPN_TUI_LOG_JSON")
+    handlers = list(handlers)
+    if level or file or json_file or handlers:
+        configure(level or logging.DEBUG, file, json_file, handlers)
+
+
+@contextlib.contextmanager
+def timed(logger: logging.Logger, what: str, level: int = logging.DEBUG) -> Iterator:
+    """Log how long the block took, with the seconds as `duration`."""
+    if not logger.isEnabledFor(level):
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        logger.log(level, "%s took %.3fs", what, duration, extra={"duration": duration})
@@ -1,25 +1,232 @@
-import re
+import sqlite3
+import subprocess
+import time
 
+from . import history, log, parsing
+from .catalog import LocationIndex
+from .catalog_cache import CatalogCache
+from .commands.circuit_breaker import BreakerNordvpnCommands, CircuitBreaker
 from .commands.commands import NordvpnCommands
-from .commands.mock_commands import MockNordvpnCommands
-from .exceptions import NotLoggedInError, NotLoggedOutError
+from .exceptions import (
+    CommandTimeoutError,
+    DaemonUnavailableError,
+    NotLoggedInError,
+    NotLoggedOutError,
+    UnknownLocationError,
+)
+from .history import ConnectionHistory
+from .parsing import Account, Progress, Status
+from .search import SearchIndex
 
+logger = log.get_logger(__name__)
 
-class Nordvpn:
-    """Class to interact with the nordvpn cli and keep track of status."""
 
-    def __init__(self, test=False):
+class NordvpnBase:
+    """State and output parsing shared by the sync and async facades.
+
+    Subclasses only add the way the commands in `self.cmds` are run.
+    """
+
+    def __init__(
+        self,
+        test=False,
+        login_ttl: float = 30.0,
+        catalog_cache: CatalogCache | None = None,
+        history: ConnectionHistory | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
         self.test = test
-        if test:
-            self.cmds = MockNordvpnCommands()
-        else:
-            self.cmds = NordvpnCommands()
+        # Outside of test mode the breaker, the catalog cache and the
+        # history default to the real ones.
+        if breaker is None and not test:
+            breaker = CircuitBreaker()
+        self.breaker = breaker
+        if catalog_cache is None and not test:
+            catalog_cache = CatalogCache()
+        self.catalog_cache = catalog_cache
+        if history is None and not test:
+            history = ConnectionHistory()
+        self.history = history
+        self.locations = LocationIndex()
+        if catalog_cache is not None:
+            self.locations.set_countries(catalog_cache.get_countries() or [])
+            for country, cities in catalog_cache.all_cities().items():
+                self.locations.set_cities(country, cities)
+        self._search_index: SearchIndex | None = None
+        self._search_version = -1
+        # The logged in state is cached, so the login_required checks
+        # don't run nordvpn account before every command.
+        self.login_ttl = login_ttl
+        self._logged_in: bool | None = None
+        self._logged_in_at = 0.0
+
+    def cached_countries(self) -> list[str] | None:
+        """Countries in the catalog cache, fresh or not, without running anything."""
+        if self.catalog_cache is None:
+            return None
+        return self.catalog_cache.get_countries()
+
+    def search_index(self) -> SearchIndex:
+        """Search index of the `locations`, rebuilt only after they change."""
+        if self._search_version != self.locations.version:
+            self._search_index = SearchIndex.from_locations(self.locations)
+            self._search_version = self.locations.version
+        return self._search_index
+
+    def recent_locations(self, limit: int = 5) -> list[str]:
+        """Locations connected to lately, from the history if kept."""
+        if self.history is None:
+            return []
+        try:
+            return self.history.recent_locations(limit)
+        except sqlite3.Error as exc:
+            logger.warning("Couldn't read the history: %s", exc)
+            return []
+
+    def _record_command(
+        self,
+        kind: str,
+        location: str | None,
+        started: float,
+        outcome: str,
+        events: list[Progress],
+    ) -> None:
+        """Append a connect or disconnect that started at `started` to the history."""
+        if self.history is None:
+            return
+        hostname = next(
+            (e["hostname"] for e in reversed(events) if e["hostname"]), None
+        )
+        try:
+            self.history.record(
+                kind,
+                location,
+                hostname,
+                duration=time.monotonic() - started,
+                outcome=outcome,
+            )
+        except sqlite3.Error as exc:
+            logger.warning("Couldn't record the %s: %s", kind, exc)
+
+    def _store_countries(self, countries: list[str]) -> None:
+        self.locations.set_countries(countries)
+        if self.catalog_cache is not None:
+            self.catalog_cache.set_countries(countries)
+
+    def _store_cities(self, country: str, cities: list[str]) -> None:
+        self.locations.set_cities(country, cities)
+        if self.catalog_cache is not None:
+            self.catalog_cache.set_cities(country, cities)
+
+    def _set_logged_in_cache(self, val: bool) -> None:
+        self._logged_in = val
+        self._logged_in_at = time.monotonic()
+
+    def invalidate_login_cache(self) -> None:
+        """Forget the cached logged in state so the next check runs the cli."""
+        self._logged_in = None
+
+    def _cached_logged_in(self) -> bool | None:
+        """Return the cached logged in state, or None if unknown or expired."""
+        if self._logged_in is None:
+            return None
+        if time.monotonic() - self._logged_in_at > self.login_ttl:
+            return None
+        return self._logged_in
+
+    def _decode_output(self, completed: subprocess.CompletedProcess) -> str:
+        """Decode the output of a command, learning from it if logged out.
+
+        Any command answers with "You are not logged in." when logged out,
+        so that is used to update the cache and raise right away.
+        """
+        output = parsing.strip_spinner(completed.stdout)
+        if parsing.is_not_logged_in(output):
+            self._set_logged_in_cache(False)
+            raise NotLoggedInError()
+        return output
+
+    @staticmethod
+    def _login_required_error(func_name: str) -> NotLoggedInError:
+        return NotLoggedInError(f"function {func_name} requires to be logged in.")
+
+    @staticmethod
+    def _logout_required_error(func_name: str) -> NotLoggedOutError:
+        return NotLoggedOutError(f"function {func_name} requires to be logged out.")
+
+    def _parse_account(self, completed: subprocess.CompletedProcess) -> Account:
+        account = parsing.parse_account(self._decode_output(completed))
+        self._set_logged_in_cache(True)
+        return account
+
+    def _parse_logout(self, completed: subprocess.CompletedProcess) -> str:
+        self.invalidate_login_cache()
+        if completed.returncode != 0:
+            raise ValueError(f"nordvpn_logout returned code {completed.returncode}")
+        output = parsing.strip_spinner(completed.stdout)
+        self._set_logged_in_cache(False)
+        return output
+
+    def _parse_login(self, completed: subprocess.CompletedProcess) -> str:
+        # The login is finished in the browser, so the state is unknown.
+        self.invalidate_login_cache()
+        if completed.returncode != 0:
+            raise ValueError(f"nordvpn_login returned ccode {completed.returncode}")
+        return parsing.strip_spinner(completed.stdout)
+
+    def _parse_status(self, completed: subprocess.CompletedProcess) -> Status:
+        return parsing.parse_status(self._decode_output(completed))
+
+    def _parse_list(self, completed: subprocess.CompletedProcess) -> list[str]:
+        return parsing.parse_list(self._decode_output(completed))
+
+    def _parse_cities(
+        self, country: str, completed: subprocess.CompletedProcess
+    ) -> list[str]:
+        output = self._decode_output(completed)
+        if completed.returncode != 0:
+            raise UnknownLocationError(f"{country}: {output.strip()}")
+        return parsing.parse_list(output)
+
+    @staticmethod
+    def is_connected(status: Status) -> bool:
+        return (status["Status"] or "").lower() == "connected"
+
+
+class Nordvpn(NordvpnBase):
+    """Class to interact with the nordvpn cli and keep track of status."""
+
+    def __init__(
+        self,
+        test=False,
+        login_ttl: float = 30.0,
+        catalog_cache: CatalogCache | None = None,
+        cmds=None,
+        history: ConnectionHistory | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
+        super().__init__(test, login_ttl, catalog_cache, history, breaker)
+        if cmds is None and test:
+            # Only imported in test mode, it pulls in unittest.mock.
+            from .commands.mock_commands import MockNordvpnCommands
+
+            cmds = MockNordvpnCommands()
+        elif cmds is None:
+            cmds = NordvpnCommands()
+        if self.breaker is not None:
+            cmds = BreakerNordvpnCommands(cmds, self.breaker)
+        self.cmds = cmds
 
     def get_logged_in(self) -> bool:
+        cached = self._cached_logged_in()
+        if cached is not None:
+            return cached
         try:
             self.check_account()
+        except (DaemonUnavailableError, CommandTimeoutError):
+            raise
         except Exception as exc:
-            print(exc)
+            logger.info("Not logged in: %s", exc)
             return False
         else:
             return True
@@ -27,141 +234,101 @@ class Nordvpn:
     def get_connected(self) -> bool:
         try:
             status = self.get_status()
-            return status["Status"].lower() == "connected"
+            return self.is_connected(status)
         except NotLoggedInError:
             return False
 
-    def check_account(self) -> dict[str, str]:
+    def check_account(self) -> Account:
         """Run nordvpn account.
 
         This function is used to check if it is currently logged in by the wrapper function
         is_logged_in, so do not require being logged in within this one or there will be an
         infinite recursion.
         """
-        # Initialize result
-        result = {
-            "email": None,
-            "expiration": None,
-        }
         completed = self.cmds.nordvpn_account()
-        output = completed.stdout.decode("utf-8").replace("\r", "")
-        if "not logged in" in output:
-            raise NotLoggedInError()
-
-        def _extract_email(_line: str) -> str | None:
-            if not _line.startswith("Email"):
-                return None
-            re_match = re.search(r":\s*(\w+?@\w+?\.com)", _line)
-            if not re_match:
-                raise ValueError("Couldn't extract email with regex.")
-            email = re_match.groups()[0]
-            return email
-
-        def _extract_expiration(_line: str) -> str | None:
-            if not _line.startswith("VPN Service"):
-                return None
-            re_match = re.search(r"Active \((.+?)\)", _line)
-            if not re_match:
-                raise ValueError("Couldn't extract expire date with regex.")
-            expiration = re_match.groups()[0]
-            return expiration
-
-        lines = output.split("\n")
-        for line in lines:
-            if _email := _extract_email(line):
-                result["email"] = _email
-            if _expiration := _extract_expiration(line):
-                result["expiration"] = _expiration
-
-        return result
+        return self._parse_account(completed)
 
     def login_required(self, func_name: str) -> None:
         """Check for logged in status."""
         if not self.get_logged_in():
-            msg = f"function {func_name} requires to be logged in."
-            raise NotLoggedInError(msg)
+            raise self._login_required_error(func_name)
 
     def logout_required(self, func_name: str) -> None:
         """Check for logged in status."""
         if self.get_logged_in():
-            msg = f"function {func_name} requires to be logged out."
-            raise NotLoggedOutError(msg)
+            raise self._logout_required_error(func_name)
 
     def run_logout(self) -> str:
         self.login_required("run_logout")
         completed = self.cmds.nordvpn_logout()
-        if completed.returncode != 0:
-            raise ValueError(f"nordvpn_logout returned code {completed.returncode}")
-        output = completed.stdout.decode("utf-8")
-        return output
+        return self._parse_logout(completed)
 
     def run_login(self) -> str:
         self.logout_required("run_login")
         completed = self.cmds.nordvpn_login()
-        if completed.returncode != 0:
-            raise ValueError(f"nordvpn_login returned ccode {completed.returncode}")
-        output = completed.stdout.decode("utf-8")
-        return output
+        return self._parse_login(completed)
 
-    def get_status(self) -> dict[str, str | None]:
+    def get_status(self) -> Status:
         self.login_required("get_status")
-        result = {
-            "Status": None,
-            "Country": None,
-            "City": None,
-            "IP": None,
-            "Uptime": None,
-        }
         completed = self.cmds.nordvpn_status()
-        output = completed.stdout.decode("utf-8")
-        output = output.replace("\r", "")
-        lines = output.split("\n")
-        for line in lines:
-            re_match = re.search(r"(\w+?):\s*([\w\s.]+)$", line)
-            if re_match:
-                key, val = re_match.groups()
-                if key in result:
-                    result[key] = val
-        return result
-
-    def get_countries(self) -> list[str]:
+        return self._parse_status(completed)
+
+    def get_countries(self, refresh: bool = False) -> list[str]:
+        """Get the countries, from the catalog cache if fresh.
+
+        Unlike in AsyncNordvpn, a stale entry is fetched again before
+        returning instead of being refreshed in the background: a
+        blocking caller has no background to refresh in, and the cli
+        exits right after.
+        """
+        cache = self.catalog_cache
+        if not refresh and cache is not None and not cache.countries_stale():
+            return cache.get_countries()
         self.login_required("get_countries")
         completed = self.cmds.nordvpn_countries()
-        result = completed.stdout.decode("utf-8")
-        result = result.replace("\r", "").replace("\n", "\t")
-        result = re.sub("\t+", ";", result)
-        result = result.split(";")
-        countries = []
-        for country_raw in result:
-            re_match = re.search(r"(\w+)", country_raw)
-            if re_match:
-                countries.append(re_match.groups()[0])
+        countries = self._parse_list(completed)
+        self._store_countries(countries)
         return countries
 
-    def get_cities(self, country: str) -> list[str]:
+    def get_cities(self, country: str, refresh: bool = False) -> list[str]:
+        """Get the cities of a country, from the catalog cache if fresh.
+
+        A stale entry is fetched again first, like in `get_countries`.
+        """
+        cache = self.catalog_cache
+        if not refresh and cache is not None and not cache.cities_stale(country):
+            return cache.get_cities(country)
         self.login_required("get_cities")
         completed = self.cmds.nordvpn_cities(country)
-        result = completed.stdout.decode("utf-8")
-        result = result.replace("\r", "").replace("\n", "\t")
-        result = re.sub("\t+", ";", result)
-        result = result.split(";")
-        cities = []
-        for country_raw in result:
-            re_match = re.search(r"(\w+)", country_raw)
-            if re_match:
-                cities.append(re_match.groups()[0])
+        cities = self._parse_cities(country, completed)
+        self._store_cities(country, cities)
         return cities
 
     def connect_to_location(self, location: str) -> str:
         self.login_required("connect_to_location")
+        started = time.monotonic()
         completed = self.cmds.nordvpn_connect(location)
-        output: str = completed.stdout.decode("utf-8")
-        output = output.replace("\r", "")
-        return output
+        self._record_output(history.CONNECT, location, started, completed)
+        return self._decode_output(completed)
 
     def disconnect_from_nordvpn(self) -> str:
         self.login_required("disconnect_from_nordvpn")
+        started = time.monotonic()
         completed = self.cmds.nordvpn_disconnect()
-        output: str = completed.stdout.decode("utf-8")
-        output = output.replace("\r", "")
-        return output
+        self._record_output(history.DISCONNECT, None, started, completed)
+        return self._decode_output(completed)
+
+    def _record_output(
+        self,
+        kind: str,
+        location: str | None,
+        started: float,
+        completed: subprocess.CompletedProcess,
+    ) -> None:
+        progress = parsing.last_progress(parsing.strip_spinner(completed.stdout))
+        events = [] if progress is None else [progress]
+        if progress is None or completed.returncode != 0:
+            outcome = parsing.FAILED
+        else:
+            outcome = progress["stage"]
+        self._record_command(kind, location, started, outcome, events)
@@ -0,0 +1,241 @@
+"""Parsers for the output of the nordvpn cli.
+
+All the patterns are compiled once at import. The parsers take the text
+returned by `strip_spinner`, which removes the `\\r` spinner frames the
+cli prints before every answer.
+"""
+import re
+from typing import TypedDict
+
+# Everything in a line up to its last \r is spinner frames.
+SPINNER_RE = re.compile(rb"^[^\n]*\r", re.MULTILINE)
+NOT_LOGGED_IN = "not logged in"
+# Each item of a tab/newline separated list is its first word.
+LIST_ITEM_RE = re.compile(r"[^\w\t\n]*(\w+)[^\t\n]*")
+STATUS_LINE_RE = re.compile(r"^(\w[\w ]*):[ \t]*([\w \t.,]+)$", re.MULTILINE)
+# Like "39.91 KiB received, 48.27 KiB sent".
+TRANSFER_RE = re.compile(
+    r"([\d.]+)\s*([KMGTP]?i?B) received,\s*([\d.]+)\s*([KMGTP]?i?B) sent"
+)
+# Like "1 day 2 hours 5 minutes 18 seconds".
+UPTIME_PART_RE = re.compile(r"(\d+)\s*(year|month|week|day|hour|minute|second)s?")
+EMAIL_LINE_RE = re.compile(r"^Email.*$", re.MULTILINE)
+EMAIL_RE = re.compile(r":\s*(\S+?@\S+)")
+EXPIRATION_LINE_RE = re.compile(r"^VPN Service.*$", re.MULTILINE)
+EXPIRATION_RE = re.compile(r"Active \((.+?)\)")
+# Lines of `nordvpn connect/disconnect`, the server is like "Country #123".
+CONNECTING_RE = re.compile(r"^Connecting to (.+?)(?: \(([\w.-]+)\))?$")
+CONNECTED_RE = re.compile(r"^You are connected to (.+?)(?: \(([\w.-]+)\))?!$")
+DISCONNECTED_RE = re.compile(r"^You are (?:disconnected from|not connected to) NordVPN")
+FAILED_RE = re.compile(r"^(?:Whoops!|You are not logged in)")
+# What the cli prints when its daemon, nordvpnd, isn't running.
+DAEMON_UNREACHABLE_RE = re.compile(rb"Cannot reach System Daemon|nordvpnd\.sock")
+
+STATUS_KEYS = (
+    "Status",
+    "Hostname",
+    "Country",
+    "City",
+    "IP",
+    "Technology",
+    "Uptime",
+    "Received",
+    "Sent",
+    "UptimeSeconds",
+)
+# Status keys named differently in the output of the cli.
+STATUS_LABELS = {"Current technology": "Technology"}
+
+SIZE_UNITS = {
+    "B": 1,
+    "KiB": 1024,
+    "MiB": 1024**2,
+    "GiB": 1024**3,
+    "TiB": 1024**4,
+    "PiB": 1024**5,
+    "KB": 1000,
+    "MB": 1000**2,
+    "GB": 1000**3,
+    "TB": 1000**4,
+    "PB": 1000**5,
+}
+UPTIME_UNITS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 30 * 86400,
+    "year": 365 * 86400,
+}
+
+# Stages of the Progress of connect and disconnect.
+CONNECTING = "connecting"
+SERVER_CHOSEN = "server_chosen"
+CONNECTED = "connected"
+DISCONNECTING = "disconnecting"
+DISCONNECTED = "disconnected"
+FAILED = "failed"
+
+
+class Account(TypedDict):
+    email: str | None
+    expiration: str | None
+
+
+class Status(TypedDict):
+    Status: str | None
+    Hostname: str | None
+    Country: str | None
+    City: str | None
+    IP: str | None
+    Technology: str | None
+    Uptime: str | None
+    # Parsed from the "Transfer" and "Uptime" lines.
+    Received: int | None
+    Sent: int | None
+    UptimeSeconds: int | None
+
+
+class Progress(TypedDict):
+    stage: str
+    message: str
+    server: str | None
+    hostname: str | None
+
+
+def strip_spinner(raw: bytes) -> str:
+    """Decode the raw output of a command without the spinner frames."""
+    return SPINNER_RE.sub(b"", raw).decode("utf-8")
+
+
+def is_not_logged_in(output: str) -> bool:
+    return NOT_LOGGED_IN in output
+
+
+def parse_account(output: str) -> Account:
+    """Parse the output of `nordvpn account`."""
+    result = Account(email=None, expiration=None)
+    if line := EMAIL_LINE_RE.search(output):
+        re_match = EMAIL_RE.search(line.group())
+        if not re_match:
+            raise ValueError("Couldn't extract email with regex.")
+        result["email"] = re_match.group(1)
+    if line := EXPIRATION_LINE_RE.search(output):
+        re_match = EXPIRATION_RE.search(line.group())
+        if not re_match:
+            raise ValueError("Couldn't extract expire date with regex.")
+        result["expiration"] = re_match.group(1)
+    return result
+
+
+def parse_status(output: str) -> Status:
+    """Parse the output of `nordvpn status`, in a single pass."""
+    result = Status(
+        Status=None,
+        Hostname=None,
+        Country=None,
+        City=None,
+        IP=None,
+        Technology=None,
+        Uptime=None,
+        Received=None,
+        Sent=None,
+        UptimeSeconds=None,
+    )
+    for key, val in STATUS_LINE_RE.findall(output):
+        key = STATUS_LABELS.get(key, key)
+        if key == "Transfer":
+            result["Received"], result["Sent"] = parse_transfer(val)
+        elif key in result:
+            result[key] = val
+    if result["Uptime"] is not None:
+        result["UptimeSeconds"] = parse_uptime(result["Uptime"])
+    return result
+
+
+def parse_size(number: str, unit: str) -> int:
+    """Bytes in a size like ("39.91", "KiB")."""
+    return round(float(number) * SIZE_UNITS[unit])
+
+
+def parse_transfer(val: str) -> tuple[int | None, int | None]:
+    """Bytes received and sent, from the value of the "Transfer" line."""
+    re_match = TRANSFER_RE.search(val)
+    if not re_match:
+        return None, None
+    received, received_unit, sent, sent_unit = re_match.groups()
+    return parse_size(received, received_unit), parse_size(sent, sent_unit)
+
+
+def parse_uptime(val: str) -> int | None:
+    """Seconds in an uptime like "1 hour 5 minutes 18 seconds"."""
+    parts = UPTIME_PART_RE.findall(val)
+    if not parts:
+        return None
+    return sum(int(n) * UPTIME_UNITS[unit] for n, unit in parts)
+
+
+def parse_list(output: str) -> list[str]:
+    """Parse the tab separated lists of `nordvpn countries/cities`."""
+    return LIST_ITEM_RE.findall(output)
+
+
+def parse_progress(line: str) -> Progress | None:
+    """Parse a line of `nordvpn connect/disconnect`, None if it says nothing new."""
+    if re_match := CONNECTING_RE.match(line):
+        return Progress(
+            stage=SERVER_CHOSEN,
+            message=line,
+            server=re_match.group(1),
+            hostname=re_match.group(2),
+        )
+    if re_match := CONNECTED_RE.match(line):
+        return Progress(
+            stage=CONNECTED,
+            message=line,
+            server=re_match.group(1),
+            hostname=re_match.group(2),
+        )
+    if DISCONNECTED_RE.match(line):
+        return Progress(stage=DISCONNECTED, message=line, server=None, hostname=None)
+    if FAILED_RE.match(line):
+        return Progress(stage=FAILED, message=line, server=None, hostname=None)
+    return None
+
+
+def daemon_unreachable(output: bytes) -> bool:
+    """Whether the raw output of a command says the daemon can't be reached."""
+    return DAEMON_UNREACHABLE_RE.search(output) is not None
+
+
+def last_progress(output: str) -> Progress | None:
+    """The last step the whole output of a connect or disconnect reports."""
+    for line in reversed(output.splitlines()):
+        if (progress := parse_progress(line.strip())) is not None:
+            return progress
+    return None
+
+
+class OutputLines:
+    """Splits output read in chunks into lines without the spinner frames.
+
+    `feed` returns the lines completed by a chunk, and `close` the last
+    one if the output didn't end with a newline. Empty lines are skipped.
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> list[str]:
+        *lines, self._pending = (self._pending + chunk).split(b"\n")
+        return [line for line in map(self._text, lines) if line]
+
+    def close(self) -> list[str]:
+        line, self._pending = self._text(self._pending), b""
+        return [line] if line else []
+
+    @staticmethod
+    def _text(line: bytes) -> str:
+        # Only what is after the last \r is left on the screen.
+        return line.rpartition(b"\r")[2].decode("utf-8", "replace").strip()
@@ -0,0 +1,111 @@
+import heapq
+from collections import Counter
+from typing import Iterable
+
+from .catalog import LocationIndex
+
+# Minimum trigram similarity of a fuzzy match.
+MIN_SIMILARITY = 0.3
+
+
+def normalize(name: str) -> str:
+    """Search key of a name or query: lowercase, with spaces for underscores."""
+    return " ".join(name.lower().replace("_", " ").split())
+
+
+def trigrams(key: str) -> set[str]:
+    """Trigrams of a key padded like `pg_trgm`, so short words have some too."""
+    padded = f"  {key} "
+    return {padded[k : k + 3] for k in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Type-ahead fuzzy search over location names.
+
+    Built once from the names, with a prefix trie of every word start of
+    every name (so "ang" finds "Los_Angeles") and a trigram index for the
+    fuzzy matches (so "germny" finds "Germany"). A query only looks at
+    the trie node of the query and at the trigram postings of the query,
+    never at every name.
+
+    Results are ranked: names starting with the query, then names with a
+    word starting with it, then fuzzy matches by similarity. Ties go to
+    the shorter name and then alphabetically.
+    """
+
+    def __init__(self, names: Iterable[str], country_of: dict[str, str] | None = None):
+        self.names = list(dict.fromkeys(names))
+        self.country_of = country_of or {}
+        self._keys = [normalize(name) for name in self.names]
+        self._trie: dict = {}
+        self._trigrams: dict[str, list[int]] = {}
+        self._trigram_counts: list[int] = []
+        for idx, key in enumerate(self._keys):
+            for start in self._word_starts(key):
+                self._insert(key[start:], idx)
+            grams = trigrams(key)
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                self._trigrams.setdefault(gram, []).append(idx)
+
+    @classmethod
+    def from_locations(cls, locations: LocationIndex) -> "SearchIndex":
+        """Index of all the countries and known cities."""
+        country_of = locations.cities_by_country
+        return cls([*locations.countries, *country_of], country_of)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _word_starts(key: str) -> list[int]:
+        return [0] + [k + 1 for k, char in enumerate(key) if char == " "]
+
+    def _insert(self, suffix: str, idx: int) -> None:
+        # Every node keeps the ids of the names below it, "" is not a char.
+        node = self._trie
+        for char in suffix:
+            node = node.setdefault(char, {})
+            node.setdefault("", []).append(idx)
+
+    def _prefix_ids(self, key: str) -> list[int]:
+        node = self._trie
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return []
+        return node[""]
+
+    def _fuzzy_ids(self, key: str) -> dict[int, float]:
+        grams = trigrams(key)
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._trigrams.get(gram, ()))
+        similarities = {}
+        for idx, count in hits.items():
+            similarity = count / (len(grams) + self._trigram_counts[idx] - count)
+            if similarity >= MIN_SIMILARITY:
+                similarities[idx] = similarity
+        return similarities
+
+    def search(self, query: str, limit: int = 20) -> list[str]:
+        """Best `limit` names for the query, best first."""
+        key = normalize(query)
+        if not key:
+            return []
+        ranked = {}
+        for idx in self._prefix_ids(key):
+            if idx not in ranked:
+                rank = 0 if self._keys[idx].startswith(key) else 1
+                ranked[idx] = (rank, 0.0, len(self._keys[idx]), self._keys[idx])
+        if len(ranked) < limit and len(key) > 1:
+            for idx, similarity in self._fuzzy_ids(key).items():
+                if idx not in ranked:
+                    ranked[idx] = (
+                        2,
+                        -similarity,
+                        len(self._keys[idx]),
+                        self._keys[idx],
+                    )
+        best = heapq.nsmallest(limit, ranked, key=ranked.__getitem__)
+        return [self.names[idx] for idx in best]
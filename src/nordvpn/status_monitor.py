@@ -0,0 +1,127 @@
+import asyncio
+from typing import TYPE_CHECKING, Callable
+
+from . import log
+from .exceptions import NotLoggedInError
+from .parsing import STATUS_KEYS, Status
+
+if TYPE_CHECKING:
+    from .async_nordvpn import AsyncNordvpn
+
+logger = log.get_logger(__name__)
+
+# A change of these fields means the connection changed, any other field
+# (like the uptime) just ticks.
+CONNECTION_KEYS = ("Status", "Country", "City", "IP")
+
+StatusListener = Callable[[Status | None, set[str]], None]
+StatusObserver = Callable[[Status | None], None]
+
+
+class StatusMonitor:
+    """Polls `nordvpn status` in the background on an adaptive interval.
+
+    The interval starts at `fast_interval` after a connection change and
+    is multiplied by `backoff` on every poll that finds the connection
+    unchanged, up to `slow_interval`. `kick()` goes back to the fast
+    interval, the facade calls it after connect, disconnect, login and
+    logout.
+
+    Every status seen by the facade goes through `observe`, polled or
+    not, and the `listeners` are called with the new snapshot (None when
+    logged out) and the names of the changed fields, only if any field
+    changed. The `observers` are called with every status, changed or
+    not, for what samples them over time.
+    """
+
+    def __init__(
+        self,
+        nordvpn: "AsyncNordvpn",
+        fast_interval: float = 1.0,
+        slow_interval: float = 30.0,
+        backoff: float = 2.0,
+    ):
+        self.nordvpn = nordvpn
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.backoff = backoff
+        self.interval = fast_interval
+        self.listeners: list[StatusListener] = []
+        self.observers: list[StatusObserver] = []
+        self.snapshot: Status | None = None
+        self._seen = False
+        self._last_changed: set[str] = set()
+        self._kicked = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def kick(self) -> None:
+        """Poll at the fast interval again, from now on."""
+        self.interval = self.fast_interval
+        self._kicked.set()
+
+    def observe(self, status: Status | None) -> set[str]:
+        """Record a status, notifying the listeners if anything changed."""
+        for observer in self.observers:
+            observer(status)
+        changed = self._diff(self.snapshot, status) if self._seen else set(STATUS_KEYS)
+        self.snapshot = status
+        self._seen = True
+        self._last_changed = changed
+        if not changed:
+            return changed
+        if changed.intersection(CONNECTION_KEYS):
+            self.interval = self.fast_interval
+        for listener in self.listeners:
+            listener(status, changed)
+        return changed
+
+    async def poll_once(self) -> set[str]:
+        """Poll the status once and adapt the interval."""
+        self._last_changed = set()
+        try:
+            await self.nordvpn.get_status()
+        except NotLoggedInError:
+            # get_status already observed it.
+            pass
+        except Exception as exc:
+            logger.warning("Couldn't poll the status: %s", exc)
+            self.interval = min(self.interval * self.backoff, self.slow_interval)
+            return set()
+        changed = self._last_changed
+        if not changed.intersection(CONNECTION_KEYS):
+            self.interval = min(self.interval * self.backoff, self.slow_interval)
+        return changed
+
+    @staticmethod
+    def _diff(old: Status | None, new: Status | None) -> set[str]:
+        if old is None or new is None:
+            return set() if old is new else set(STATUS_KEYS)
+        return {key for key in STATUS_KEYS if old[key] != new[key]}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._kicked.wait(), self.interval)
+            except asyncio.TimeoutError:
+                await self.poll_once()
+            else:
+                # Kicked: wait again with the fast interval.
+                self._kicked.clear()
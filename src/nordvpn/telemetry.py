@@ -0,0 +1,110 @@
+"""Transfer and uptime samples of the connection, in fixed-size buffers."""
+import time
+from array import array
+
+from .parsing import Status
+
+# Samples kept: at the fastest polling interval (1s), the last 2 minutes.
+CAPACITY = 120
+
+
+class RingBuffer:
+    """The last `capacity` numbers appended, in a preallocated array.
+
+    Appending overwrites the oldest number once full, so the memory used
+    never grows. `values()` returns them oldest first.
+    """
+
+    def __init__(self, capacity: int = CAPACITY, typecode: str = "d"):
+        if capacity < 1:
+            raise ValueError("The capacity must be at least 1.")
+        self.capacity = capacity
+        self._data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._start = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, val: float) -> None:
+        end = (self._start + self._len) % self.capacity
+        self._data[end] = val
+        if self._len < self.capacity:
+            self._len += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def clear(self) -> None:
+        self._start = self._len = 0
+
+    def values(self) -> list[float]:
+        end = self._start + self._len
+        if end <= self.capacity:
+            return self._data[self._start : end].tolist()
+        return (
+            self._data[self._start :].tolist()
+            + self._data[: end - self.capacity].tolist()
+        )
+
+    def last(self) -> float | None:
+        if not self._len:
+            return None
+        return self._data[(self._start + self._len - 1) % self.capacity]
+
+
+class TelemetrySampler:
+    """Samples of the bytes received and sent and the uptime of a connection.
+
+    `add` takes every status seen (the status monitor passes every poll),
+    and keeps those of a connection with transfer counters in ring
+    buffers of `capacity` samples. A new connection (the uptime or the
+    counters going back) starts over. `received_rates` and `sent_rates`
+    are the bytes per second between consecutive samples.
+    """
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.times = RingBuffer(capacity)
+        self.received = RingBuffer(capacity)
+        self.sent = RingBuffer(capacity)
+        self.uptime = RingBuffer(capacity)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def clear(self) -> None:
+        for buffer in (self.times, self.received, self.sent, self.uptime):
+            buffer.clear()
+
+    def add(self, status: Status | None, ts: float | None = None) -> bool:
+        """Sample a status, returning whether it was kept."""
+        if status is None or status["Received"] is None or status["Sent"] is None:
+            return False
+        uptime = status["UptimeSeconds"] or 0
+        if (
+            (self.uptime.last() or 0) > uptime
+            or (self.received.last() or 0) > status["Received"]
+            or (self.sent.last() or 0) > status["Sent"]
+        ):
+            self.clear()
+        self.times.append(time.monotonic() if ts is None else ts)
+        self.received.append(status["Received"])
+        self.sent.append(status["Sent"])
+        self.uptime.append(uptime)
+        return True
+
+    @property
+    def received_rates(self) -> list[float]:
+        return self._rates(self.received)
+
+    @property
+    def sent_rates(self) -> list[float]:
+        return self._rates(self.sent)
+
+    def _rates(self, counter: RingBuffer) -> list[float]:
+        times = self.times.values()
+        counts = counter.values()
+        return [
+            (counts[k] - counts[k - 1]) / (times[k] - times[k - 1])
+            for k in range(1, len(times))
+            if times[k] > times[k - 1]
+        ]
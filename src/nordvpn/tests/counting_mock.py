@@ -0,0 +1,32 @@
+"""Async mock commands that count their calls, for the tests of their callers."""
+import asyncio
+from collections import Counter
+
+from src.nordvpn.commands.mock_commands import AsyncMockNordvpnCommands
+
+
+class CountingAsyncMockNordvpnCommands(AsyncMockNordvpnCommands):
+    """Async mock commands counting their calls, by command, and how many
+    were answered and in flight at once. Every command takes `latency`
+    seconds more than the mock's."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls = Counter()
+        self.answered = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _run(self, func, *args):
+        self.calls[func.__name__] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            completed = await super()._run(func, *args)
+        finally:
+            self.in_flight -= 1
+        self.answered += 1
+        return completed
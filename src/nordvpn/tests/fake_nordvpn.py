@@ -0,0 +1,70 @@
+"""A fake `nordvpn` executable, first in the PATH of a test."""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Logs every call, then hangs, answers like a stopped daemon, or answers
+# like a logged in cli, depending on the flag files next to it.
+SCRIPT = """#!/bin/sh
+dir="$(dirname "$0")"
+echo "$*" >> "$dir/calls"
+if [ -f "$dir/hang" ]; then
+    exec sleep 30
+fi
+if [ -f "$dir/down" ]; then
+    printf '\\r-\\r  \\rWhoops! Cannot reach System Daemon.\\n'
+    exit 1
+fi
+case "$1" in
+account)
+    printf 'Account Information:\\nEmail Address: fake@mail.com\\n'
+    printf 'VPN Service: Active (Expires on Jan 1st, 2030)\\n'
+    ;;
+status)
+    echo "Status: Disconnected"
+    ;;
+countries)
+    printf 'Fake_Country_1\\t\\tFake_Country_2\\n'
+    ;;
+*)
+    echo "Whoops! Unknown command"
+    exit 64
+    ;;
+esac
+"""
+
+
+class FakeNordvpn:
+    """Installs the fake for the duration of `testcase`.
+
+    `hang()` and `down()` make the next calls hang or fail like a stopped
+    daemon, until `up()`. `script` replaces the whole fake.
+    """
+
+    def __init__(self, testcase: unittest.TestCase, script: str = SCRIPT):
+        tmp = tempfile.TemporaryDirectory()
+        testcase.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        executable = self.dir / "nordvpn"
+        executable.write_text(script)
+        executable.chmod(0o755)
+        path = f"{self.dir}{os.pathsep}{os.environ.get('PATH', '')}"
+        patcher = mock.patch.dict(os.environ, {"PATH": path})
+        patcher.start()
+        testcase.addCleanup(patcher.stop)
+
+    def calls(self) -> list[str]:
+        calls = self.dir / "calls"
+        return calls.read_text().splitlines() if calls.exists() else []
+
+    def hang(self) -> None:
+        (self.dir / "hang").touch()
+
+    def down(self) -> None:
+        (self.dir / "down").touch()
+
+    def up(self) -> None:
+        for flag in ("hang", "down"):
+            (self.dir / flag).unlink(missing_ok=True)
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.nordvpn.commands.async_commands import AsyncNordvpnCommands
+from src.nordvpn.commands.tracing import CommandTracer
+
+# Prints its pid and the first step of a connect, then hangs.
+FAKE_NORDVPN = """#!/bin/sh
+echo $$ > "$(dirname "$0")/pid"
+printf '\\r-\\r  \\rConnecting to X #1 (x1.nordvpn.com)\\n'
+exec sleep 30
+"""
+
+
+class TestAsyncNordvpnCommands(unittest.IsolatedAsyncioTestCase):
+    """Tests for the streaming and cancellation of the async commands."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        executable = Path(self.tmp.name) / "nordvpn"
+        executable.write_text(FAKE_NORDVPN)
+        executable.chmod(0o755)
+        path = f"{self.tmp.name}{os.pathsep}{os.environ.get('PATH', '')}"
+        patcher = mock.patch.dict(os.environ, {"PATH": path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cmds = AsyncNordvpnCommands()
+        self.cmds.tracer = CommandTracer()
+
+    async def test_timeout_terminates_the_process(self):
+        """The output streams as it comes, and a timeout kills the cli."""
+        chunks = []
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                self.cmds.nordvpn_connect_stream("X", chunks.append), 1.0
+            )
+        assert b"Connecting to X #1" in b"".join(chunks)
+        pid = int((Path(self.tmp.name) / "pid").read_text())
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+        assert self.cmds.tracer.stats["connect"].errors == 1
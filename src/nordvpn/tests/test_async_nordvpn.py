@@ -0,0 +1,137 @@
+import asyncio
+import unittest
+
+from src.nordvpn import parsing
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.mock_commands import AsyncMockNordvpnCommands
+from src.nordvpn.commands.mock_config import CommandProfile, MockConfig
+from src.nordvpn.exceptions import (
+    CommandTimeoutError,
+    NotLoggedInError,
+    NotLoggedOutError,
+)
+
+
+class TestAsyncNordvpn(unittest.IsolatedAsyncioTestCase):
+    """Tests for the AsyncNordvpn class, mirroring the ones of Nordvpn."""
+
+    async def asyncSetUp(self):
+        self.nordvpn = AsyncNordvpn(test=True)
+        await self.nordvpn.run_login()
+        await self.nordvpn.disconnect_from_nordvpn()
+
+    async def test_get_logged_in(self):
+        """Test the get_logged_in method."""
+        assert await self.nordvpn.get_logged_in() is True
+        await self.nordvpn.run_logout()
+        assert await self.nordvpn.get_logged_in() is False
+
+    async def test_get_connected(self):
+        """Test the get_connected method."""
+        assert not await self.nordvpn.get_connected()
+        await self.nordvpn.connect_to_location("Mock_Country_3")
+        assert await self.nordvpn.get_connected()
+        await self.nordvpn.run_logout()
+        assert not await self.nordvpn.get_connected()
+
+    async def test_check_account(self):
+        """Test the check_account method."""
+        result = await self.nordvpn.check_account()
+        assert result.get("email") == "mock@mail.com"
+        assert result.get("expiration") == "Expires on Jul 15th, 2025"
+
+        await self.nordvpn.run_logout()
+        with self.assertRaises(NotLoggedInError):
+            await self.nordvpn.check_account()
+
+    async def test_run_login_and_logout(self):
+        """Test the run_login and run_logout methods."""
+        with self.assertRaises(NotLoggedOutError):
+            await self.nordvpn.run_login()
+        output = await self.nordvpn.run_logout()
+        assert "you are logged out" in output.lower()
+        with self.assertRaises(NotLoggedInError):
+            await self.nordvpn.run_logout()
+        output = await self.nordvpn.run_login()
+        assert "continue in the browser" in output.lower()
+
+    async def test_get_status(self):
+        """Test the get_status method."""
+        await self.nordvpn.connect_to_location("Mock_City_1_2")
+        status = await self.nordvpn.get_status()
+        assert status == {
+            "Status": "Connected",
+            "Hostname": "mc123.nordvpn.com",
+            "Country": "Mock_Country_1",
+            "City": "Mock_City_1_2",
+            "IP": "123.123.123.1",
+            "Technology": "NORDLYNX",
+            "Uptime": "18 seconds",
+            "Received": 40868,
+            "Sent": 49428,
+            "UptimeSeconds": 18,
+        }
+
+        await self.nordvpn.run_logout()
+        with self.assertRaises(NotLoggedInError):
+            await self.nordvpn.get_status()
+
+    async def test_get_countries_and_cities(self):
+        """Test the get_countries and get_cities methods."""
+        countries = await self.nordvpn.get_countries()
+        assert countries == [
+            "Mock_Country_1",
+            "Mock_Country_2",
+            "Mock_Country_3",
+            "Mock_Country_4",
+        ]
+        cities = await self.nordvpn.get_cities("Mock_Country_4")
+        assert cities == ["Mock_City_4_1", "Mock_City_4_2"]
+
+    async def test_commands_in_flight_together(self):
+        """Several commands can be awaited concurrently."""
+        countries = await self.nordvpn.get_countries()
+        results = await asyncio.gather(
+            *(self.nordvpn.get_cities(country) for country in countries)
+        )
+        assert [len(cities) for cities in results] == [2, 2, 2, 2]
+
+    async def test_disconnect_from_nordvpn(self):
+        """Test the disconnect_from_nordvpn method."""
+        await self.nordvpn.connect_to_location("Mock_Country_1")
+        result = await self.nordvpn.disconnect_from_nordvpn()
+        assert "you are disconnected" in result.lower()
+        result = await self.nordvpn.disconnect_from_nordvpn()
+        assert "you are not connected" in result.lower()
+
+    async def test_connect_progress(self):
+        """Connect and disconnect report every step the cli prints."""
+        events = []
+        await self.nordvpn.connect_to_location("Mock_City_1_1", progress=events.append)
+        assert [event["stage"] for event in events] == [
+            parsing.CONNECTING,
+            parsing.SERVER_CHOSEN,
+            parsing.CONNECTED,
+        ]
+        assert events[-1]["server"] == "Mock_Country_1 #123"
+
+        events.clear()
+        await self.nordvpn.disconnect_from_nordvpn(progress=events.append)
+        assert [event["stage"] for event in events] == [
+            parsing.DISCONNECTING,
+            parsing.DISCONNECTED,
+        ]
+
+    async def test_connect_timeout(self):
+        """A connect taking too long fails with CommandTimeoutError."""
+        config = MockConfig(commands={"connect": CommandProfile(latency=5.0)})
+        cmds = AsyncMockNordvpnCommands(config=config)
+        cmds.sync.nordvpn_login()
+        nordvpn = AsyncNordvpn(test=True, cmds=cmds)
+        events = []
+        with self.assertRaises(CommandTimeoutError):
+            await nordvpn.connect_to_location(
+                "Mock_Country_1", progress=events.append, timeout=0.05
+            )
+        assert events[-1]["stage"] == parsing.FAILED
+        assert (await nordvpn.get_connected()) is False
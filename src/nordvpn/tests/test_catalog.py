@@ -0,0 +1,138 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.catalog import LocationIndex
+from src.nordvpn.catalog_cache import CatalogCache
+from src.nordvpn.commands.mock_commands import (
+    MOCK_CITIES,
+    MOCK_COUNTRIES,
+    AsyncMockNordvpnCommands,
+)
+from src.nordvpn.commands.mock_config import synthetic_catalog
+
+
+class TestLocationIndex(unittest.TestCase):
+    """Tests for the LocationIndex class."""
+
+    def test_both_directions(self):
+        """Cities are found by country and countries by city."""
+        index = LocationIndex()
+        index.set_countries(["Country_1", "Country_2"])
+        index.set_cities("Country_1", ["City_1", "City_2"])
+        assert index.countries == ["Country_1", "Country_2"]
+        assert index.cities("Country_1") == ["City_1", "City_2"]
+        assert index.cities("Country_2") is None
+        assert index.country_of("City_2") == "Country_1"
+        assert index.is_country("Country_2") and not index.is_city("Country_2")
+        assert "City_1" in index and "Nowhere" not in index
+
+    def test_replace_cities(self):
+        """Replacing the cities of a country updates the reverse index."""
+        index = LocationIndex()
+        index.set_cities("Country_1", ["City_1"])
+        index.set_cities("Country_1", ["City_2"])
+        assert index.country_of("City_1") is None
+        assert index.country_of("City_2") == "Country_1"
+
+
+class FlakyAsyncNordvpn(AsyncNordvpn):
+    """AsyncNordvpn whose cities commands are slow and may fail."""
+
+    def __init__(self, *args, failing=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failing = failing
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _fetch_cities(self, country: str) -> list[str]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if country in self.failing:
+                raise ValueError(f"cities of {country} failed")
+            return await super()._fetch_cities(country)
+        finally:
+            self.in_flight -= 1
+
+
+class TestPrefetchCatalog(unittest.IsolatedAsyncioTestCase):
+    """Tests for the AsyncNordvpn.prefetch_catalog method."""
+
+    async def test_prefetch(self):
+        """All the cities are indexed, with bounded concurrency."""
+        nordvpn = FlakyAsyncNordvpn(test=True)
+        await nordvpn.run_login()
+        progress = []
+
+        result = await nordvpn.prefetch_catalog(
+            concurrency=2, progress=lambda *args: progress.append(args)
+        )
+
+        assert result.ok
+        assert nordvpn.max_in_flight == 2
+        assert [done for done, _, _ in progress] == [1, 2, 3, 4]
+        assert all(total == 4 for _, total, _ in progress)
+        for country, cities in MOCK_COUNTRIES.items():
+            assert result.index.cities(country) == cities
+        for city, country in MOCK_CITIES.items():
+            assert nordvpn.locations.country_of(city) == country
+
+    async def test_partial_failure(self):
+        """A failing country doesn't discard the others."""
+        nordvpn = FlakyAsyncNordvpn(test=True, failing=("Mock_Country_2",))
+        await nordvpn.run_login()
+
+        result = await nordvpn.prefetch_catalog()
+
+        assert list(result.failures) == ["Mock_Country_2"]
+        assert result.index.cities("Mock_Country_2") is None
+        assert result.index.cities("Mock_Country_3") == [
+            "Mock_City_3_1",
+            "Mock_City_3_2",
+        ]
+
+    async def test_prefetch_is_cached(self):
+        """The prefetched cities are saved once to the catalog cache."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = CatalogCache(Path(tmp_dir) / "catalog.json")
+            saves = []
+            cache.listeners.append(lambda: saves.append(1))
+            nordvpn = AsyncNordvpn(test=True, catalog_cache=cache)
+            await nordvpn.run_login()
+            await nordvpn.prefetch_catalog()
+
+            nordvpn = AsyncNordvpn(test=True, catalog_cache=CatalogCache(cache.path))
+            assert nordvpn.locations.country_of("Mock_City_4_2") == "Mock_Country_4"
+        # One save for the countries and one for the whole batch of cities.
+        assert len(saves) == 2
+
+    async def test_prefetch_stale_cache(self):
+        """Stale cities are refreshed before returning, with bounded
+        concurrency, and fresh ones aren't fetched again."""
+        catalog = synthetic_catalog(60, 2)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = CatalogCache(Path(tmp_dir) / "catalog.json", ttl=-1)
+            with cache.batch():
+                cache.set_countries(list(catalog))
+                for country in catalog:
+                    cache.set_cities(country, ["Old_City"])
+            nordvpn = FlakyAsyncNordvpn(
+                test=True,
+                catalog_cache=cache,
+                cmds=AsyncMockNordvpnCommands(catalog=catalog),
+            )
+            await nordvpn.run_login()
+
+            result = await nordvpn.prefetch_catalog(concurrency=4)
+            assert result.ok
+            assert nordvpn.max_in_flight == 4
+            assert all(cache.get_cities(c) == catalog[c] for c in catalog)
+
+            cache.ttl = 3600
+            nordvpn.max_in_flight = 0
+            await nordvpn.prefetch_catalog(concurrency=4)
+            assert nordvpn.max_in_flight == 0
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.catalog_cache import CACHE_VERSION, CatalogCache
+from src.nordvpn.nordvpn import Nordvpn
+
+
+class TestCatalogCache(unittest.TestCase):
+    """Tests for the CatalogCache class."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / "sub" / "catalog.json"
+
+    def test_round_trip(self):
+        """The lists are persisted and loaded by a new instance."""
+        cache = CatalogCache(self.path)
+        cache.set_countries(["Country_1", "Country_2"])
+        cache.set_cities("Country_1", ["City_1"])
+
+        cache = CatalogCache(self.path)
+        assert cache.get_countries() == ["Country_1", "Country_2"]
+        assert cache.get_cities("Country_1") == ["City_1"]
+        assert cache.get_cities("Country_2") is None
+        assert not cache.countries_stale()
+        assert [p.name for p in self.path.parent.iterdir()] == ["catalog.json"]
+
+    def test_ttl(self):
+        """Entries older than the ttl are stale but still returned."""
+        cache = CatalogCache(self.path, ttl=-1)
+        cache.set_countries(["Country_1"])
+        assert cache.countries_stale()
+        assert cache.cities_stale("Country_1")
+        assert cache.get_countries() == ["Country_1"]
+
+    def test_bad_files_are_ignored(self):
+        """A corrupt file or one of another version is treated as empty."""
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text("{not json")
+        assert CatalogCache(self.path).get_countries() is None
+
+        data = {"version": CACHE_VERSION + 1, "countries": {"items": ["Country_1"]}}
+        self.path.write_text(json.dumps(data))
+        assert CatalogCache(self.path).get_countries() is None
+
+        # Entries of the wrong shape are dropped, not the whole file.
+        data = {
+            "version": CACHE_VERSION,
+            "countries": {"items": ["Country_1"]},
+            "cities": {
+                "Country_1": {"items": ["City_1"], "updated_at": 1.0},
+                "Country_2": {"items": ["City_2"]},
+                "Country_3": ["City_3"],
+            },
+        }
+        self.path.write_text(json.dumps(data))
+        cache = CatalogCache(self.path)
+        assert cache.get_countries() is None
+        assert cache.all_cities() == {"Country_1": ["City_1"]}
+        assert cache.cities_stale("Country_2")
+
+    def test_failed_save_leaves_no_temporary_file(self):
+        cache = CatalogCache(self.path)
+        cache.set_countries(["Country_1"])
+        with mock.patch("json.dump", side_effect=TypeError("not serializable")):
+            with self.assertRaises(TypeError):
+                cache.save()
+        assert [p.name for p in self.path.parent.iterdir()] == ["catalog.json"]
+
+    def test_listeners(self):
+        """Listeners are called after every change."""
+        cache = CatalogCache(self.path)
+        listener = mock.Mock()
+        cache.listeners.append(listener)
+        cache.set_countries(["Country_1"])
+        cache.clear()
+        assert listener.call_count == 2
+
+
+class TestNordvpnCatalogCache(unittest.IsolatedAsyncioTestCase):
+    """Tests for the countries and cities served from the catalog cache."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / "catalog.json"
+
+    def test_sync_fresh_cache_runs_no_command(self):
+        """Fresh lists are served without the cli nor being logged in."""
+        nordvpn = Nordvpn(test=True, catalog_cache=CatalogCache(self.path))
+        nordvpn.run_login()
+        countries = nordvpn.get_countries()
+        cities = nordvpn.get_cities("Mock_Country_2")
+        nordvpn.run_logout()
+
+        nordvpn = Nordvpn(test=True, catalog_cache=CatalogCache(self.path))
+        with mock.patch.object(nordvpn.cmds, "nordvpn_countries") as cmd:
+            assert nordvpn.get_countries() == countries
+            assert nordvpn.get_cities("Mock_Country_2") == cities
+        cmd.assert_not_called()
+
+    async def test_async_stale_while_revalidate(self):
+        """A stale list is returned at once and refreshed in the background."""
+        cache = CatalogCache(self.path, ttl=-1)
+        cache.set_countries(["Old_Country"])
+        nordvpn = AsyncNordvpn(test=True, catalog_cache=cache)
+        await nordvpn.run_login()
+
+        assert await nordvpn.get_countries() == ["Old_Country"]
+        await asyncio.gather(*nordvpn._revalidating.values())
+        assert cache.get_countries()[0] == "Mock_Country_1"
+
+    async def test_async_forced_refresh(self):
+        """A refresh always runs the cli."""
+        cache = CatalogCache(self.path)
+        cache.set_countries(["Old_Country"])
+        nordvpn = AsyncNordvpn(test=True, catalog_cache=cache)
+        await nordvpn.run_login()
+
+        countries = await nordvpn.get_countries(refresh=True)
+        assert countries[0] == "Mock_Country_1"
+        assert CatalogCache(self.path).get_countries() == countries
@@ -0,0 +1,138 @@
+import time
+import unittest
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.async_commands import AsyncNordvpnCommands
+from src.nordvpn.commands.circuit_breaker import CircuitBreaker
+from src.nordvpn.commands.commands import NordvpnCommands
+from src.nordvpn.exceptions import CommandTimeoutError, DaemonUnavailableError
+from src.nordvpn.nordvpn import Nordvpn
+
+from .fake_nordvpn import FakeNordvpn
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for the states of the CircuitBreaker class."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=2, cooldown=10, clock=self.clock
+        )
+        self.changes = []
+        self.breaker.listeners.append(self.changes.append)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.failure("timeout")
+        self.breaker.success()
+        self.breaker.failure("timeout")
+        assert self.breaker.available
+        self.breaker.failure("timeout")
+        assert not self.breaker.available and self.changes == [False]
+        with self.assertRaises(DaemonUnavailableError):
+            self.breaker.before_call("status")
+        assert self.breaker.retry_in() == 10
+
+    def test_half_open_trial(self):
+        """After the cooldown a single trial call decides."""
+        self.breaker.failure("down")
+        self.breaker.failure("down")
+        self.clock.now = 10
+        trial = self.breaker.before_call("status")
+        # Only the trial goes through.
+        with self.assertRaises(DaemonUnavailableError):
+            self.breaker.before_call("account")
+        self.breaker.failure("down", trial)
+        assert self.breaker.retry_in() == 10
+
+        self.clock.now = 20
+        trial = self.breaker.before_call("status")
+        self.breaker.success(trial)
+        assert self.breaker.available and self.changes == [False, True]
+
+    def test_stale_calls_dont_decide(self):
+        """Calls from before the breaker opened don't end the trial."""
+        stale = self.breaker.before_call("connect")
+        self.breaker.failure("down")
+        self.breaker.failure("down")
+        self.clock.now = 10
+        trial = self.breaker.before_call("status")
+        self.breaker.success(stale)
+        self.breaker.cancelled(stale)
+        assert not self.breaker.available
+        with self.assertRaises(DaemonUnavailableError):
+            self.breaker.before_call("account")
+        self.breaker.success(trial)
+        assert self.breaker.available
+
+
+class TestBreakerCommands(unittest.IsolatedAsyncioTestCase):
+    """Tests for the timeouts and the breaker against a fake nordvpn."""
+
+    def setUp(self):
+        self.fake = FakeNordvpn(self)
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=2, cooldown=10, clock=self.clock
+        )
+
+    def test_sync_timeout(self):
+        """A hanging command is killed after its timeout."""
+        cmds = NordvpnCommands()
+        cmds.timeouts = {"account": 0.2}
+        nordvpn = Nordvpn(test=True, cmds=cmds, breaker=self.breaker)
+        self.fake.hang()
+        start = time.perf_counter()
+        with self.assertRaises(CommandTimeoutError):
+            nordvpn.get_logged_in()
+        assert time.perf_counter() - start < 5
+        assert self.breaker.failures == 1
+
+    async def test_async_timeout(self):
+        cmds = AsyncNordvpnCommands()
+        cmds.default_timeout = 0.2
+        nordvpn = AsyncNordvpn(test=True, cmds=cmds, breaker=self.breaker)
+        self.fake.hang()
+        with self.assertRaises(CommandTimeoutError):
+            await nordvpn.get_status()
+        assert self.breaker.failures == 1
+
+    async def test_connect_timeout_counts(self):
+        """A connect stopped by the facade's timeout is a failure."""
+        nordvpn = AsyncNordvpn(
+            test=True, cmds=AsyncNordvpnCommands(), breaker=self.breaker
+        )
+        assert await nordvpn.get_logged_in()
+        self.fake.hang()
+        with self.assertRaises(CommandTimeoutError):
+            await nordvpn.connect_to_location("Germany", timeout=0.2)
+        assert self.breaker.failures == 1
+
+    async def test_fails_fast_while_down(self):
+        """A stopped daemon opens the breaker, then nothing runs until it's back."""
+        nordvpn = AsyncNordvpn(
+            test=True, cmds=AsyncNordvpnCommands(), breaker=self.breaker
+        )
+        self.fake.down()
+        for _ in range(2):
+            # Not taken as logged out.
+            with self.assertRaises(DaemonUnavailableError):
+                await nordvpn.get_logged_in()
+        assert not self.breaker.available
+        with self.assertRaises(DaemonUnavailableError):
+            await nordvpn.get_status()
+        assert self.fake.calls() == ["account", "account"]
+
+        self.fake.up()
+        self.clock.now = 10
+        assert await nordvpn.get_logged_in()
+        assert self.breaker.available
+        assert (await nordvpn.get_status())["Status"] == "Disconnected"
@@ -0,0 +1,115 @@
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.nordvpn import cli
+from src.nordvpn.catalog_cache import CatalogCache
+from src.nordvpn.commands.circuit_breaker import CircuitBreaker
+from src.nordvpn.commands.commands import NordvpnCommands
+from src.nordvpn.nordvpn import Nordvpn
+
+from .fake_nordvpn import FakeNordvpn
+
+SESSION = Path(__file__).parent / "fixtures" / "session.jsonl"
+RUN_WITHOUT_TEXTUAL = """
+import sys
+from src.nordvpn import cli
+code = cli.main(["--mock", "status"])
+assert not [name for name in sys.modules if name.split(".")[0] == "textual"]
+sys.exit(code)
+"""
+
+
+class TestCli(unittest.TestCase):
+    """Tests for the headless command line interface."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = CatalogCache(Path(self.tmp.name) / "catalog.json")
+        self.nordvpn = Nordvpn(test=True, catalog_cache=self.cache)
+        self.nordvpn.cmds.nordvpn_login()
+
+    def run_cli(self, *argv: str) -> tuple[int, dict]:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = cli.main(list(argv), nordvpn=self.nordvpn)
+        return code, json.loads(stdout.getvalue() or stderr.getvalue())
+
+    def test_status(self):
+        code, data = self.run_cli("status")
+        assert code == cli.EXIT_OK
+        assert data["connected"] is False
+        assert data["status"]["Status"] == "Disconnected"
+
+    def test_countries_and_cities_from_cache(self):
+        """Listed locations are cached for the next calls."""
+        code, data = self.run_cli("countries")
+        assert code == cli.EXIT_OK and len(data["countries"]) == 4
+        code, data = self.run_cli("cities", "Mock_Country_2")
+        assert data["cities"] == ["Mock_City_2_1", "Mock_City_2_2"]
+
+        # Answered from the cache, even when logged out.
+        self.nordvpn.cmds.nordvpn_logout()
+        self.nordvpn.invalidate_login_cache()
+        self.nordvpn.catalog_cache = CatalogCache(self.cache.path)
+        code, data = self.run_cli("cities", "Mock_Country_2")
+        assert code == cli.EXIT_OK and len(data["cities"]) == 2
+
+    def test_connect_and_disconnect(self):
+        code, data = self.run_cli("connect", "Mock_City_1_1")
+        assert code == cli.EXIT_OK and data["ok"] is True
+        assert data["progress"]["hostname"] == "mc123.nordvpn.com"
+        code, data = self.run_cli("disconnect")
+        assert code == cli.EXIT_OK
+        assert data["progress"]["stage"] == "disconnected"
+
+    def test_errors(self):
+        code, data = self.run_cli("cities", "Nowhere")
+        assert code == cli.EXIT_FAILED and data["error"] == "UnknownLocationError"
+        assert "does not exist" in data["message"]
+        code, data = self.run_cli("connect", "Nowhere")
+        assert code == cli.EXIT_FAILED and data["ok"] is False
+        self.nordvpn.cmds.nordvpn_logout()
+        self.nordvpn.invalidate_login_cache()
+        code, data = self.run_cli("status")
+        assert code == cli.EXIT_NOT_LOGGED_IN
+        assert data["error"] == "NotLoggedInError"
+
+    def test_daemon_unavailable(self):
+        FakeNordvpn(self).down()
+        self.nordvpn = Nordvpn(
+            test=True, cmds=NordvpnCommands(), breaker=CircuitBreaker()
+        )
+        code, data = self.run_cli("status")
+        assert code == cli.EXIT_UNAVAILABLE
+        assert data["error"] == "DaemonUnavailableError"
+
+    def test_replay(self):
+        """A recorded session answers instead of the cli."""
+        code, data = self.run_replay("cities", "Germany")
+        assert code == cli.EXIT_OK and data["cities"][0] == "Berlin"
+        code, data = self.run_replay("connect", "Tokyo")
+        assert code == cli.EXIT_UNAVAILABLE and data["error"] == "ReplayMissError"
+
+    def run_replay(self, *argv: str) -> tuple[int, dict]:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = cli.main(["--replay", str(SESSION), *argv])
+        return code, json.loads(stdout.getvalue() or stderr.getvalue())
+
+    def test_runs_without_textual(self):
+        """The cli doesn't import textual, as run from a script."""
+        completed = subprocess.run(
+            [sys.executable, "-c", RUN_WITHOUT_TEXTUAL],
+            capture_output=True,
+            check=False,
+            text=True,
+        )
+        assert completed.returncode == 0, completed.stderr
+        assert json.loads(completed.stdout)["connected"] is False
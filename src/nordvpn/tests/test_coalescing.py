@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.coalescing import CoalescingNordvpnCommands
+from src.nordvpn.commands.mock_commands import AsyncMockNordvpnCommands
+from src.nordvpn.tests.counting_mock import CountingAsyncMockNordvpnCommands
+
+
+class TestCoalescingNordvpnCommands(unittest.IsolatedAsyncioTestCase):
+    """Tests for the CoalescingNordvpnCommands class."""
+
+    async def asyncSetUp(self):
+        self.mock = CountingAsyncMockNordvpnCommands(latency=0.01)
+        self.mock.sync.nordvpn_login()
+        self.cmds = CoalescingNordvpnCommands(self.mock)
+
+    async def test_concurrent_reads_share_one_process(self):
+        """Identical concurrent reads run once, different ones don't."""
+        results = await asyncio.gather(
+            *(self.cmds.nordvpn_status() for _ in range(5)),
+            self.cmds.nordvpn_cities("Mock_Country_1"),
+            self.cmds.nordvpn_cities("Mock_Country_1"),
+            self.cmds.nordvpn_cities("Mock_Country_2"),
+        )
+        assert self.mock.calls["nordvpn_status"] == 1
+        assert self.mock.calls["nordvpn_cities"] == 2
+        assert all(result is results[0] for result in results[:5])
+
+        # Once finished, the next read runs again.
+        await self.cmds.nordvpn_status()
+        assert self.mock.calls["nordvpn_status"] == 2
+
+    async def test_mutations_are_barriers(self):
+        """Reads issued during a mutation wait for it and aren't shared."""
+        before = asyncio.ensure_future(self.cmds.nordvpn_status())
+        await asyncio.sleep(0)
+        connect = asyncio.ensure_future(self.cmds.nordvpn_connect("Mock_Country_1"))
+        await asyncio.sleep(0)
+        after = asyncio.ensure_future(self.cmds.nordvpn_status())
+
+        await asyncio.gather(before, connect, after)
+        assert b"Disconnected" in before.result().stdout
+        assert b"Connected" in after.result().stdout
+        assert self.mock.calls["nordvpn_status"] == 2
+
+    async def test_status_doesnt_wait_long_for_mutations(self):
+        """A status read gives up waiting for a slow mutation."""
+        release = asyncio.Event()
+
+        async def slow_connect(place):
+            await release.wait()
+            return await AsyncMockNordvpnCommands.nordvpn_connect(self.mock, place)
+
+        self.mock.nordvpn_connect = slow_connect
+        self.cmds.status_wait = 0.05
+        connect = asyncio.ensure_future(self.cmds.nordvpn_connect("Mock_Country_1"))
+        await asyncio.sleep(0)
+        status = await asyncio.wait_for(self.cmds.nordvpn_status(), 1)
+        assert b"Disconnected" in status.stdout
+        assert not connect.done()
+
+        # Other reads still wait for it.
+        countries = asyncio.ensure_future(self.cmds.nordvpn_countries())
+        await asyncio.sleep(0.05)
+        assert not countries.done()
+        release.set()
+        await asyncio.gather(connect, countries)
+
+    def test_event_made_in_running_loop(self):
+        """The instance can be used from loops made after it."""
+        cmds = CoalescingNordvpnCommands(CountingAsyncMockNordvpnCommands(latency=0.01))
+        for _ in range(2):
+            asyncio.run(cmds.nordvpn_status())
+            asyncio.run(cmds.nordvpn_countries())
+
+    async def test_errors_are_shared(self):
+        """A failing read raises for every caller."""
+        failing = mock.Mock(side_effect=OSError("nordvpn not found"))
+        failing.__name__ = "nordvpn_cities"
+        self.mock.sync.nordvpn_cities = failing
+        results = await asyncio.gather(
+            self.cmds.nordvpn_cities("Mock_Country_1"),
+            self.cmds.nordvpn_cities("Mock_Country_1"),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, OSError) for result in results)
+        assert self.mock.calls["nordvpn_cities"] == 1
+
+    async def test_facade_status_storm(self):
+        """Concurrent get_status calls of the facade run one process each kind."""
+        nordvpn = AsyncNordvpn(test=True)
+        nordvpn.cmds = CoalescingNordvpnCommands(self.mock)
+        await asyncio.gather(*(nordvpn.get_status() for _ in range(10)))
+        assert self.mock.calls["nordvpn_account"] == 1
+        assert self.mock.calls["nordvpn_status"] == 1
@@ -0,0 +1,112 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.nordvpn import history
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.history import ConnectionHistory
+from src.nordvpn.parsing import Status
+
+
+def status(state: str, city: str | None = None) -> Status:
+    connected = state == "Connected"
+    return Status(
+        Status=state,
+        Hostname="mc123.nordvpn.com" if connected else None,
+        Country="Mock_Country_1" if connected else None,
+        City=city,
+        IP="123.123.123.1" if connected else None,
+        Technology="NORDLYNX" if connected else None,
+        Uptime=None,
+    )
+
+
+class TestConnectionHistory(unittest.TestCase):
+    """Tests for the ConnectionHistory class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "sub" / "history.sqlite3"
+        self.history = ConnectionHistory(self.path)
+        self.addCleanup(self.history.close)
+
+    def test_location_queries(self):
+        for ts, location, outcome in [
+            (1, "A", "connected"),
+            (2, "B", "connected"),
+            (3, "A", "failed"),
+            (4, "A", "connected"),
+            (5, "C", "timeout"),
+            (6, "B", "connected"),
+            (7, "B", "connected"),
+        ]:
+            self.history.record(history.CONNECT, location, outcome=outcome, ts=ts)
+        assert self.history.recent_locations() == ["B", "A"]
+        assert self.history.recent_locations(limit=1) == ["B"]
+        assert self.history.most_used_locations() == [("B", 3), ("A", 2)]
+        assert self.history.success_rates() == {"A": 2 / 3, "B": 1.0, "C": 0.0}
+
+    def test_status_changes_and_uptime(self):
+        """Only changes are recorded, and ended connections count as uptime."""
+        self.history.observe_status(status("Disconnected"), ts=0)
+        self.history.observe_status(status("Connected", "X"), ts=10)
+        self.history.observe_status(status("Connected", "X"), ts=20)
+        self.history.observe_status(status("Disconnected"), ts=70)
+        self.history.observe_status(status("Connected", "Y"), ts=100)
+        assert self.history.total_uptime(now=130) == 60 + 30
+
+        rows = self.history.db.execute("SELECT kind, location FROM events").fetchall()
+        kinds = [row["kind"] for row in rows]
+        assert kinds.count(history.STATUS) == 4
+        assert kinds.count(history.SESSION) == 1
+
+        # Another process picks up the connection where it was.
+        self.history.close()
+        reopened = ConnectionHistory(self.path)
+        self.addCleanup(reopened.close)
+        reopened.observe_status(status("Disconnected"), ts=200)
+        assert reopened.total_uptime(now=1000) == 60 + 100
+
+
+class TestHistoryOfFacade(unittest.IsolatedAsyncioTestCase):
+    """Tests for the history kept by AsyncNordvpn."""
+
+    async def asyncSetUp(self):
+        self.history = ConnectionHistory(":memory:")
+        self.nordvpn = AsyncNordvpn(test=True, history=self.history)
+        await self.nordvpn.run_login()
+
+    async def asyncTearDown(self):
+        self.history.close()
+
+    async def test_commands_and_statuses_are_recorded(self):
+        await self.nordvpn.connect_to_location("Mock_City_1_1")
+        await self.nordvpn.get_status()
+        await self.nordvpn.disconnect_from_nordvpn()
+        await self.nordvpn.get_status()
+
+        rows = self.history.db.execute(
+            "SELECT kind, location, hostname, technology, outcome FROM events"
+        ).fetchall()
+        assert [tuple(row) for row in rows] == [
+            ("connect", "Mock_City_1_1", "mc123.nordvpn.com", None, "connected"),
+            ("status", "Mock_City_1_1", "mc123.nordvpn.com", "NORDLYNX", "Connected"),
+            ("disconnect", None, None, None, "disconnected"),
+            ("session", "Mock_City_1_1", "mc123.nordvpn.com", "NORDLYNX", "ended"),
+            ("status", None, None, None, "Disconnected"),
+        ]
+        assert self.nordvpn.recent_locations() == ["Mock_City_1_1"]
+
+    async def test_unchanged_statuses_arent_written(self):
+        """Only the connection changes seen by the monitor reach the history."""
+        with mock.patch.object(
+            self.history, "observe_status", wraps=self.history.observe_status
+        ) as observe_status:
+            for _ in range(5):
+                await self.nordvpn.get_status()
+            await self.nordvpn.connect_to_location("Mock_City_1_1")
+            for _ in range(5):
+                await self.nordvpn.get_status()
+        assert observe_status.call_count == 2
@@ -0,0 +1,107 @@
+import io
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.nordvpn import log
+
+NO_LEVEL = """
+import logging
+import src.nordvpn.log
+assert logging.getLogger("src.nordvpn").level == logging.NOTSET
+assert logging.getLogger("src").level == logging.NOTSET
+"""
+
+NO_TEXTUAL = """
+import sys
+import src.nordvpn.log, src.nordvpn.async_nordvpn
+assert "textual" not in sys.modules, "textual imported"
+"""
+
+
+class Expensive:
+    """Argument counting how many times it's formatted."""
+
+    formatted = 0
+
+    def __str__(self):
+        Expensive.formatted += 1
+        return "expensive"
+
+
+class TestLog(unittest.TestCase):
+    """Tests for the logging facade."""
+
+    def setUp(self):
+        self.logger = log.get_logger("src.nordvpn.test_log")
+        self.addCleanup(log.configure, logging.WARNING)
+        Expensive.formatted = 0
+
+    def test_disabled_by_default(self):
+        """Debug records aren't formatted, and cost about a level check."""
+        log.configure(logging.WARNING)
+        start = time.perf_counter()
+        for _ in range(100_000):
+            self.logger.debug("state %s", Expensive())
+        elapsed = time.perf_counter() - start
+        assert Expensive.formatted == 0
+        assert elapsed < 0.5, elapsed
+
+    def test_text_handler(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        log.configure(logging.DEBUG, handlers=[handler])
+        self.logger.debug("state %s", Expensive())
+        assert "state expensive" in stream.getvalue()
+
+    def test_json_lines_with_durations(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "logs" / "tui.jsonl"
+            handlers = log.configure("debug", json_file=path)
+            self.logger.info("hello %s", "there")
+            with log.timed(self.logger, "connect"):
+                pass
+            for handler in handlers:
+                handler.close()
+            records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert records[0]["message"] == "hello there"
+        assert records[0]["level"] == "INFO"
+        assert records[0]["logger"] == "src.nordvpn.test_log"
+        assert records[0]["ts"] > 0
+        assert records[1]["message"].startswith("connect took")
+        assert records[1]["duration"] >= 0
+
+    def test_tui_loggers(self):
+        """The tui loggers go to the same sinks, nothing else under src."""
+        assert log.ROOTS == ("src.nordvpn", "src.tui")
+        stream = io.StringIO()
+        log.configure(logging.DEBUG, handlers=[logging.StreamHandler(stream)])
+        log.get_logger("src.tui.test_log").debug("from the tui")
+        assert "from the tui" in stream.getvalue()
+        assert not logging.getLogger("src").handlers
+
+    def test_rotating_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tui.log"
+            handlers = log.configure(logging.INFO, file=path)
+            assert handlers[0].maxBytes == log.MAX_BYTES
+            self.logger.warning("careful")
+            handlers[0].close()
+            assert "WARNING" in path.read_text()
+
+    def test_import_leaves_the_level(self):
+        completed = subprocess.run(
+            [sys.executable, "-c", NO_LEVEL], capture_output=True, check=False
+        )
+        assert completed.returncode == 0, completed.stderr.decode()
+
+    def test_nordvpn_package_doesnt_import_textual(self):
+        completed = subprocess.run(
+            [sys.executable, "-c", NO_TEXTUAL], capture_output=True, check=False
+        )
+        assert completed.returncode == 0, completed.stderr.decode()
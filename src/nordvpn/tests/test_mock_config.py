@@ -0,0 +1,108 @@
+import time
+import unittest
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.mock_commands import (
+    AsyncMockNordvpnCommands,
+    MockNordvpnCommands,
+)
+from src.nordvpn.commands.mock_config import (
+    CommandProfile,
+    MockConfig,
+    synthetic_catalog,
+)
+from src.nordvpn.exceptions import CommandTimeoutError
+from src.nordvpn.nordvpn import Nordvpn
+
+
+class TestMockConfig(unittest.TestCase):
+    """Tests for the MockConfig class."""
+
+    def test_reproducible(self):
+        """The same seed draws the same outcomes."""
+        profile = CommandProfile(0.1, 0.05, failure_rate=0.2, timeout_rate=0.1)
+        configs = [MockConfig(default=profile, seed=3) for _ in range(2)]
+        outcomes = [[config.sample("status") for _ in range(50)] for config in configs]
+        assert outcomes[0] == outcomes[1]
+        assert all(0.05 <= o.delay <= 0.15 for o in outcomes[0] if not o.timed_out)
+        assert any(o.failed for o in outcomes[0])
+        assert any(o.timed_out for o in outcomes[0])
+
+    def test_per_command_profiles(self):
+        config = MockConfig(
+            default=CommandProfile(0.5, distribution="constant"),
+            commands={"nordvpn_cities": CommandProfile(2.0, distribution="constant")},
+        )
+        assert config.sample("nordvpn_status").delay == 0.5
+        assert config.sample("cities").delay == 2.0
+        with self.assertRaises(ValueError):
+            CommandProfile(distribution="zipf")
+
+    def test_synthetic_catalog(self):
+        catalog = synthetic_catalog(1000, 10)
+        assert len(catalog) == 1000
+        assert catalog["Country_0042"][7] == "City_0042_0007"
+
+
+class TestConfiguredMocks(unittest.IsolatedAsyncioTestCase):
+    """Tests for the mock commands with latency, failures and big catalogs."""
+
+    def test_sync_big_catalog(self):
+        """The facade parses a synthetic catalog of thousands of entries."""
+        cmds = MockNordvpnCommands(catalog=synthetic_catalog(2000, 5))
+        nordvpn = Nordvpn(test=True, cmds=cmds)
+        nordvpn.run_login()
+        countries = nordvpn.get_countries()
+        assert len(countries) == 2000
+        assert nordvpn.get_cities("Country_1999")[-1] == "City_1999_0004"
+        nordvpn.connect_to_location("City_0500_0003")
+        assert nordvpn.get_status()["Country"] == "Country_0500"
+
+    def test_sync_latency_and_failure(self):
+        cmds = MockNordvpnCommands(
+            config=MockConfig(
+                commands={
+                    "status": CommandProfile(0.05, distribution="constant"),
+                    "countries": CommandProfile(failure_rate=1.0),
+                    "account": CommandProfile(timeout_rate=1.0),
+                },
+                hang=0.01,
+            )
+        )
+        start = time.perf_counter()
+        cmds.nordvpn_status()
+        assert time.perf_counter() - start >= 0.05
+        failed = cmds.nordvpn_countries()
+        assert failed.returncode == 1 and b"Whoops!" in failed.stdout
+        with self.assertRaises(CommandTimeoutError):
+            cmds.nordvpn_account()
+        # Like with the real cli, a timed out account isn't a logout.
+        with self.assertRaises(CommandTimeoutError):
+            Nordvpn(test=True, cmds=cmds).get_logged_in()
+
+    async def test_async_latency_doesnt_block(self):
+        """Concurrent slow commands overlap instead of adding up."""
+        cmds = AsyncMockNordvpnCommands(
+            config=MockConfig.uniform(0.1), catalog=synthetic_catalog(20, 2)
+        )
+        cmds.sync.nordvpn_login()
+        nordvpn = AsyncNordvpn(test=True, cmds=cmds)
+        start = time.perf_counter()
+        result = await nordvpn.prefetch_catalog(concurrency=20)
+        # countries, account and all the cities: three rounds of latency.
+        assert time.perf_counter() - start < 0.5
+        assert result.ok and len(result.index) == 60
+
+    async def test_async_failures_are_recorded(self):
+        cmds = AsyncMockNordvpnCommands(
+            config=MockConfig(
+                commands={"cities": CommandProfile(timeout_rate=0.5)}, hang=0.01
+            ),
+            catalog=synthetic_catalog(40, 2),
+        )
+        cmds.sync.nordvpn_login()
+        result = await AsyncNordvpn(test=True, cmds=cmds).prefetch_catalog()
+        assert 0 < len(result.failures) < 40
+        assert all(
+            isinstance(exc, CommandTimeoutError) for exc in result.failures.values()
+        )
@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 
 from src.nordvpn.exceptions import NotLoggedInError, NotLoggedOutError
 from src.nordvpn.nordvpn import Nordvpn
@@ -87,10 +88,15 @@ class TestNordvpn(unittest.TestCase):
         assert isinstance(status, dict)
         assert status == {
             "Status": "Connected",
+            "Hostname": "mc123.nordvpn.com",
             "Country": "Mock_Country_1",
             "City": "Mock_City_1_1",
             "IP": "123.123.123.1",
+            "Technology": "NORDLYNX",
             "Uptime": "18 seconds",
+            "Received": 40868,
+            "Sent": 49428,
+            "UptimeSeconds": 18,
         }
 
         # Logged out case:
@@ -109,10 +115,15 @@ class TestNordvpn(unittest.TestCase):
         assert isinstance(status, dict)
         assert status == {
             "Status": "Disconnected",
+            "Hostname": None,
             "Country": None,
             "City": None,
             "IP": None,
+            "Technology": None,
             "Uptime": None,
+            "Received": None,
+            "Sent": None,
+            "UptimeSeconds": None,
         }
 
         # Logged out case:
@@ -179,3 +190,58 @@ class TestNordvpn(unittest.TestCase):
         self.nordvpn.run_logout()
         with self.assertRaises(NotLoggedInError):
             self.nordvpn.disconnect_from_nordvpn()
+
+
+class TestNordvpnLoginCache(unittest.TestCase):
+    """Tests for the cached logged in state of the Nordvpn class."""
+
+    def setUp(self):
+        self.nordvpn = Nordvpn(test=True)
+        self.nordvpn.run_login()
+        self.account = mock.patch.object(
+            self.nordvpn.cmds,
+            "nordvpn_account",
+            wraps=self.nordvpn.cmds.nordvpn_account,
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_account_checked_once_within_ttl(self):
+        """Consecutive commands reuse the cached logged in state."""
+        self.nordvpn.get_status()
+        self.nordvpn.get_countries()
+        self.nordvpn.get_connected()
+        assert self.account.call_count == 1
+
+    def test_account_checked_again_after_ttl(self):
+        """An expired cache runs nordvpn account again."""
+        self.nordvpn.login_ttl = 0.0
+        self.nordvpn.get_status()
+        self.nordvpn.get_status()
+        assert self.account.call_count == 2
+
+    def test_logout_updates_cache(self):
+        """Logging out is known without running nordvpn account."""
+        self.nordvpn.get_status()
+        self.nordvpn.run_logout()
+        self.account.reset_mock()
+        assert not self.nordvpn.get_logged_in()
+        assert self.account.call_count == 0
+
+    def test_login_invalidates_cache(self):
+        """Logging in forces a new check of the account."""
+        self.nordvpn.run_logout()
+        self.account.reset_mock()
+        self.nordvpn.run_login()
+        assert self.nordvpn.get_logged_in()
+        assert self.account.call_count == 1
+
+    def test_not_logged_in_output_flips_cache(self):
+        """A "not logged in" answer from any command updates the cache."""
+        self.nordvpn.get_status()
+        # Log out behind the back of the Nordvpn instance.
+        self.nordvpn.cmds.nordvpn_logout()
+        with self.assertRaises(NotLoggedInError):
+            self.nordvpn.connect_to_location("Mock_Country_1")
+        self.account.reset_mock()
+        assert not self.nordvpn.get_logged_in()
+        assert self.account.call_count == 0
@@ -0,0 +1,123 @@
+import unittest
+
+from src.benchmarks import bench_parsing
+from src.nordvpn import parsing
+
+# Generous per-call budgets for 5000 entries, several times the timings
+# on a laptop, so only real regressions (like a quadratic regex) fail.
+BENCHMARK_SIZE = 5000
+BUDGETS = {
+    "strip_spinner list": 0.02,
+    "parse_list": 0.03,
+    "parse_status": 0.03,
+    "strip_spinner account": 0.01,
+    "parse_account": 0.001,
+}
+
+
+class TestParsing(unittest.TestCase):
+    """Tests for the parsing module."""
+
+    def test_strip_spinner(self):
+        """Spinner frames are removed from every line."""
+        raw = b"\r-\r  \r\r-\r\\\r|\r  \rConnecting to X\n\r-\r\\\r  \rConnected!\n\r-\r  \r"
+        assert parsing.strip_spinner(raw) == "Connecting to X\nConnected!\n"
+
+    def test_parse_list(self):
+        """Items are split on runs of tabs and newlines."""
+        output = "Country_1\t\tCountry_2\t\t\tCountry_3\nCountry_4\n"
+        assert parsing.parse_list(output) == [
+            "Country_1",
+            "Country_2",
+            "Country_3",
+            "Country_4",
+        ]
+
+    def test_parse_status(self):
+        """Only the known fields are kept."""
+        output = (
+            "Status: Connected\nCurrent technology: NORDLYNX\n"
+            "Current protocol: UDP\nUptime: 18 seconds\n"
+        )
+        assert parsing.parse_status(output) == {
+            "Status": "Connected",
+            "Hostname": None,
+            "Country": None,
+            "City": None,
+            "IP": None,
+            "Technology": "NORDLYNX",
+            "Uptime": "18 seconds",
+            "Received": None,
+            "Sent": None,
+            "UptimeSeconds": 18,
+        }
+
+    def test_parse_transfer_and_uptime(self):
+        """The transfer and uptime are also parsed to numbers."""
+        output = (
+            "Status: Connected\n"
+            "Transfer: 39.91 KiB received, 1.50 GiB sent\n"
+            "Uptime: 1 day 2 hours 5 minutes 18 seconds\n"
+        )
+        status = parsing.parse_status(output)
+        assert status["Received"] == 40868
+        assert status["Sent"] == 3 * 2**29
+        assert status["UptimeSeconds"] == 86400 + 7200 + 300 + 18
+        assert parsing.parse_transfer("nothing") == (None, None)
+        assert parsing.parse_uptime("just now") is None
+
+    def test_parse_account(self):
+        """Email and expiration are extracted."""
+        output = (
+            "Account Information:\n"
+            "Email Address: someone@mail.org\n"
+            "VPN Service: Active (Expires on Jul 15th, 2025)\n"
+        )
+        assert parsing.parse_account(output) == {
+            "email": "someone@mail.org",
+            "expiration": "Expires on Jul 15th, 2025",
+        }
+
+    def test_output_lines(self):
+        """Chunks are joined into lines, keeping what's after the spinner."""
+        lines = parsing.OutputLines()
+        assert lines.feed(b"\r-\r  \rConnecting to X #1") == []
+        assert lines.feed(b" (x1.nordvpn.com)\n\r-\r\\") == [
+            "Connecting to X #1 (x1.nordvpn.com)"
+        ]
+        assert lines.feed(b"\r  \r\n\rYou are connected to X #1!") == []
+        assert lines.close() == ["You are connected to X #1!"]
+        assert lines.close() == []
+
+    def test_parse_progress(self):
+        """The steps of connect and disconnect are recognized."""
+        progress = parsing.parse_progress("Connecting to X #1 (x1.nordvpn.com)")
+        assert progress["stage"] == parsing.SERVER_CHOSEN
+        assert progress["server"] == "X #1"
+        assert progress["hostname"] == "x1.nordvpn.com"
+        progress = parsing.parse_progress("You are connected to X #1 (x1.nordvpn.com)!")
+        assert progress["stage"] == parsing.CONNECTED
+        assert progress["server"] == "X #1"
+        progress = parsing.parse_progress("You are disconnected from NordVPN.")
+        assert progress["stage"] == parsing.DISCONNECTED
+        progress = parsing.parse_progress("Whoops! Cannot reach System Daemon.")
+        assert progress["stage"] == parsing.FAILED
+        assert parsing.parse_progress("How would you rate your connection?") is None
+
+    def test_large_synthetic_outputs(self):
+        """The synthetic benchmark outputs are parsed right."""
+        raw = bench_parsing.synthetic_list_output(BENCHMARK_SIZE)
+        items = parsing.parse_list(parsing.strip_spinner(raw))
+        assert len(items) == BENCHMARK_SIZE
+        assert items[-1] == f"Location_{BENCHMARK_SIZE - 1}"
+
+        raw = bench_parsing.synthetic_status_output(BENCHMARK_SIZE)
+        status = parsing.parse_status(parsing.strip_spinner(raw))
+        assert status["Status"] == "Connected"
+        assert status["Uptime"] == "18 seconds"
+
+    def test_benchmark_budgets(self):
+        """The parsers stay within their time budgets."""
+        for timing in bench_parsing.run(BENCHMARK_SIZE, number=3, repeat=3):
+            name = timing.name.rsplit(" (", 1)[0]
+            assert timing.best < BUDGETS[name], str(timing)
@@ -0,0 +1,110 @@
+import time
+import unittest
+from pathlib import Path
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.replay import (
+    AsyncReplayNordvpnCommands,
+    Recording,
+    RecordingNordvpnCommands,
+    Replayer,
+    ReplayNordvpnCommands,
+    load_fixture,
+)
+from src.nordvpn.exceptions import ReplayMissError
+from src.nordvpn.nordvpn import Nordvpn
+from src.nordvpn.tests.fake_nordvpn import FakeNordvpn
+
+SESSION = Path(__file__).parent / "fixtures" / "session.jsonl"
+
+FAKE_NORDVPN = """#!/bin/sh
+if [ "$1" = "status" ]; then
+    printf 'Status: Disconnected\\n\\377'
+else
+    echo "Whoops! Unknown command" >&2
+    exit 64
+fi
+"""
+
+
+class TestRecording(unittest.TestCase):
+    """Tests for the recordings and their replay order."""
+
+    def test_json_round_trip(self):
+        """Any bytes survive the fixture, even if they aren't utf-8."""
+        recording = Recording(["nordvpn", "status"], 0, b"\r-\r \xff\n", b"err", 0.5)
+        assert Recording.from_json(recording.to_json()) == recording
+
+    def test_replay_order(self):
+        """Each argv gets its recordings in order, then the last one again."""
+        replayer = Replayer(
+            Recording(["nordvpn", "status"], 0, f"{k}".encode()) for k in range(2)
+        )
+        answers = [replayer.next(["nordvpn", "status"]).stdout for _ in range(3)]
+        assert answers == [b"0", b"1", b"1"]
+        with self.assertRaises(ReplayMissError):
+            replayer.next(["nordvpn", "countries"])
+
+
+class TestRecordAndReplay(unittest.TestCase):
+    """Tests for recording the real commands and replaying them."""
+
+    def setUp(self):
+        fake = FakeNordvpn(self, script=FAKE_NORDVPN)
+        self.fixture = fake.dir / "fixtures" / "session.jsonl"
+
+    def test_record_then_replay(self):
+        recorder = RecordingNordvpnCommands(self.fixture)
+        recorded = [recorder.nordvpn_status(), recorder.nordvpn_cities("Nowhere")]
+        recordings = load_fixture(self.fixture)
+        assert [r.argv for r in recordings] == [
+            ["nordvpn", "status"],
+            ["nordvpn", "cities", "Nowhere"],
+        ]
+        assert recordings[0].stdout == b"Status: Disconnected\n\xff"
+        assert recordings[0].duration > 0
+        assert recordings[1].stderr == b"Whoops! Unknown command\n"
+
+        replay = ReplayNordvpnCommands(recordings)
+        replayed = [replay.nordvpn_status(), replay.nordvpn_cities("Nowhere")]
+        for original, answer in zip(recorded, replayed):
+            assert (answer.returncode, answer.stdout, answer.stderr) == (
+                original.returncode,
+                original.stdout,
+                original.stderr,
+            )
+
+    def test_replay_timing(self):
+        recordings = [
+            Recording(["nordvpn", "status"], 0, b"Status: Connected\n", duration=1.0)
+        ]
+        start = time.perf_counter()
+        ReplayNordvpnCommands(recordings, timing=0.05).nordvpn_status()
+        assert time.perf_counter() - start >= 0.05
+
+
+class TestReplayedNordvpn(unittest.IsolatedAsyncioTestCase):
+    """Tests for the facades over a recorded session."""
+
+    def test_sync_session(self):
+        nordvpn = Nordvpn(test=True, cmds=ReplayNordvpnCommands(load_fixture(SESSION)))
+        assert nordvpn.get_status()["Status"] == "Disconnected"
+        assert "Germany" in nordvpn.get_countries()
+        assert nordvpn.get_cities("Germany") == ["Berlin", "Frankfurt", "Hamburg"]
+        assert "You are connected" in nordvpn.connect_to_location("Berlin")
+        status = nordvpn.get_status()
+        assert status["City"] == "Berlin" and status["UptimeSeconds"] == 12
+
+    async def test_async_session_streams_progress(self):
+        cmds = AsyncReplayNordvpnCommands(load_fixture(SESSION), timing=0.01)
+        nordvpn = AsyncNordvpn(test=True, cmds=cmds)
+        assert await nordvpn.get_logged_in()
+        events = []
+        await nordvpn.connect_to_location("Berlin", progress=events.append)
+        assert [e["stage"] for e in events] == [
+            "connecting",
+            "server_chosen",
+            "connected",
+        ]
+        with self.assertRaises(ReplayMissError):
+            await nordvpn.connect_to_location("Tokyo")
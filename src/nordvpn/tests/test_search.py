@@ -0,0 +1,53 @@
+import unittest
+
+from src.nordvpn.catalog import LocationIndex
+from src.nordvpn.nordvpn import Nordvpn
+from src.nordvpn.search import SearchIndex, normalize
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Tests for the SearchIndex class."""
+
+    def setUp(self):
+        locations = LocationIndex()
+        locations.set_countries(["Germany", "United_States", "United_Kingdom"])
+        locations.set_cities("Germany", ["Berlin", "Frankfurt"])
+        locations.set_cities("United_States", ["Los_Angeles", "San_Francisco"])
+        locations.set_cities("United_Kingdom", ["London", "Manchester"])
+        self.index = SearchIndex.from_locations(locations)
+
+    def test_normalize(self):
+        assert normalize("  Los_Angeles ") == "los angeles"
+
+    def test_prefix_ranking(self):
+        """Names starting with the query go before word matches."""
+        assert self.index.search("united") == ["United_States", "United_Kingdom"]
+        assert self.index.search("ang") == ["Los_Angeles"]
+        assert self.index.search("san f") == ["San_Francisco"]
+        assert self.index.search("f")[0] == "Frankfurt"
+        assert self.index.search("") == []
+
+    def test_fuzzy(self):
+        """Typos still find the location."""
+        assert self.index.search("germny")[0] == "Germany"
+        assert self.index.search("londn")[0] == "London"
+        assert self.index.search("xyzzy") == []
+
+    def test_cities_know_their_country(self):
+        assert self.index.country_of["Berlin"] == "Germany"
+        assert "Germany" not in self.index.country_of
+
+
+class TestNordvpnSearchIndex(unittest.TestCase):
+    """Tests for the search index of the facade."""
+
+    def test_rebuilt_only_on_change(self):
+        nordvpn = Nordvpn(test=True)
+        nordvpn.run_login()
+        first = nordvpn.search_index()
+        assert nordvpn.search_index() is first
+        nordvpn.get_countries()
+        nordvpn.get_cities("Mock_Country_1")
+        index = nordvpn.search_index()
+        assert index is not first
+        assert index.search("mock city 1 1")[0] == "Mock_City_1_1"
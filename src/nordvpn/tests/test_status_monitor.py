@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.parsing import STATUS_KEYS
+
+
+class TestStatusMonitor(unittest.IsolatedAsyncioTestCase):
+    """Tests for the StatusMonitor class."""
+
+    async def asyncSetUp(self):
+        self.nordvpn = AsyncNordvpn(test=True)
+        await self.nordvpn.run_login()
+        self.monitor = self.nordvpn.status_monitor
+        self.monitor.fast_interval = 0.01
+        self.monitor.slow_interval = 0.08
+        self.events = []
+        self.monitor.listeners.append(
+            lambda status, changed: self.events.append((status, changed))
+        )
+
+    async def asyncTearDown(self):
+        await self.monitor.stop()
+
+    async def test_change_only_notifications(self):
+        """Listeners are only called when a field changes."""
+        await self.nordvpn.get_status()
+        await self.nordvpn.get_status()
+        assert len(self.events) == 1
+
+        await self.nordvpn.connect_to_location("Mock_Country_1")
+        await self.nordvpn.get_status()
+        status, changed = self.events[-1]
+        assert len(self.events) == 2
+        assert status["Country"] == "Mock_Country_1"
+        assert changed == set(STATUS_KEYS)
+
+        await self.nordvpn.run_logout()
+        await self.monitor.poll_once()
+        assert self.events[-1] == (None, set(STATUS_KEYS))
+
+    async def test_telemetry_samples_every_poll(self):
+        """The telemetry gets the unchanged statuses the listeners don't."""
+        await self.nordvpn.connect_to_location("Mock_Country_1")
+        await self.monitor.poll_once()
+        events, samples = len(self.events), len(self.nordvpn.telemetry)
+        for _ in range(3):
+            await self.monitor.poll_once()
+        assert len(self.events) == events
+        assert len(self.nordvpn.telemetry) == samples + 3
+
+    async def test_adaptive_interval(self):
+        """The interval backs off while stable and is reset by a kick."""
+        await self.monitor.poll_once()
+        assert self.monitor.interval == 0.01
+        for expected in (0.02, 0.04, 0.08, 0.08):
+            await self.monitor.poll_once()
+            assert self.monitor.interval == expected
+
+        await self.nordvpn.connect_to_location("Mock_Country_2")
+        assert self.monitor.interval == 0.01
+
+    async def test_detects_external_disconnect(self):
+        """A disconnect made outside the facade is noticed by polling."""
+        await self.nordvpn.connect_to_location("Mock_Country_3")
+        await self.nordvpn.get_status()
+        self.monitor.start()
+        self.nordvpn.cmds.sync.nordvpn_disconnect()
+
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if self.events[-1][0]["Status"] == "Disconnected":
+                break
+        status, changed = self.events[-1]
+        assert status["Status"] == "Disconnected"
+        assert "Status" in changed
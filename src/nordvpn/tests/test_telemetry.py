@@ -0,0 +1,71 @@
+import unittest
+
+from src.nordvpn.parsing import Status
+from src.nordvpn.telemetry import RingBuffer, TelemetrySampler
+
+
+def status(received: int, sent: int, uptime: int) -> Status:
+    return Status(
+        Status="Connected",
+        Hostname=None,
+        Country=None,
+        City=None,
+        IP=None,
+        Technology=None,
+        Uptime=None,
+        Received=received,
+        Sent=sent,
+        UptimeSeconds=uptime,
+    )
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Tests for the RingBuffer class."""
+
+    def test_wraps_around(self):
+        buffer = RingBuffer(3)
+        assert buffer.values() == [] and buffer.last() is None
+        for val in range(1, 6):
+            buffer.append(val)
+        assert buffer.values() == [3.0, 4.0, 5.0]
+        assert len(buffer) == 3 and buffer.last() == 5.0
+        buffer.clear()
+        buffer.append(7)
+        assert buffer.values() == [7.0]
+
+    def test_constant_memory(self):
+        buffer = RingBuffer(100)
+        size = buffer._data.buffer_info()
+        for val in range(10_000):
+            buffer.append(val)
+        assert buffer._data.buffer_info() == size
+        assert buffer.values() == [float(val) for val in range(9900, 10_000)]
+
+
+class TestTelemetrySampler(unittest.TestCase):
+    """Tests for the TelemetrySampler class."""
+
+    def test_rates(self):
+        sampler = TelemetrySampler(capacity=3)
+        sampler.add(status(0, 0, 10), ts=0)
+        sampler.add(status(1000, 100, 12), ts=2)
+        sampler.add(status(4000, 100, 13), ts=3)
+        assert sampler.received_rates == [500, 3000]
+        assert sampler.sent_rates == [50, 0]
+
+        # Only the last 3 samples are kept.
+        sampler.add(status(5000, 200, 14), ts=4)
+        assert sampler.received_rates == [3000, 1000]
+
+    def test_new_connection_starts_over(self):
+        sampler = TelemetrySampler()
+        sampler.add(status(1000, 1000, 100), ts=0)
+        sampler.add(status(2000, 2000, 101), ts=1)
+        sampler.add(status(10, 10, 1), ts=2)
+        assert len(sampler) == 1 and sampler.received_rates == []
+
+    def test_ignores_statuses_without_transfer(self):
+        sampler = TelemetrySampler()
+        assert sampler.add(None) is False
+        assert sampler.add(status(None, None, 0)) is False
+        assert len(sampler) == 0
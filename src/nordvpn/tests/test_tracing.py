@@ -0,0 +1,99 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.async_commands import AsyncNordvpnCommands
+from src.nordvpn.commands.commands import NordvpnCommands
+from src.nordvpn.commands.mock_commands import (
+    AsyncMockNordvpnCommands,
+    MockNordvpnCommands,
+)
+from src.nordvpn.commands.tracing import CommandTracer
+from src.nordvpn.tests.fake_nordvpn import FakeNordvpn
+
+
+class TestCommandTracer(unittest.TestCase):
+    """Tests for the CommandTracer class."""
+
+    def test_stats(self):
+        tracer = CommandTracer()
+        for k in range(1, 101):
+            tracer.record("status", k / 1000, 0, 10)
+        tracer.record("status", 1.0, 1, 5)
+        tracer.record("cities", 0.2, None, 0)
+        status = tracer.stats["status"]
+        assert status.count == 101
+        assert status.percentile(50) == 0.051
+        assert status.percentile(95) == 0.096
+        assert status.max_time == 1.0
+        assert status.returncodes == {0: 100, 1: 1}
+        assert status.output_bytes == 1005 and status.max_output == 10
+        assert tracer.stats["cities"].errors == 1
+        assert tracer.total_count == 102
+
+    def test_trace_errors(self):
+        """A command that raises is recorded with no return code."""
+        tracer = CommandTracer()
+        with self.assertRaises(FileNotFoundError):
+            with tracer.trace("status"):
+                raise FileNotFoundError("nordvpn")
+        assert tracer.stats["status"].returncodes == {None: 1}
+
+    def test_export(self):
+        tracer = CommandTracer()
+        tracer.record("status", 0.5, 0, 100)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = tracer.export(Path(tmp) / "sub" / "stats.json")
+            data = json.loads(path.read_text(encoding="utf-8"))
+        assert data["total_count"] == 1
+        assert data["commands"]["status"]["p95_s"] == 0.5
+        assert data["commands"]["status"]["returncodes"] == {"0": 1}
+
+
+class TestTracedCommands(unittest.IsolatedAsyncioTestCase):
+    """Tests for the tracing of the real and mock commands."""
+
+    def setUp(self):
+        FakeNordvpn(self)
+        self.tracer = CommandTracer()
+
+    def test_sync_commands(self):
+        cmds = NordvpnCommands()
+        cmds.tracer = self.tracer
+        cmds.nordvpn_status()
+        cmds.nordvpn_cities("Nowhere")
+        assert self.tracer.stats["status"].returncodes == {0: 1}
+        assert self.tracer.stats["status"].output_bytes == len("Status: Disconnected\n")
+        assert self.tracer.stats["cities"].returncodes == {64: 1}
+
+    async def test_async_commands(self):
+        cmds = AsyncNordvpnCommands()
+        cmds.tracer = self.tracer
+        await asyncio.gather(cmds.nordvpn_status(), cmds.nordvpn_status())
+        assert self.tracer.stats["status"].count == 2
+
+    async def test_async_mock_leaves_a_given_sync(self):
+        """The async mock records its calls, a given sync mock keeps its tracer."""
+        sync = MockNordvpnCommands(tracer=self.tracer)
+        cmds = AsyncMockNordvpnCommands(sync)
+        assert sync.tracer is self.tracer
+        assert AsyncMockNordvpnCommands().sync.tracer is None
+        cmds.tracer = CommandTracer()
+        await cmds.nordvpn_status()
+        assert cmds.tracer.stats["status"].count == 1
+        assert self.tracer.stats["status"].count == 1
+
+    async def test_coalesced_reads_are_one_spawn(self):
+        """Only the commands actually run are counted."""
+        cmds = AsyncMockNordvpnCommands()
+        cmds.tracer = self.tracer
+        cmds.sync.nordvpn_login()
+        nordvpn = AsyncNordvpn(test=True, cmds=cmds)
+        await asyncio.gather(*(nordvpn.get_status() for _ in range(10)))
+        assert {c: s.count for c, s in self.tracer.stats.items()} == {
+            "account": 1,
+            "status": 1,
+        }
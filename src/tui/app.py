@@ -1,68 +1,209 @@
+import time
+from pathlib import Path
+
 from textual import app as ta
 from textual import containers as tc
+from textual import on
 from textual import reactive as tr
 from textual import widgets as tw
+from textual import work
+from textual import worker as tk
+from textual.message import Message
 
-from src.nordvpn.exceptions import NotLoggedInError
+from src.nordvpn import log
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.exceptions import (
+    CommandTimeoutError,
+    DaemonUnavailableError,
+    NotLoggedInError,
+)
+from src.nordvpn.parsing import Account, Progress, Status
 
 from . import screens as s
 from . import widgets as w
-from .nordvpn_instance import nordvpn
+from .logging_setup import setup_logging
+from .nordvpn_instance import get_nordvpn
+from .state import NordvpnState
+
+logger = log.get_logger(__name__)
 
 
 class NordvpnTUI(ta.App):
-    """Main textual app."""
+    """Main textual app.
+
+    The nordvpn commands run in workers that post their results back as
+    messages, and the widgets only render the `state` reactive.
+    """
 
+    # Absolute paths, so subclasses in other directories find them too.
     CSS_PATH = [
-        "app.tcss",
-        "screens/screens.tcss",
-        "widgets/status_header/status_header.tcss",
+        Path(__file__).parent / "app.tcss",
+        Path(__file__).parent / "screens/screens.tcss",
+        Path(__file__).parent / "widgets/status_header/status_header.tcss",
     ]
     BINDINGS = [
         ("d", "toggle_dark", "Toggle dark mode"),
         ("q", "request_quit", "Quit"),
+        ("r", "refresh_catalog", "Refresh countries"),
+        ("/", "focus_search", "Search"),
+        ("s", "toggle_stats", "Command stats"),
+        ("escape", "cancel_command", "Cancel"),
     ]
 
-    logged_in = tr.reactive(nordvpn.get_logged_in())
-    connected = tr.reactive(nordvpn.get_connected())
-    selected_country = tr.reactive(None)
+    state = tr.reactive(NordvpnState())
 
-    def watch_logged_in(self, val):
-        print("PRINT: ", "NordvpnTUI", "watch_logged_in", val)
-        self.query_one(w.StatusHeader).logged_in = val
-        self.query_one(w.CountriesList).logged_in = val
+    def __init__(self, nordvpn: AsyncNordvpn | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.nordvpn = nordvpn if nordvpn is not None else get_nordvpn()
+        self._locations_prefetched = False
+        self._state_push_pending = False
+        self._command_worker: tk.Worker | None = None
+        self._command_started: float | None = None
 
-    def watch_connected(self, val):
-        print("PRINT: ", "NordvpnTUI", "watch_connected", val)
-        try:
-            connected_country = nordvpn.get_status()["Country"]
-        except NotLoggedInError:
-            connected_country = None
-        self.query_one(w.StatusHeader).connected = val
-        self.query_one(w.CountriesList).connected_country = connected_country
+    class LoggedInChanged(Message):
+        """Posted when a command finds out the logged in state."""
+
+        def __init__(self, logged_in: bool, account: Account | None = None) -> None:
+            super().__init__()
+            self.logged_in = logged_in
+            self.account = account
+
+    class CommandFailed(Message):
+        """Posted when a command raises."""
+
+        def __init__(self, command: str, error: Exception) -> None:
+            super().__init__()
+            self.command = command
+            self.error = error
+
+    class StatusChanged(Message):
+        """Posted by the status monitor when a status field changes."""
+
+        def __init__(self, status: Status | None) -> None:
+            super().__init__()
+            self.status = status
+
+    class ConnectProgressed(Message):
+        """Posted for every step a connect or disconnect goes through."""
+
+        def __init__(self, progress: Progress) -> None:
+            super().__init__()
+            self.progress = progress
+
+    class DaemonAvailabilityChanged(Message):
+        """Posted when the circuit breaker opens or closes."""
+
+        def __init__(self, available: bool) -> None:
+            super().__init__()
+            self.available = available
+
+    class CatalogChanged(Message):
+        """Posted when the catalog cache has new countries or cities."""
+
+    class StartupProbed(Message):
+        """Posted with the results of the startup probe."""
+
+        def __init__(
+            self,
+            account: Account | None,
+            status: Status,
+            countries: list[str],
+        ) -> None:
+            super().__init__()
+            self.account = account
+            self.status = status
+            self.countries = countries
 
-    def watch_selected_country(self, val):
-        print("PRINT: ", "NordvpnTUI", "watch_selected_country", val)
-        self.query_one(w.StatusHeader).selected_country = self.selected_country
+    def watch_state(self, val: NordvpnState):
+        logger.debug("watch_state %s", val)
+        # The changes made while handling a message go down together.
+        if not self._state_push_pending:
+            self._state_push_pending = True
+            self.call_next(self._push_state)
+
+    def _push_state(self) -> None:
+        self._state_push_pending = False
+        state = self.state
+        self.query_one(w.StatusHeader).state = state
+        self.query_one(w.StatusBar).state = state
+        self.query_one(w.TransferGraph).state = state
+        self.query_one(w.CountriesList).state = state
 
     def compose(self) -> ta.ComposeResult:
         yield tw.Header()
         yield tw.Footer()
-        yield tc.VerticalScroll(w.StatusHeader(), w.CountriesList())
+        yield tc.VerticalScroll(
+            w.StatusHeader(),
+            w.StatusBar(),
+            w.TransferGraph(),
+            w.CountriesList(
+                search_index=self.nordvpn.search_index,
+                recent_locations=self.nordvpn.recent_locations,
+            ),
+        )
+
+    def on_mount(self) -> None:
+        self.nordvpn.status_monitor.listeners.append(self._on_status_changed)
+        if self.nordvpn.breaker is not None:
+            self.nordvpn.breaker.listeners.append(self._on_breaker_changed)
+        if self.nordvpn.catalog_cache is not None:
+            self.nordvpn.catalog_cache.listeners.append(self._on_catalog_changed)
+        # Show the cached countries before the cli answers anything.
+        if countries := self.nordvpn.cached_countries():
+            self.query_one(w.CountriesList).set_countries(countries)
+        self.probe_startup()
+
+    async def on_unmount(self) -> None:
+        monitor = self.nordvpn.status_monitor
+        monitor.listeners.remove(self._on_status_changed)
+        if self.nordvpn.breaker is not None:
+            self.nordvpn.breaker.listeners.remove(self._on_breaker_changed)
+        if self.nordvpn.catalog_cache is not None:
+            self.nordvpn.catalog_cache.listeners.remove(self._on_catalog_changed)
+        await monitor.stop()
+
+    def _on_status_changed(self, status: Status | None, changed: set[str]) -> None:
+        self.post_message(self.StatusChanged(status))
+
+    def _on_breaker_changed(self, available: bool) -> None:
+        self.post_message(self.DaemonAvailabilityChanged(available))
+
+    def _on_catalog_changed(self) -> None:
+        self.post_message(self.CatalogChanged())
+
+    def action_refresh_catalog(self) -> None:
+        self.refresh_catalog()
+
+    def action_focus_search(self) -> None:
+        self.query_one("#location-search").focus()
+
+    def action_toggle_stats(self) -> None:
+        if isinstance(self.screen, s.StatsScreen):
+            self.pop_screen()
+        else:
+            self.push_screen(s.StatsScreen(self.nordvpn.cmds.tracer))
+
+    def action_cancel_command(self) -> None:
+        worker = self._command_worker
+        if worker is not None and worker.is_running:
+            logger.info("cancelling %s", self.state.busy)
+            worker.cancel()
+            self.state = self.state.evolve(busy=None, progress=None)
+            # The cli may have changed the connection before it was stopped.
+            self.nordvpn.status_monitor.kick()
 
     def action_request_quit(self) -> None:
         self.push_screen(s.QuitScreen(classes="confirm-decision-screen"))
 
     def on_button_pressed(self, event: tw.Button.Pressed) -> None:
         """Event handler called when a button is pressed."""
-        print("PRINT: ", "NordvpnTUI", "Button pressed: ", event.button)
+        logger.debug("button pressed %s", event.button)
         if event.button.id == "button-login":
             self.log_in()
         elif event.button.id == "button-logout":
             self.push_screen(s.LogoutScreen(classes="confirm-decision-screen"))
         elif event.button.id == "button-logout-confirm":
             self.pop_screen()
-            self.disconnect()
             self.log_out()
         elif event.button.id == "button-connect":
             self.connect()
@@ -70,39 +211,272 @@ class NordvpnTUI(ta.App):
             self.disconnect()
 
     def on_option_list_option_selected(self, event) -> None:
-        print(
-            "PRINT: ",
-            "NordvpnTUI",
-            "option selected: ",
-            event.option_index,
-            event.option.prompt,
+        logger.debug("option selected %s %s", event.option_index, event.option.id)
+        location = w.CountriesList.location_of(event.option.id)
+        self.state = self.state.evolve(selected_location=location)
+
+    @on(w.CountriesList.LocationChosen)
+    def connect_to_chosen(self, message: w.CountriesList.LocationChosen) -> None:
+        self.state = self.state.evolve(selected_location=message.location)
+        self.connect()
+
+    @on(tw.Input.Changed, "#location-search")
+    def start_prefetch(self) -> None:
+        # The cities are only fetched once someone searches.
+        if self.state.logged_in and not self._locations_prefetched:
+            self._locations_prefetched = True
+            self.prefetch_locations()
+
+    @on(w.CountriesList.CitiesRequested)
+    def provide_cities(self, message: w.CountriesList.CitiesRequested) -> None:
+        # Cities already known are shown at once, without a worker.
+        cities = self.nordvpn.locations.cities(message.country)
+        if cities is not None:
+            self.query_one(w.CountriesList).set_cities(message.country, cities)
+        else:
+            self.load_cities(message.country)
+
+    @on(CatalogChanged)
+    def update_catalog(self) -> None:
+        countries_list = self.query_one(w.CountriesList)
+        if countries := self.nordvpn.cached_countries():
+            countries_list.set_countries(countries)
+        for country in countries_list.expanded:
+            if (cities := self.nordvpn.locations.cities(country)) is not None:
+                countries_list.set_cities(country, cities)
+        countries_list.refresh_search()
+
+    @on(StartupProbed)
+    def update_from_probe(self, message: StartupProbed) -> None:
+        countries_list = self.query_one(w.CountriesList)
+        if message.countries:
+            countries_list.set_countries(message.countries)
+        countries_list.refresh_recent()
+        self.nordvpn.status_monitor.start()
+        # The status itself comes with the StatusChanged of the probe.
+        self.post_message(
+            self.LoggedInChanged(message.account is not None, message.account)
+        )
+
+    @on(StatusChanged)
+    def update_status(self, message: StatusChanged) -> None:
+        if message.status is None:
+            self.state = self.state.evolve(logged_in=False, account=None, status=None)
+            return
+        telemetry = self.nordvpn.telemetry
+        self.state = self.state.evolve(
+            status=message.status,
+            received_rates=tuple(telemetry.received_rates),
+            sent_rates=tuple(telemetry.sent_rates),
         )
-        self.selected_country = event.option.prompt
+        if self.state.logged_in is False:
+            # Only the logged in get a status: the login was finished in
+            # the browser after `log_in` checked the account.
+            self.state = self.state.evolve(logged_in=True)
+            self.load_account()
+
+    @on(LoggedInChanged)
+    def update_logged_in(self, message: LoggedInChanged) -> None:
+        if message.logged_in:
+            self.state = self.state.evolve(logged_in=True, account=message.account)
+            if not self.query_one(w.CountriesList).loaded:
+                self.load_countries()
+        else:
+            self.state = self.state.evolve(logged_in=False, account=None, status=None)
+
+    @on(DaemonAvailabilityChanged)
+    def update_daemon(self, message: DaemonAvailabilityChanged) -> None:
+        self.state = self.state.evolve(daemon_available=message.available)
+        if not message.available:
+            self.notify(
+                "The nordvpn daemon isn't answering, showing the last data known",
+                severity="warning",
+            )
+        elif self.state.logged_in is None:
+            # The startup probe failed, run it again.
+            self.probe_startup()
+
+    @on(ConnectProgressed)
+    def update_progress(self, message: ConnectProgressed) -> None:
+        # Late messages of a finished or cancelled command are dropped.
+        if self.state.busy is not None:
+            self.state = self.state.evolve(progress=message.progress["message"])
+
+    @on(CommandFailed)
+    def notify_failure(self, message: CommandFailed) -> None:
+        logger.warning("%s failed: %s", message.command, message.error)
+        self.notify(f"{message.command} failed: {message.error}", severity="error")
+
+    def _start_command(self, name: str) -> tk.Worker:
+        worker = tk.get_current_worker()
+        self._command_worker = worker
+        self._command_started = time.perf_counter()
+        self.state = self.state.evolve(busy=name)
+        return worker
+
+    def _end_command(self, worker: tk.Worker) -> None:
+        # A cancelled worker must not clear the state of its replacement.
+        if self._command_worker is worker:
+            duration = time.perf_counter() - self._command_started
+            logger.debug(
+                "%s took %.3fs", self.state.busy, duration, extra={"duration": duration}
+            )
+            self.state = self.state.evolve(busy=None, progress=None)
+
+    def _post_progress(self, progress: Progress) -> None:
+        self.post_message(self.ConnectProgressed(progress))
+
+    async def _refresh_status(self) -> None:
+        # The status monitor posts the result as a StatusChanged message.
+        try:
+            await self.nordvpn.get_status()
+        except NotLoggedInError:
+            pass
+
+    @work(exclusive=True, group="command")
+    async def log_in(self):
+        logger.debug("log_in")
+        worker = self._start_command("log_in")
+        try:
+            await self.nordvpn.run_login()
+            account = await self.nordvpn.check_account()
+            self.post_message(self.LoggedInChanged(True, account))
+        except NotLoggedInError:
+            # The login wasn't completed in the browser yet. The status
+            # monitor finds out when it is, checking the account again.
+            self.nordvpn.invalidate_login_cache()
+            self.post_message(self.LoggedInChanged(False))
+        except Exception as exc:
+            self.post_message(self.CommandFailed("log_in", exc))
+        finally:
+            self._end_command(worker)
+
+    @work(exclusive=True, group="command")
+    async def log_out(self):
+        logger.debug("log_out")
+        worker = self._start_command("log_out")
+        try:
+            if self.state.connected:
+                await self.nordvpn.disconnect_from_nordvpn()
+            await self.nordvpn.run_logout()
+            self.post_message(self.LoggedInChanged(False))
+        except Exception as exc:
+            self.post_message(self.CommandFailed("log_out", exc))
+        finally:
+            self._end_command(worker)
+
+    @work(exclusive=True, group="command")
+    async def connect(self):
+        logger.debug("connect")
+        worker = self._start_command("connect")
+        try:
+            await self.nordvpn.connect_to_location(
+                self.state.selected_location, progress=self._post_progress
+            )
+            self.query_one(w.CountriesList).refresh_recent()
+            await self._refresh_status()
+        except Exception as exc:
+            self.post_message(self.CommandFailed("connect", exc))
+        finally:
+            self._end_command(worker)
+
+    @work(exclusive=True, group="command")
+    async def disconnect(self):
+        logger.debug("disconnect")
+        worker = self._start_command("disconnect")
+        try:
+            await self.nordvpn.disconnect_from_nordvpn(progress=self._post_progress)
+            await self._refresh_status()
+        except Exception as exc:
+            self.post_message(self.CommandFailed("disconnect", exc))
+        finally:
+            self._end_command(worker)
+
+    @work(exclusive=True, group="status")
+    async def probe_startup(self):
+        logger.debug("probe_startup")
+        try:
+            with log.timed(logger, "probe_startup"):
+                account, status, countries = await self.nordvpn.probe()
+        except (DaemonUnavailableError, CommandTimeoutError) as exc:
+            # Not logged out, just unknown: keep the cached data and let
+            # the status monitor find out when the daemon answers again.
+            breaker = self.nordvpn.breaker
+            if breaker is None or breaker.available:
+                self.post_message(self.CommandFailed("startup", exc))
+            self.nordvpn.status_monitor.start()
+            return
+        except Exception as exc:
+            self.post_message(self.CommandFailed("startup", exc))
+            self.post_message(self.LoggedInChanged(False))
+            return
+        self.post_message(self.StartupProbed(account, status, countries))
+
+    @work(exclusive=True, group="account")
+    async def load_account(self):
+        logger.debug("load_account")
+        try:
+            account = await self.nordvpn.check_account()
+        except NotLoggedInError:
+            self.post_message(self.LoggedInChanged(False))
+        except Exception as exc:
+            self.post_message(self.CommandFailed("load account", exc))
+        else:
+            self.post_message(self.LoggedInChanged(True, account))
 
-    def log_in(self):
-        print("PRINT: ", "NordvpnTUI", "log_in")
-        nordvpn.run_login()
-        self.logged_in = True
+    @work(exclusive=True, group="catalog")
+    async def load_countries(self):
+        logger.debug("load_countries")
+        try:
+            countries = await self.nordvpn.get_countries()
+        except Exception as exc:
+            self.post_message(self.CommandFailed("load countries", exc))
+            return
+        self.query_one(w.CountriesList).set_countries(countries)
 
-    def log_out(self):
-        print("PRINT: ", "NordvpnTUI", "log_out")
-        nordvpn.run_logout()
-        self.logged_in = False
+    @work(exclusive=True, group="catalog")
+    async def refresh_catalog(self):
+        logger.debug("refresh_catalog")
+        try:
+            countries = await self.nordvpn.get_countries(refresh=True)
+        except Exception as exc:
+            self.post_message(self.CommandFailed("refresh countries", exc))
+            return
+        self.query_one(w.CountriesList).set_countries(countries)
+        self.notify("Countries refreshed")
 
-    def connect(self):
-        print("PRINT: ", "NordvpnTUI", "connect")
-        nordvpn.connect_to_location(self.selected_country)
-        self.connected = True
+    @work(group="cities")
+    async def load_cities(self, country: str):
+        logger.debug("load_cities %s", country)
+        countries_list = self.query_one(w.CountriesList)
+        try:
+            cities = await self.nordvpn.get_cities(country)
+        except Exception as exc:
+            countries_list.collapse(country)
+            self.post_message(self.CommandFailed(f"load cities of {country}", exc))
+            return
+        countries_list.set_cities(country, cities)
 
-    def disconnect(self):
-        print("PRINT: ", "NordvpnTUI", "disconnect")
-        nordvpn.disconnect_from_nordvpn()
-        self.connected = False
+    @work(exclusive=True, group="prefetch")
+    async def prefetch_locations(self):
+        logger.debug("prefetch_locations")
+        try:
+            with log.timed(logger, "prefetch_locations"):
+                result = await self.nordvpn.prefetch_catalog()
+        except Exception as exc:
+            self._locations_prefetched = False
+            self.post_message(self.CommandFailed("load cities", exc))
+            return
+        if not result.ok:
+            self._locations_prefetched = False
+            logger.warning("Couldn't load the cities of %s", list(result.failures))
+        self.query_one(w.CountriesList).refresh_search()
 
     def on_click(self, event) -> None:
-        print("PRINT: ", "NordvpnTUI", "click", event)
+        logger.debug("click %s", event)
 
 
 if __name__ == "__main__":
+    setup_logging()
     app = NordvpnTUI()
     app.run()
@@ -0,0 +1,18 @@
+"""Logging setup of the TUI.
+
+Besides the sinks of `log.configure_from_env`, setting
+`NORDVPN_TUI_LOG_DEVTOOLS` sends the logs to the Textual devtools console
+(`textual console`, then run the app with `textual run --dev`).
+"""
+import os
+
+from src.nordvpn import log
+
+
+def setup_logging() -> None:
+    handlers = []
+    if os.environ.get("NORDVPN_TUI_LOG_DEVTOOLS"):
+        from textual.logging import TextualHandler
+
+        handlers.append(TextualHandler())
+    log.configure_from_env(handlers)
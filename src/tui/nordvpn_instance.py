@@ -1,5 +1,66 @@
-from src.nordvpn.nordvpn import Nordvpn
+"""The nordvpn instance used by the TUI.
 
-nordvpn = Nordvpn(test=False)
-# nordvpn.run_login()
-# nordvpn.connect_to_location("Mock_Country_2")
+It's created on first use, so importing the TUI doesn't run anything.
+Set the `NORDVPN_TUI_MOCK` environment variable to use the mock commands,
+and to load test the TUI with them:
+
+- `NORDVPN_TUI_MOCK_LATENCY`: seconds every command takes, +- 50%.
+- `NORDVPN_TUI_MOCK_FAILURES`: probability of a command failing.
+- `NORDVPN_TUI_MOCK_CATALOG`: size of a synthetic catalog, as
+  "<countries>x<cities per country>", like "1000x10".
+
+Set `NORDVPN_TUI_RECORD` to a path to record every command run to a
+fixture there, and `NORDVPN_TUI_REPLAY` to the path of a fixture to run
+against it instead of the cli, `NORDVPN_TUI_REPLAY_TIMING` times as slow
+as recorded (0, the default, answers at once).
+"""
+import functools
+import os
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.commands.circuit_breaker import CircuitBreaker
+
+
+def _mock_commands():
+    from src.nordvpn.commands.mock_commands import AsyncMockNordvpnCommands
+    from src.nordvpn.commands.mock_config import (
+        CommandProfile,
+        MockConfig,
+        synthetic_catalog,
+    )
+
+    latency = float(os.environ.get("NORDVPN_TUI_MOCK_LATENCY", 0))
+    failures = float(os.environ.get("NORDVPN_TUI_MOCK_FAILURES", 0))
+    config = None
+    if latency or failures:
+        profile = CommandProfile(latency, latency / 2, failure_rate=failures)
+        config = MockConfig(default=profile, seed=None)
+    catalog = None
+    if size := os.environ.get("NORDVPN_TUI_MOCK_CATALOG"):
+        countries, cities = size.lower().split("x")
+        catalog = synthetic_catalog(int(countries), int(cities))
+    return AsyncMockNordvpnCommands(config=config, catalog=catalog)
+
+
+def _replay_commands(path: str):
+    from src.nordvpn.commands.replay import AsyncReplayNordvpnCommands, load_fixture
+
+    timing = float(os.environ.get("NORDVPN_TUI_REPLAY_TIMING", 0))
+    return AsyncReplayNordvpnCommands(load_fixture(path), timing=timing)
+
+
+@functools.cache
+def get_nordvpn() -> AsyncNordvpn:
+    # Test mode doesn't touch the caches nor the history, but the mock
+    # failures and timeouts still trip a circuit breaker like the cli's.
+    if os.environ.get("NORDVPN_TUI_MOCK"):
+        return AsyncNordvpn(test=True, cmds=_mock_commands(), breaker=CircuitBreaker())
+    if path := os.environ.get("NORDVPN_TUI_REPLAY"):
+        return AsyncNordvpn(
+            test=True, cmds=_replay_commands(path), breaker=CircuitBreaker()
+        )
+    if path := os.environ.get("NORDVPN_TUI_RECORD"):
+        from src.nordvpn.commands.replay import AsyncRecordingNordvpnCommands
+
+        return AsyncNordvpn(cmds=AsyncRecordingNordvpnCommands(path))
+    return AsyncNordvpn()
@@ -1,2 +1,18 @@
-from .logout_screen import LogoutScreen
-from .quit_screen import QuitScreen
+"""The modal screens, each imported the first time it's used."""
+import importlib
+
+_MODULES = {
+    "LogoutScreen": "logout_screen",
+    "QuitScreen": "quit_screen",
+    "StatsScreen": "stats_screen",
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_MODULES[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -3,6 +3,10 @@ from textual import containers as tc
 from textual import screen as ts
 from textual import widgets as tw
 
+from src.nordvpn import log
+
+logger = log.get_logger(__name__)
+
 
 class LogoutScreen(ts.Screen):
     """Screen with a dialog to logout."""
@@ -21,6 +25,6 @@ class LogoutScreen(ts.Screen):
         )
 
     def on_button_pressed(self, event: tw.Button.Pressed) -> None:
-        print("PRINT: ", "LogoutScreen", "Button pressed: ", event.button)
+        logger.debug("button pressed %s", event.button)
         if event.button.id == "button-logout-cancel":
             self.app.pop_screen()
@@ -0,0 +1,76 @@
+from textual import app as ta
+from textual import screen as ts
+from textual import widgets as tw
+
+from src.nordvpn.catalog_cache import default_cache_path
+from src.nordvpn.commands.tracing import CommandTracer
+
+COLUMNS = (
+    "command",
+    "calls",
+    "errors",
+    "p50 ms",
+    "p95 ms",
+    "max ms",
+    "return codes",
+    "output KiB",
+)
+
+
+def stats_path():
+    """Where the stats are exported, next to the catalog cache."""
+    return default_cache_path().parent / "command-stats.json"
+
+
+class StatsScreen(ts.Screen):
+    """Screen with the live stats of the nordvpn commands run so far."""
+
+    BINDINGS = [
+        ("escape,s", "app.pop_screen", "Close"),
+        ("x", "export", "Export json"),
+    ]
+
+    def __init__(self, tracer: CommandTracer, **kwargs):
+        super().__init__(**kwargs)
+        self.tracer = tracer
+
+    def compose(self) -> ta.ComposeResult:
+        yield tw.Header()
+        yield tw.Label(id="stats-summary")
+        yield tw.DataTable(id="stats-table", cursor_type="row")
+        yield tw.Footer()
+
+    def on_mount(self) -> None:
+        self.query_one(tw.DataTable).add_columns(*COLUMNS)
+        self.update_stats()
+        self.set_interval(1.0, self.update_stats)
+
+    def update_stats(self) -> None:
+        table = self.query_one(tw.DataTable)
+        table.clear()
+        for command, stats in sorted(self.tracer.stats.items()):
+            returncodes = ", ".join(
+                f"{code}: {n}" for code, n in sorted(stats.returncodes.items(), key=str)
+            )
+            table.add_row(
+                command,
+                stats.count,
+                stats.errors,
+                f"{stats.percentile(50) * 1e3:.1f}",
+                f"{stats.percentile(95) * 1e3:.1f}",
+                f"{stats.max_time * 1e3:.1f}",
+                returncodes,
+                f"{stats.output_bytes / 1024:.1f}",
+                key=command,
+            )
+        self.query_one("#stats-summary", tw.Label).update(
+            f"{self.tracer.total_count} nordvpn commands run"
+        )
+
+    def action_export(self) -> None:
+        try:
+            path = self.tracer.export(stats_path())
+        except OSError as exc:
+            self.notify(f"Couldn't export the stats: {exc}", severity="error")
+            return
+        self.notify(f"Stats exported to {path}")
@@ -0,0 +1,53 @@
+import dataclasses
+from types import MappingProxyType
+
+from src.nordvpn.nordvpn import NordvpnBase
+from src.nordvpn.parsing import Account, Status
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class NordvpnState:
+    """Snapshot of everything the widgets render.
+
+    The app holds a single instance in its `state` reactive and replaces
+    it with `evolve` whenever something changes, and the widgets render
+    from it without calling the cli. `logged_in` is None until known,
+    `busy` is the name of the app command in flight and `progress` the
+    last step it reported, if any. The account and status are stored as
+    read-only mappings, and the bytes per second received and sent lately
+    as tuples. `daemon_available` is False while the circuit breaker of
+    the nordvpn instance is open, the rest is then the last data known.
+    """
+
+    logged_in: bool | None = None
+    account: Account | None = None
+    status: Status | None = None
+    selected_location: str | None = None
+    busy: str | None = None
+    progress: str | None = None
+    received_rates: tuple[float, ...] = ()
+    sent_rates: tuple[float, ...] = ()
+    daemon_available: bool = True
+
+    def __post_init__(self):
+        for name in ("account", "status"):
+            val = getattr(self, name)
+            if val is not None and not isinstance(val, MappingProxyType):
+                object.__setattr__(self, name, MappingProxyType(dict(val)))
+
+    def evolve(self, **changes) -> "NordvpnState":
+        return dataclasses.replace(self, **changes)
+
+    @property
+    def email(self) -> str | None:
+        return self.account["email"] if self.account is not None else None
+
+    @property
+    def connected(self) -> bool | None:
+        if self.status is None:
+            return False if self.logged_in is False else None
+        return NordvpnBase.is_connected(self.status)
+
+    @property
+    def connected_country(self) -> str | None:
+        return self.status["Country"] if self.connected else None
@@ -0,0 +1,28 @@
+"""Base of the tests driving NordvpnTUI over the counting mock commands."""
+import unittest
+
+from textual import widgets as tw
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.tests.counting_mock import CountingAsyncMockNordvpnCommands
+from src.tui.app import NordvpnTUI
+
+
+class AppTestCase(unittest.IsolatedAsyncioTestCase):
+    """A NordvpnTUI over counting mock commands, in `cmds`, with no
+    background polls so only the calls made by the UI are counted."""
+
+    async def asyncSetUp(self):
+        self.nordvpn = AsyncNordvpn(test=True)
+        self.cmds = CountingAsyncMockNordvpnCommands()
+        self.nordvpn.cmds.cmds = self.cmds
+        self.nordvpn.status_monitor.fast_interval = 60.0
+        self.nordvpn.status_monitor.interval = 60.0
+        self.app = NordvpnTUI(nordvpn=self.nordvpn)
+
+    async def settle(self, pilot):
+        await self.app.workers.wait_for_complete()
+        await pilot.pause()
+
+    def label(self, button_id: str) -> str:
+        return str(self.app.query_one(button_id, tw.Button).label)
@@ -0,0 +1,81 @@
+from textual import widgets as tw
+
+from src.nordvpn.commands.mock_commands import MockCompletedProcess
+from src.nordvpn.tests.counting_mock import CountingAsyncMockNordvpnCommands
+from src.tui.tests.app_case import AppTestCase
+
+
+class BrowserLoginMockNordvpnCommands(CountingAsyncMockNordvpnCommands):
+    """Counting mock commands where the login is finished in the browser,
+    logged out until `finish_login` is called."""
+
+    def __init__(self):
+        super().__init__()
+        self.login_finished = False
+
+    def finish_login(self):
+        self.login_finished = True
+
+    async def nordvpn_account(self):
+        if not self.login_finished:
+            self.calls["nordvpn_account"] += 1
+            return MockCompletedProcess(b"You are not logged in.\n", 1)
+        return await super().nordvpn_account()
+
+
+class TestNordvpnTUI(AppTestCase):
+    """Tests for a session of the NordvpnTUI app against the mock commands."""
+
+    async def test_session(self):
+        """Log in, connect, disconnect and log out."""
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            assert self.app.state.logged_in is False
+            assert self.label("#button-login") == "Log in"
+
+            await pilot.click("#button-login")
+            await self.settle(pilot)
+            assert self.app.state.email == "mock@mail.com"
+            assert self.label("#button-login") == "mock@mail.com"
+            assert self.app.query_one(tw.OptionList).option_count == 4
+
+            self.app.query_one(tw.OptionList).focus()
+            await pilot.press("down", "enter")
+            assert self.app.state.selected_location == "Mock_Country_2"
+            self.cmds.calls.clear()
+            await pilot.click("#button-connect")
+            await self.settle(pilot)
+            assert self.app.state.connected_country == "Mock_Country_2"
+            assert self.label("#button-connect") == "Connected: Mock_Country_2"
+            # One connect and one status, the widgets don't call the cli.
+            assert self.cmds.calls == {"nordvpn_connect": 1, "nordvpn_status": 1}
+
+            await pilot.click("#button-disconnect")
+            await self.settle(pilot)
+            assert self.app.state.connected is False
+            assert self.label("#button-connect") == "Connect to Mock_Country_2"
+
+            await pilot.click("#button-logout")
+            await pilot.pause()
+            await pilot.click("#button-logout-confirm")
+            await self.settle(pilot)
+            assert self.app.state.logged_in is False
+            assert self.label("#button-logout") == "Logged out"
+
+    async def test_login_finished_later(self):
+        """A login finished in the browser after `run_login` shows up."""
+        self.cmds = BrowserLoginMockNordvpnCommands()
+        self.nordvpn.cmds.cmds = self.cmds
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            await pilot.click("#button-login")
+            await self.settle(pilot)
+            assert self.app.state.logged_in is False
+
+            self.cmds.finish_login()
+            await self.nordvpn.status_monitor.poll_once()
+            await pilot.pause()
+            await self.settle(pilot)
+            assert self.app.state.logged_in is True
+            assert self.app.state.email == "mock@mail.com"
+            assert self.label("#button-logout") == "Log out"
@@ -0,0 +1,45 @@
+from textual import widgets as tw
+
+from src.nordvpn.commands.mock_config import CommandProfile, MockConfig
+from src.tui.tests.app_case import AppTestCase
+
+
+class TestCityTree(AppTestCase):
+    """Tests for the countries expanding to their cities."""
+
+    async def test_city_tree(self):
+        """Countries expand to their cities, loaded once in the background."""
+        self.cmds.sync.nordvpn_login()
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            self.cmds.config = MockConfig(commands={"cities": CommandProfile(1.0)})
+            option_list = self.app.query_one(tw.OptionList)
+
+            def ids():
+                return [option.id for option in option_list.options]
+
+            option_list.focus()
+            await pilot.press("down", "right")
+            # The list is usable while the cities load.
+            assert ids()[:3] == [
+                "Mock_Country_1",
+                "Mock_Country_2",
+                "loading:Mock_Country_2",
+            ]
+
+            await self.settle(pilot)
+            assert ids()[2:4] == [
+                "city:Mock_Country_2/Mock_City_2_1",
+                "city:Mock_Country_2/Mock_City_2_2",
+            ]
+            prompt = option_list.get_option("Mock_Country_2").prompt
+            assert prompt == "▾ Mock_Country_2"
+            await pilot.press("down", "enter")
+            assert self.app.state.selected_location == "Mock_City_2_1"
+
+            await pilot.press("left")
+            assert option_list.option_count == 4
+            assert option_list.highlighted_option.id == "Mock_Country_2"
+            await pilot.press("right")
+            assert option_list.option_count == 6
+            assert self.cmds.calls["nordvpn_cities"] == 1
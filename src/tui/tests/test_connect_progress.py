@@ -0,0 +1,32 @@
+from src.nordvpn.commands.mock_config import CommandProfile, MockConfig
+from src.nordvpn.commands.tracing import CommandTracer
+from src.tui.tests.app_case import AppTestCase
+from src.tui.widgets import StatusBar
+
+
+class TestConnectProgress(AppTestCase):
+    """Tests for the progress and cancel of a connect."""
+
+    async def test_connect_progress_and_cancel(self):
+        """The status bar shows the connect in flight, and escape cancels it."""
+        self.cmds.sync.nordvpn_login()
+        self.cmds.tracer = CommandTracer()
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            self.cmds.config = MockConfig(
+                commands={"connect": CommandProfile(latency=30.0)}
+            )
+            self.app.state = self.app.state.evolve(selected_location="Mock_Country_1")
+            await pilot.click("#button-connect")
+            await pilot.pause()
+            assert self.app.state.busy == "connect"
+            assert self.app.state.progress == "Connecting to Mock_Country_1"
+            status_bar = self.app.query_one(StatusBar)
+            assert str(status_bar.render()) == "Connecting to Mock_Country_1..."
+
+            await pilot.press("escape")
+            await self.settle(pilot)
+            assert self.app.state.busy is None
+            assert self.app.state.progress is None
+            assert self.app.state.connected is False
+            assert self.cmds.tracer.stats["connect"].errors == 1
@@ -0,0 +1,111 @@
+import unittest
+from unittest import mock
+
+from textual import widgets as tw
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.tui.app import NordvpnTUI
+from src.tui.widgets import CountriesList
+
+SIZE = 5000
+
+
+class TestCountriesList(unittest.IsolatedAsyncioTestCase):
+    """Tests for the incremental updates of the CountriesList widget."""
+
+    async def asyncSetUp(self):
+        self.nordvpn = AsyncNordvpn(test=True)
+        self.nordvpn.cmds.sync.nordvpn_login()
+        self.app = NordvpnTUI(nordvpn=self.nordvpn)
+        self.names = [f"Country_{k:05}" for k in range(SIZE)]
+
+    def ids(self) -> list[str]:
+        return [option.id for option in self.option_list.options]
+
+    async def start(self, pilot):
+        await self.app.workers.wait_for_complete()
+        await pilot.pause()
+        self.countries_list = self.app.query_one(CountriesList)
+        self.option_list = self.app.query_one(tw.OptionList)
+        self.countries_list.set_countries(self.names)
+        await pilot.pause()
+
+    async def test_updates_in_place(self):
+        """Changes keep the widget, the highlight and the scroll."""
+        async with self.app.run_test() as pilot:
+            await self.start(pilot)
+            assert self.ids() == self.names
+            self.option_list.highlighted = 3000
+            self.option_list.scroll_to(y=2990, animate=False, immediate=True)
+            await pilot.pause()
+            scroll_y = self.option_list.scroll_y
+
+            names = self.names[:10] + self.names[11:] + ["Country_new"]
+            names.insert(4900, "Country_4900_b")
+            option_list = self.option_list
+            with mock.patch.object(
+                option_list,
+                "remove_option_at_index",
+                wraps=option_list.remove_option_at_index,
+            ) as removed, mock.patch.object(
+                option_list, "add_options", wraps=option_list.add_options
+            ) as added, mock.patch.object(
+                option_list, "set_options", wraps=option_list.set_options
+            ) as rebuilt:
+                self.countries_list.set_countries(names)
+            await pilot.pause()
+
+            assert self.app.query_one(tw.OptionList) is self.option_list
+            assert self.ids() == names
+            assert self.option_list.highlighted_option.id == "Country_03000"
+            assert self.option_list.scroll_y == scroll_y
+            # The deleted option, and the 99 after the insertion removed
+            # and added back at once: not the thousands of options.
+            rebuilt.assert_not_called()
+            assert removed.call_count == 1 + 99
+            assert added.call_count == 1
+
+    async def test_equal_list_is_skipped(self):
+        """Setting an equal list doesn't touch the options."""
+        async with self.app.run_test() as pilot:
+            await self.start(pilot)
+            options = list(self.option_list.options)
+            self.countries_list.set_countries(list(self.names))
+            await pilot.pause()
+            assert all(a is b for a, b in zip(self.option_list.options, options))
+
+    async def test_big_change(self):
+        """A change of most options keeps the highlight too."""
+        async with self.app.run_test() as pilot:
+            await self.start(pilot)
+            self.option_list.highlighted = 3000
+            names = ["Country_first", *self.names[1000:]]
+            self.countries_list.set_countries(names)
+            await pilot.pause()
+            assert self.ids() == names
+            assert self.option_list.highlighted_option.id == "Country_03000"
+
+    async def test_reorder(self):
+        """A reordered list is shown in the new order."""
+        async with self.app.run_test() as pilot:
+            await self.start(pilot)
+            names = list(reversed(self.names[:50]))
+            self.countries_list.set_countries(names)
+            await pilot.pause()
+            assert self.ids() == names
+
+    async def test_same_city_in_two_countries(self):
+        """A city name under two expanded countries has two options."""
+        async with self.app.run_test() as pilot:
+            await self.start(pilot)
+            for country in self.names[:2]:
+                self.countries_list.set_cities(country, ["Springfield"])
+                self.countries_list.expand(country)
+            await pilot.pause()
+            assert self.ids()[:4] == [
+                self.names[0],
+                f"city:{self.names[0]}/Springfield",
+                self.names[1],
+                f"city:{self.names[1]}/Springfield",
+            ]
+            assert CountriesList.location_of(self.ids()[3]) == "Springfield"
@@ -0,0 +1,59 @@
+import tempfile
+from pathlib import Path
+
+from textual import widgets as tw
+
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.catalog_cache import CatalogCache
+from src.nordvpn.commands.async_commands import AsyncNordvpnCommands
+from src.nordvpn.commands.circuit_breaker import CircuitBreaker
+from src.nordvpn.tests.fake_nordvpn import FakeNordvpn
+from src.tui.app import NordvpnTUI
+from src.tui.tests.app_case import AppTestCase
+from src.tui.widgets import StatusBar
+
+
+class TestDaemonUnavailable(AppTestCase):
+    """Tests for the app with a stopped nordvpn daemon."""
+
+    async def test_daemon_unavailable(self):
+        """A stopped daemon shows as unavailable, with the cached countries."""
+        fake = FakeNordvpn(self)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = CatalogCache(Path(tmp.name) / "catalog.json")
+        cache.set_countries(["Cached_Country"])
+        now = [0.0]
+        nordvpn = AsyncNordvpn(
+            test=True,
+            catalog_cache=cache,
+            cmds=AsyncNordvpnCommands(),
+            breaker=CircuitBreaker(failure_threshold=2, clock=lambda: now[0]),
+        )
+        nordvpn.status_monitor.fast_interval = 60.0
+        nordvpn.status_monitor.interval = 60.0
+        monitor_listeners = list(nordvpn.status_monitor.listeners)
+        self.app = NordvpnTUI(nordvpn=nordvpn)
+        fake.down()
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            assert self.app.state.daemon_available is False
+            assert self.app.state.logged_in is None
+            status_bar = self.app.query_one(StatusBar)
+            assert "daemon unavailable" in str(status_bar.render())
+            assert status_bar.has_class("-unavailable")
+            option_list = self.app.query_one(tw.OptionList)
+            assert option_list.get_option_at_index(0).id == "Cached_Country"
+
+            # The monitor finds the daemon back after the cooldown.
+            fake.up()
+            now[0] += nordvpn.breaker.cooldown
+            await nordvpn.status_monitor.poll_once()
+            await pilot.pause()
+            await self.settle(pilot)
+            assert self.app.state.daemon_available is True
+            assert self.app.state.email == "fake@mail.com"
+            assert not status_bar.has_class("-unavailable")
+        # Nothing is left listening once the app is gone.
+        assert not cache.listeners and not nordvpn.breaker.listeners
+        assert nordvpn.status_monitor.listeners == monitor_listeners
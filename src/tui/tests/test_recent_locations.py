@@ -0,0 +1,38 @@
+from textual import widgets as tw
+
+from src.nordvpn.history import ConnectionHistory
+from src.tui.tests.app_case import AppTestCase
+
+
+class TestRecentLocations(AppTestCase):
+    """Tests for the recent locations from the history."""
+
+    async def test_recent_locations(self):
+        """The recent locations are listed on top and can be selected."""
+        self.nordvpn.history = ConnectionHistory(":memory:")
+        self.addCleanup(self.nordvpn.history.close)
+        self.nordvpn.history.record("connect", "Mock_Country_3", outcome="connected")
+        self.cmds.sync.nordvpn_login()
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            option_list = self.app.query_one(tw.OptionList)
+            assert [str(option.prompt) for option in option_list.options[:3]] == [
+                "Recent",
+                "Mock_Country_3",
+                "Countries",
+            ]
+            assert option_list.option_count == 7
+            assert option_list.highlighted_option.id == "Mock_Country_1"
+
+            # Up skips the header, to the recent location.
+            option_list.focus()
+            await pilot.press("up", "enter")
+            assert self.app.state.selected_location == "Mock_Country_3"
+            await pilot.click("#button-connect")
+            await self.settle(pilot)
+            assert self.app.state.connected_country == "Mock_Country_3"
+
+            # The search results have no sections.
+            await pilot.press("slash", *"mock country")
+            await pilot.pause()
+            assert not [o for o in option_list.options if o.id.startswith("section:")]
@@ -0,0 +1,30 @@
+import unittest
+
+from src.benchmarks import bench_tui
+
+# The wall time and the renders are left to the benchmark runs: a loaded
+# machine paints the progress of a connect in more frames.
+COUNTS = ("cli_calls", "watchers")
+
+
+class TestScenarios(unittest.TestCase):
+    """Tests for the cost of the scripted UI scenarios against the baselines."""
+
+    def test_no_regressions(self):
+        """Every scenario stays within the thresholds of its baseline."""
+        results = bench_tui.run(repeat=1)
+        assert [r.name for r in results] == [s.name for s in bench_tui.SCENARIOS]
+        baselines = bench_tui.load_baselines()
+        assert bench_tui.regressions(results, baselines, COUNTS) == []
+
+    def test_connect_commands(self):
+        """Connecting runs one connect and one status, nothing else."""
+        (result,) = bench_tui.run(["connect"], repeat=1)
+        assert result.commands == {"connect": 1, "status": 1}
+        assert result.watchers > 0 and result.renders > 0
+
+    def test_regressions(self):
+        result = bench_tui.ScenarioResult("login", 0.1, 4, 10, 10)
+        baselines = {"login": {"wall_time": 0.1, "cli_calls": 3, "watchers": 10}}
+        found = bench_tui.regressions([result], baselines, ("cli_calls", "watchers"))
+        assert found == ["login: cli_calls 4 over 3 (baseline 3)"]
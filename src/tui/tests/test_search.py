@@ -0,0 +1,30 @@
+from textual import widgets as tw
+
+from src.tui.tests.app_case import AppTestCase
+
+
+class TestSearch(AppTestCase):
+    """Tests for the location search of the app."""
+
+    async def test_search_and_connect(self):
+        """Searching a city and submitting it connects there."""
+        self.cmds.sync.nordvpn_login()
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            await pilot.press("slash", *"mock city 2 1")
+            await self.settle(pilot)
+            option_list = self.app.query_one(tw.OptionList)
+            assert option_list.highlighted_option.id == "Mock_City_2_1"
+            assert str(option_list.highlighted_option.prompt) == (
+                "Mock_City_2_1 (Mock_Country_2)"
+            )
+            assert self.cmds.calls["nordvpn_cities"] == 4
+
+            await pilot.press("enter")
+            await self.settle(pilot)
+            assert self.app.state.selected_location == "Mock_City_2_1"
+            assert self.app.state.status["City"] == "Mock_City_2_1"
+
+            await pilot.press(*["backspace"] * 13)
+            await pilot.pause()
+            assert option_list.option_count == 4
@@ -0,0 +1,93 @@
+import subprocess
+import sys
+import unittest
+
+from src.benchmarks import bench_import
+from src.nordvpn.async_nordvpn import AsyncNordvpn
+from src.nordvpn.tests.counting_mock import CountingAsyncMockNordvpnCommands
+from src.tui.app import NordvpnTUI
+
+# Latency of every mock command. The first frame must be painted before
+# any command answers.
+LATENCY = 0.2
+
+# Generous budgets for the cold import, best of 3, several times the
+# timings on a laptop, so only real regressions fail.
+IMPORT_BUDGETS = {"src.tui.app": 1.0, "src.nordvpn.cli": 0.3}
+# Loaded only when needed, never at startup.
+LAZY_MODULES = (
+    "unittest.mock",
+    "src.nordvpn.commands.mock_commands",
+    "src.tui.screens.logout_screen",
+    "src.tui.screens.quit_screen",
+    "src.tui.screens.stats_screen",
+)
+
+IMPORT_WITHOUT_SUBPROCESSES = """
+import asyncio, subprocess
+
+def fail(*args, **kwargs):
+    raise AssertionError(f"subprocess spawned at import: {args}")
+
+subprocess.run = subprocess.Popen = fail
+asyncio.create_subprocess_exec = fail
+import src.tui.app
+"""
+
+
+class TimedNordvpnTUI(NordvpnTUI):
+    """NordvpnTUI recording what was done by its first frame."""
+
+    painted = False
+    answered_at_first_paint = None
+    state_at_first_paint = None
+
+    def on_ready(self) -> None:
+        self.painted = True
+        self.answered_at_first_paint = self.nordvpn.cmds.answered
+        self.state_at_first_paint = (self.state.logged_in, self.state.connected)
+
+
+class TestStartup(unittest.IsolatedAsyncioTestCase):
+    """Tests for the startup time of the TUI."""
+
+    def test_import_runs_no_subprocess(self):
+        """Importing the app doesn't run any nordvpn command."""
+        completed = subprocess.run(
+            [sys.executable, "-c", IMPORT_WITHOUT_SUBPROCESSES],
+            capture_output=True,
+            check=False,
+        )
+        assert completed.returncode == 0, completed.stderr.decode()
+
+    def test_import_time_budget(self):
+        """The cold imports stay within budget and leave the lazy modules out."""
+        for module, budget in IMPORT_BUDGETS.items():
+            runs = [bench_import.import_times(module) for _ in range(3)]
+            best = min(times[module].cumulative for times in runs)
+            assert best < budget, f"{module} took {best:.3f}s"
+            for lazy in LAZY_MODULES:
+                assert lazy not in runs[0], f"{module} imports {lazy}"
+
+    async def test_time_to_first_paint(self):
+        """The first frame doesn't wait for the startup probes."""
+        nordvpn = AsyncNordvpn(test=True)
+        nordvpn.cmds = CountingAsyncMockNordvpnCommands(latency=LATENCY)
+        nordvpn.cmds.sync.nordvpn_login()
+        app = TimedNordvpnTUI(nordvpn=nordvpn)
+
+        async with app.run_test() as pilot:
+            while not app.painted:
+                await pilot.pause(0.01)
+            assert app.answered_at_first_paint == 0
+            assert app.state_at_first_paint == (None, None)
+
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            assert app.state.logged_in is True
+            assert app.state.connected is False
+            assert app.state.email == "mock@mail.com"
+
+        # The account, status and countries probes ran concurrently.
+        assert sum(nordvpn.cmds.calls.values()) == 3
+        assert nordvpn.cmds.max_in_flight == 3
@@ -0,0 +1,38 @@
+from src.tui.state import NordvpnState
+from src.tui.tests.app_case import AppTestCase
+from src.tui.widgets.status_header.connect_box import ConnectBox
+
+
+class TestNordvpnState(AppTestCase):
+    """Tests for the immutable state and how it reaches the widgets."""
+
+    async def test_state_is_immutable(self):
+        """The state snapshot can't be changed in place."""
+        state = NordvpnState(status={"Status": "Connected", "Country": "X"})
+        with self.assertRaises(AttributeError):
+            state.logged_in = True
+        with self.assertRaises(TypeError):
+            state.status["Country"] = "Y"
+        assert state.evolve(logged_in=True).connected_country == "X"
+
+    async def test_state_changes_are_batched(self):
+        """Changes made together reach the buttons once, and only the
+        buttons that look different are touched."""
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            box = self.app.query_one(ConnectBox)
+            show = box.show
+            shown = []
+
+            def recording_show(button_id, view):
+                changed = show(button_id, view)
+                shown.append((button_id, changed))
+                return changed
+
+            box.show = recording_show
+            self.app.state = self.app.state.evolve(logged_in=True)
+            self.app.state = self.app.state.evolve(selected_location="Mock_Country_1")
+            self.app.state = self.app.state.evolve(busy=None)
+            await pilot.pause()
+            assert shown == [("button-connect", True), ("button-disconnect", False)]
+            assert self.label("#button-connect") == "Connect to Mock_Country_1"
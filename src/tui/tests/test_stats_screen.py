@@ -0,0 +1,35 @@
+from unittest import mock
+
+from textual import widgets as tw
+
+from src.nordvpn.commands.tracing import CommandTracer
+from src.tui.screens import StatsScreen
+from src.tui.tests.app_case import AppTestCase
+
+
+class TestStatsScreen(AppTestCase):
+    """Tests for the stats screen of the commands run."""
+
+    async def test_stats_screen(self):
+        """The stats screen lists the commands run and can be toggled."""
+        tracer = CommandTracer()
+        self.cmds.tracer = tracer
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            await pilot.press("s")
+            await pilot.pause()
+            assert isinstance(self.app.screen, StatsScreen)
+            table = self.app.screen.query_one(tw.DataTable)
+            assert table.row_count == len(tracer.stats) == 3
+            assert table.get_row("status")[1] == 1
+            # An export that can't be written is reported, not fatal.
+            with mock.patch.object(
+                tracer, "export", side_effect=PermissionError("read-only")
+            ), mock.patch.object(self.app, "notify") as notify:
+                await pilot.press("x")
+                await pilot.pause()
+            assert notify.call_args.kwargs["severity"] == "error"
+            assert self.app.is_running
+            await pilot.press("s")
+            await pilot.pause()
+            assert not isinstance(self.app.screen, StatsScreen)
@@ -0,0 +1,29 @@
+from src.tui.tests.app_case import AppTestCase
+from src.tui.widgets import TransferGraph
+
+
+class TestTransferGraph(AppTestCase):
+    """Tests for the throughput sparklines."""
+
+    async def test_transfer_graph(self):
+        """The throughput sparklines show while connected."""
+        async with self.app.run_test() as pilot:
+            await self.settle(pilot)
+            graph = self.app.query_one(TransferGraph)
+            assert not graph.display
+            self.app.state = self.app.state.evolve(
+                status={
+                    "Status": "Connected",
+                    "Country": "X",
+                    "City": "Y",
+                    "IP": "1.2.3.4",
+                    "Uptime": "2 seconds",
+                },
+                received_rates=(0.0, 1024.0, 3 * 2**20),
+                sent_rates=(10.0, 20.0, 30.0),
+            )
+            await pilot.pause()
+            assert graph.display
+            assert graph.query_one("#received-graph").data == [0.0, 1024.0, 3 * 2**20]
+            assert str(graph.query_one("#received-rate").render()) == "3.0 MiB/s"
+            assert str(graph.query_one("#sent-rate").render()) == "30.0 B/s"
@@ -1,2 +1,4 @@
 from .countries_list import CountriesList
+from .status_bar import StatusBar
 from .status_header import StatusHeader
+from .transfer_graph import TransferGraph
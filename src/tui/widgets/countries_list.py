@@ -1,56 +1,387 @@
+import difflib
+from typing import Callable
+
 from textual import app as ta
+from textual import on
 from textual import reactive as tr
 from textual import widgets as tw
+from textual.message import Message
+from textual.widgets.option_list import Option, OptionDoesNotExist
+
+from src.nordvpn import log
+from src.nordvpn.search import SearchIndex
+
+from ..state import NordvpnState
+
+logger = log.get_logger(__name__)
 
-from ..nordvpn_instance import nordvpn
+# Removing an option from the middle costs about this many removals from
+# the end, and the options are set all at once when the removals cost
+# more than a REBUILD_RATIO-th of the options.
+REMOVE_COST = 10
+REBUILD_RATIO = 8
+
+# The recent locations are listed again above the countries, with their
+# ids prefixed to keep them unique, under two disabled section headers.
+RECENT_PREFIX = "recent:"
+RECENT_HEADER = "section:recent"
+COUNTRIES_HEADER = "section:countries"
+HEADER_PROMPTS = {RECENT_HEADER: "Recent", COUNTRIES_HEADER: "Countries"}
+# The cities of an expanded country are listed under it, or a disabled
+# placeholder while they load. Their ids hold the country too, a city
+# name can be in several countries.
+CITY_PREFIX = "city:"
+LOADING_PREFIX = "loading:"
+COLLAPSED = "▸ "
+EXPANDED = "▾ "
+INDENT = "    "
 
 
 class CountriesList(tw.Static):
-    """Widget for the list of countries to connect to."""
+    """Widget for the list of countries to connect to.
+
+    It renders from the app state, and the countries are given by the
+    app with `set_countries`. Until the logged in state is known, the
+    countries already given (from the catalog cache) are shown.
+
+    Typing in the search box above the list shows the best matches among
+    countries and cities instead, from the index given by `search_index`
+    (called only when searching). Submitting the search posts a
+    LocationChosen message with the highlighted match.
 
-    logged_in = tr.reactive(False)
+    Without a search, the locations given by `recent_locations` (called
+    on `refresh_recent`) are shown in a "Recent" section on top. The ids
+    of the options aren't always the locations, `location_of` gives them.
+
+    The countries expand (right) and collapse (left) to their cities like
+    a tree. The cities of a country not given yet with `set_cities` are
+    asked for with a CitiesRequested message, once, and kept.
+    """
+
+    BINDINGS = [
+        ("right", "expand", "Show cities"),
+        ("left", "collapse", "Hide cities"),
+    ]
+
+    state = tr.reactive(NordvpnState())
     countries = tr.reactive([])
-    connected_country = tr.reactive(None)
+    recent = tr.reactive([])
+    search = tr.reactive("")
+
+    class LocationChosen(Message):
+        """Posted when a search result is submitted."""
+
+        def __init__(self, location: str) -> None:
+            super().__init__()
+            self.location = location
+
+    class CitiesRequested(Message):
+        """Posted when a country is expanded before its cities are known."""
+
+        def __init__(self, country: str) -> None:
+            super().__init__()
+            self.country = country
+
+    def __init__(
+        self,
+        *args,
+        search_index: Callable[[], SearchIndex] | None = None,
+        recent_locations: Callable[[], list[str]] | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._loaded_countries: list[str] = []
+        self._search_index = search_index
+        self._recent_locations = recent_locations
+        self._cities: dict[str, list[str]] = {}
+        self._requested: set[str] = set()
+        self.expanded: set[str] = set()
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._loaded_countries)
 
     def on_mount(self) -> None:
-        self.logged_in = self.app.logged_in
+        self.state = self.app.state
 
-    def watch_logged_in(self, val):
-        if self.logged_in:
-            self.countries = nordvpn.get_countries()
-        else:
+    def set_countries(self, countries: list[str]) -> None:
+        self._loaded_countries = countries
+        if self.state.logged_in is not False:
+            self.countries = countries
+
+    def refresh_search(self) -> None:
+        """Search again, after the index changed."""
+        if self.search:
+            self._show_options()
+
+    def refresh_recent(self) -> None:
+        """Show the recent locations again, after a connection."""
+        if self._recent_locations is not None:
+            self.recent = self._recent_locations()
+
+    def set_cities(self, country: str, cities: list[str]) -> None:
+        self._cities[country] = cities
+        self._requested.discard(country)
+        if country in self.expanded:
+            self._show_options()
+
+    def expand(self, country: str) -> None:
+        if country in self.expanded or not self._is_tree():
+            return
+        self.expanded.add(country)
+        if country not in self._cities and country not in self._requested:
+            self._requested.add(country)
+            self.post_message(self.CitiesRequested(country))
+        self._toggled(country)
+
+    def collapse(self, country: str) -> None:
+        """Hide the cities of `country`, if shown, highlighting it."""
+        self._requested.discard(country)
+        if country not in self.expanded:
+            return
+        self.expanded.discard(country)
+        self._toggled(country)
+        self.highlight_country(country)
+
+    def _toggled(self, country: str) -> None:
+        if not self.is_mounted or self.search:
+            return
+        self._show_options()
+
+    def action_expand(self) -> None:
+        option = self.query_one(tw.OptionList).highlighted_option
+        if option is not None and option.id in self.countries:
+            self.expand(option.id)
+
+    def action_collapse(self) -> None:
+        option = self.query_one(tw.OptionList).highlighted_option
+        if option is None:
+            return
+        if option.id in self.expanded:
+            self.collapse(option.id)
+        elif option.id.startswith((CITY_PREFIX, LOADING_PREFIX)):
+            self.collapse(self._country_above(option.id))
+
+    def _country_above(self, option_id: str) -> str:
+        options = self.query_one(tw.OptionList).options
+        index = _index_of(self.query_one(tw.OptionList), option_id)
+        while options[index].id.startswith((CITY_PREFIX, LOADING_PREFIX)):
+            index -= 1
+        return options[index].id
+
+    @staticmethod
+    def location_of(option_id: str) -> str:
+        """The location to connect to for an option."""
+        if option_id.startswith(RECENT_PREFIX):
+            return option_id[len(RECENT_PREFIX) :]
+        if option_id.startswith(CITY_PREFIX):
+            return option_id.rpartition("/")[2]
+        return option_id
+
+    @staticmethod
+    def city_id(country: str, city: str) -> str:
+        return f"{CITY_PREFIX}{country}/{city}"
+
+    def watch_state(self, old: NordvpnState, new: NordvpnState):
+        logger.debug("watch_state %s", new)
+        if old.logged_in != new.logged_in or not self.countries:
+            self.update_logged_in(new.logged_in)
+            # The recent section depends on it too, not just the countries.
+            self._show_options()
+        if old.connected_country != new.connected_country:
+            self.update_connected_country(new.connected_country)
+
+    def update_logged_in(self, logged_in: bool | None) -> None:
+        if logged_in is None:
+            self.countries = self._loaded_countries or ["checking account..."]
+        elif not logged_in:
             self.countries = ["not logged in!"]
-        print("PRINT: ", "CountriesList", "watch_logged_in", val)
-
-    def watch_countries(self, val):
-        print("PRINT: ", "CountriesList", "watch_countries", val)
-        try:
-            for widget in self.query(tw.OptionList):  # pylint: disable=not-an-iterable
-                widget.remove()
-        except Exception as exc:
-            print("PRINT: ", "CountriesList", "watch_countries", exc)
-        self.mount(tw.OptionList(*self.countries))
-
-    def watch_connected_country(self, val):
-        print("PRINT: ", "CountriesList", "watch_connected_country", val)
-        if val is None:
-            self.query_one(tw.OptionList).disabled = False
-        else:  # connected to some country
-            for k, country in enumerate(self.countries):
-                if country == val:
-                    break
-            else:
-                # found a country
-                self.query_one(tw.OptionList).highlighted = k
-                self.disabled = True
+        else:
+            self.countries = self._loaded_countries or ["loading countries..."]
+
+    def watch_countries(self, old: list[str], new: list[str]):
+        logger.debug("watch_countries %s", len(new))
+        if old == new:
+            return
+        self._show_options()
+
+    def watch_recent(self, old: list[str], new: list[str]):
+        if old != new:
+            self._show_options()
+
+    def watch_search(self, val: str):
+        self._show_options()
+        if val:
+            self.query_one(tw.OptionList).highlighted = 0
+
+    @on(tw.Input.Changed, "#location-search")
+    def update_search(self, event: tw.Input.Changed) -> None:
+        self.search = event.value.strip()
+
+    @on(tw.Input.Submitted, "#location-search")
+    def choose_location(self, event: tw.Input.Submitted) -> None:
+        option = self.query_one(tw.OptionList).highlighted_option
+        if self.search and option is not None:
+            self.post_message(self.LocationChosen(self.location_of(option.id)))
+
+    def _show_options(self) -> None:
+        if not self.is_mounted:
+            return
+        self.sync_options(self.query_one(tw.OptionList), *self._shown())
+
+    def _shown(self) -> tuple[list[str], dict[str, str]]:
+        """Names to show, and the prompts of the ones not shown as is."""
+        if self.state.logged_in is False:
+            return self.countries, {}
+        if not self.search or self._search_index is None:
+            return self._with_recent()
+        index = self._search_index()
+        names = index.search(self.search)
+        prompts = {
+            name: f"{name} ({index.country_of[name]})"
+            for name in names
+            if name in index.country_of
+        }
+        return names, prompts
+
+    def _is_tree(self) -> bool:
+        # Not the placeholders shown until the countries are known.
+        return self.countries is self._loaded_countries and bool(self.countries)
+
+    def _with_recent(self) -> tuple[list[str], dict[str, str]]:
+        names, prompts = self._tree()
+        if not self.recent or not self.state.logged_in:
+            return names, prompts
+        recent = [RECENT_PREFIX + name for name in self.recent]
+        prompts.update(HEADER_PROMPTS)
+        prompts.update((option_id, self.location_of(option_id)) for option_id in recent)
+        return [RECENT_HEADER, *recent, COUNTRIES_HEADER, *names], prompts
+
+    def _tree(self) -> tuple[list[str], dict[str, str]]:
+        """The countries, with the cities of the expanded ones under them."""
+        if not self._is_tree():
+            return self.countries, {}
+        prompts = {country: COLLAPSED + country for country in self.countries}
+        if not self.expanded:
+            return self.countries, prompts
+        names = []
+        for country in self.countries:
+            names.append(country)
+            if country not in self.expanded:
+                continue
+            prompts[country] = EXPANDED + country
+            cities = self._cities.get(country)
+            if cities is None:
+                names.append(LOADING_PREFIX + country)
+                prompts[LOADING_PREFIX + country] = INDENT + "loading cities..."
+                continue
+            for city in cities:
+                city_id = self.city_id(country, city)
+                names.append(city_id)
+                prompts[city_id] = INDENT + city
+        return names, prompts
+
+    @staticmethod
+    def sync_options(
+        option_list: tw.OptionList,
+        names: list[str],
+        prompts: dict[str, str] | None = None,
+    ) -> None:
+        """Update the options in place to show `names`, in that order.
+
+        Only the options that changed are removed or added, the highlighted
+        option stays highlighted (if still there) and the scroll is kept.
+        The OptionList can only append, so everything after the first
+        option inserted out of place is removed and added back, and big
+        changes set all the options at once instead. The ids
+        of the options are the names, and the prompts default to them.
+        """
+        current = [option.id for option in option_list.options]
+        prompts = prompts or {}
+        if current == names:
+            _update_prompts(option_list, prompts, len(names))
+            return
+        highlighted = option_list.highlighted_option
+        scroll_y = option_list.scroll_y
+
+        opcodes = difflib.SequenceMatcher(None, current, names, autojunk=False)
+        opcodes = opcodes.get_opcodes()
+        # Old and new index of the first insertion out of place, if any.
+        cut = next(
+            ((i1, j1) for tag, i1, _, j1, _ in opcodes if tag in ("insert", "replace")),
+            (len(current), len(names)),
+        )
+        deleted = [
+            (i1, min(i2, cut[0]))
+            for tag, i1, i2, _, _ in opcodes
+            if tag == "delete" and i1 < cut[0]
+        ]
+        # Removing an option shifts the ones after it, so many removals
+        # cost more than setting all the options at once.
+        cost = len(current) - cut[0] + REMOVE_COST * sum(i2 - i1 for i1, i2 in deleted)
+        if cut[0] == 0 or cost > max(len(names), len(current)) // REBUILD_RATIO:
+            option_list.set_options(_option(name, prompts) for name in names)
+        else:
+            with option_list.app.batch_update():
+                for index in range(len(current) - 1, cut[0] - 1, -1):
+                    option_list.remove_option_at_index(index)
+                # Last first, so the indices of the others don't change.
+                for i1, i2 in reversed(deleted):
+                    for index in range(i2 - 1, i1 - 1, -1):
+                        option_list.remove_option_at_index(index)
+                option_list.add_options(
+                    _option(name, prompts) for name in names[cut[1] :]
+                )
+                _update_prompts(option_list, prompts, cut[1])
+
+        index = None if highlighted is None else _index_of(option_list, highlighted.id)
+        if index is not None:
+            option_list.highlighted = index
+        elif option_list.highlighted is None:
+            # Like a new OptionList, start at the first option.
+            option_list.action_first()
+        if scroll_y:
+            # The new virtual size is only known after the next refresh.
+            option_list.call_after_refresh(
+                option_list.scroll_to, y=scroll_y, animate=False
+            )
+
+    def update_connected_country(self, country: str | None) -> None:
+        option_list = self.query_one(tw.OptionList)
+        option_list.disabled = country is not None
+        if country is not None:
+            self.highlight_country(country)
 
     def compose(self) -> ta.ComposeResult:
-        print("PRINT: ", "CountriesList", "compose")
-        yield tw.OptionList(*self.countries)
+        logger.debug("compose")
+        yield tw.Input(placeholder="Search countries and cities", id="location-search")
+        yield tw.OptionList(*(_option(name) for name in self.countries))
 
     def highlight_country(self, name):
-        k = 0
-        for k, val in enumerate(self.countries):
-            if val == name:
-                break
-        self.query_one(tw.OptionList).highlighed = k
+        option_list = self.query_one(tw.OptionList)
+        index = _index_of(option_list, name)
+        if index is not None:
+            option_list.highlighted = index
+
+
+def _option(name: str, prompts: dict[str, str] | None = None) -> Option:
+    prompt = prompts.get(name, name) if prompts else name
+    disabled = name in HEADER_PROMPTS or name.startswith(LOADING_PREFIX)
+    return Option(prompt, id=name, disabled=disabled)
+
+
+def _update_prompts(
+    option_list: tw.OptionList, prompts: dict[str, str], count: int
+) -> None:
+    """Update the prompts of the first `count` options that changed."""
+    for index, option in enumerate(option_list.options[:count]):
+        prompt = prompts.get(option.id, option.id)
+        if option.prompt != prompt:
+            option_list.replace_option_prompt_at_index(index, prompt)
+
+
+def _index_of(option_list: tw.OptionList, option_id: str) -> int | None:
+    try:
+        return option_list.get_option_index(option_id)
+    except OptionDoesNotExist:
+        return None
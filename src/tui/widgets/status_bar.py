@@ -0,0 +1,37 @@
+from textual import reactive as tr
+from textual import widgets as tw
+
+from src.nordvpn import log
+
+from ..state import NordvpnState
+
+logger = log.get_logger(__name__)
+
+
+class StatusBar(tw.Static):
+    """Line with the live details of the connection, the progress of the
+    connect or disconnect in flight, or a warning while the daemon is
+    unavailable."""
+
+    state = tr.reactive(NordvpnState())
+
+    def watch_state(self, val: NordvpnState):
+        logger.debug("watch_state %s", val)
+        self.set_class(not val.daemon_available, "-unavailable")
+        self.update(self.describe(val))
+
+    @staticmethod
+    def describe(state: NordvpnState) -> str:
+        if not state.daemon_available:
+            return "nordvpn daemon unavailable, showing the last data known"
+        if state.busy is not None and state.progress is not None:
+            return f"{state.progress}..."
+        status = state.status
+        if status is None:
+            return "Not connected"
+        if not state.connected:
+            return f"Status: {status['Status']}"
+        return (
+            f"Connected to {status['Country']} ({status['City']})"
+            f"   IP: {status['IP']}   Uptime: {status['Uptime']}"
+        )
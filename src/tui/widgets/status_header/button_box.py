@@ -0,0 +1,45 @@
+from typing import NamedTuple
+
+from textual import reactive as tr
+from textual import widgets as tw
+
+from src.nordvpn import log
+
+from ...state import NordvpnState
+
+logger = log.get_logger(__name__)
+
+
+class ButtonView(NamedTuple):
+    """What a button shows."""
+
+    label: str
+    variant: str
+    disabled: bool
+
+
+class ButtonBox(tw.Static):
+    """Container of buttons rendered from the app state.
+
+    Subclasses compute a ButtonView per button from the state, and `show`
+    only touches a button when its view differs from the one shown, so
+    the state changes that don't concern it cost a comparison.
+    """
+
+    state = tr.reactive(NordvpnState())
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shown: dict[str, ButtonView] = {}
+
+    def show(self, button_id: str, view: ButtonView) -> bool:
+        """Show `view` on the button, returning whether it changed."""
+        if self._shown.get(button_id) == view:
+            return False
+        logger.debug("show %s %s", button_id, view)
+        button = self.query_one(f"#{button_id}", tw.Button)
+        button.label = view.label
+        button.variant = view.variant
+        button.disabled = view.disabled
+        self._shown[button_id] = view
+        return True
@@ -1,17 +1,21 @@
 from textual import app as ta
 from textual import containers as tc
-from textual import reactive as tr
 from textual import widgets as tw
 
-from ...nordvpn_instance import nordvpn
+from src.nordvpn import log
 
+from ...state import NordvpnState
+from .button_box import ButtonBox, ButtonView
 
-class ConnectBox(tw.Static):
-    """Container for the connect button."""
+logger = log.get_logger(__name__)
 
-    logged_in = tr.reactive(False)
-    connected = tr.reactive(False)
-    selected_country = tr.reactive(None)
+
+class ConnectBox(ButtonBox):
+    """Container for the connect button.
+
+    It only renders the app state it is given, the connection itself is
+    done by the app.
+    """
 
     def compose(self) -> ta.ComposeResult:
         yield tc.Vertical(
@@ -21,69 +25,39 @@ class ConnectBox(tw.Static):
             ),
         )
 
-    def watch_logged_in(self, val):
-        print("PRINT: ", "ConnectBox", "watch_logged_in", val)
-        self.update_buttons()
-
-    def watch_connected(self, val):
-        print("PRINT: ", "ConnectBox", "watch_connected", val)
-        self.update_buttons()
-
-    def watch_selected_country(self, val):
-        print("PRINT: ", "ConnectBox", "watch_selected_country", val)
+    def watch_state(self, val: NordvpnState):
+        logger.debug("watch_state %s", val)
         self.update_buttons()
 
     def update_buttons(self):
-        print(
-            "PRINT: ",
-            "ConnectBox",
-            "update_buttons",
-            self.logged_in,
-            self.connected,
-            self.selected_country,
-        )
-        self.update_button_connect()
-        self.update_button_disconnect()
-
-    def update_button_connect(self) -> None:
-        button = self.query_one("#button-connect")
-        if not self.logged_in:
-            print("######### 1 #########")
-            button.label = "Connect"
-            button.variant = "default"
-            button.disabled = True
-            return
-
-        if self.connected:
-            print("######### 2 #########")
-            button.label = f"Connected: {nordvpn.get_status()['Country']}"
-            button.variant = "success"
-            button.disabled = True
-        elif self.selected_country is not None:
-            print("######### 3 #########")
-            button.label = f"Connect to {self.selected_country}"
-            button.variant = "warning"
-            button.disabled = False
-        else:
-            print("######### 4 #########")
-            button.label = "Connect to ..."
-            button.variant = "warning"
-            button.disabled = True
-
-    def update_button_disconnect(self) -> None:
-        button = self.query_one("#button-disconnect")
-        if not self.logged_in:
-            button.variant = "default"
-            button.disabled = True
-            return
-
-        if self.connected:
-            button.variant = "warning"
-            button.disabled = False
-        else:
-            button.variant = "default"
-            button.disabled = True
+        self.show("button-connect", self.connect_view(self.state))
+        self.show("button-disconnect", self.disconnect_view(self.state))
+
+    @staticmethod
+    def connect_view(state: NordvpnState) -> ButtonView:
+        if not state.logged_in:
+            return ButtonView("Connect", "default", True)
+        if state.busy == "connect":
+            return ButtonView(
+                f"Connecting to {state.selected_location}...", "warning", True
+            )
+        if state.connected:
+            return ButtonView(f"Connected: {state.connected_country}", "success", True)
+        if state.selected_location is not None:
+            return ButtonView(f"Connect to {state.selected_location}", "warning", False)
+        return ButtonView("Connect to ...", "warning", True)
+
+    @staticmethod
+    def disconnect_view(state: NordvpnState) -> ButtonView:
+        if not state.logged_in:
+            return ButtonView("Disconnect", "default", True)
+        if state.busy == "disconnect":
+            return ButtonView("Disconnecting...", "warning", True)
+        if state.connected or state.busy == "connect":
+            # Disconnecting during a connect cancels it.
+            return ButtonView("Disconnect", "warning", False)
+        return ButtonView("Disconnect", "default", True)
 
     def on_button_pressed(self, event: tw.Button.Pressed) -> None:
         """Event handler called when a button is pressed."""
-        print("PRINT: ", "ConnectBox", "Button pressed: ", event.button)
+        logger.debug("button pressed %s", event.button)
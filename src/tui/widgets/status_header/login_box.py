@@ -1,15 +1,17 @@
 from textual import app as ta
 from textual import containers as tc
-from textual import reactive as tr
 from textual import widgets as tw
 
-from ...nordvpn_instance import nordvpn
+from src.nordvpn import log
 
+from ...state import NordvpnState
+from .button_box import ButtonBox, ButtonView
 
-class LoginBox(tw.Static):
-    """Container for the log in button."""
+logger = log.get_logger(__name__)
 
-    logged_in = tr.reactive(False)
+
+class LoginBox(ButtonBox):
+    """Container for the log in button, rendered from the app state."""
 
     def compose(self) -> ta.ComposeResult:
         yield tc.Vertical(
@@ -17,33 +19,31 @@ class LoginBox(tw.Static):
             tw.Button("Log out", id="button-logout", variant="warning"),
         )
 
-    def watch_logged_in(self, val):
-        print("PRINT: ", "LoginBox", "watch_logged_in", val)
-        self.update_button_login()
-        self.update_button_logout()
-
-    def update_button_login(self) -> None:
-        button = self.query_one("#button-login")
-        if self.logged_in:
-            button.label = f"{nordvpn.check_account()['email']}"
-            button.variant = "success"
-            button.disabled = True
-        else:
-            button.label = "Log in"
-            button.variant = "success"
-            button.disabled = False
-
-    def update_button_logout(self) -> None:
-        button = self.query_one("#button-logout")
-        if self.logged_in:
-            button.label = "Log out"
-            button.variant = "warning"
-            button.disabled = False
-        else:
-            button.label = "Logged out"
-            button.variant = "default"
-            button.disabled = True
+    def watch_state(self, val: NordvpnState):
+        logger.debug("watch_state %s", val)
+        self.show("button-login", self.login_view(val))
+        self.show("button-logout", self.logout_view(val))
+
+    @staticmethod
+    def login_view(state: NordvpnState) -> ButtonView:
+        if state.busy == "log_in":
+            return ButtonView("Logging in...", "success", True)
+        if state.logged_in is None:
+            return ButtonView("Checking account...", "default", True)
+        if state.logged_in:
+            return ButtonView(f"{state.email or '...'}", "success", True)
+        return ButtonView("Log in", "success", False)
+
+    @staticmethod
+    def logout_view(state: NordvpnState) -> ButtonView:
+        if state.busy == "log_out":
+            return ButtonView("Logging out...", "warning", True)
+        if state.logged_in:
+            return ButtonView("Log out", "warning", False)
+        if state.logged_in is None:
+            return ButtonView("Log out", "default", True)
+        return ButtonView("Logged out", "default", True)
 
     def on_button_pressed(self, event: tw.Button.Pressed) -> None:
         """Event handler called when a button is pressed."""
-        print("PRINT: ", "LoginBox", "Button pressed: ", event.button)
+        logger.debug("button pressed %s", event.button)
@@ -0,0 +1,49 @@
+from textual import app as ta
+from textual import containers as tc
+from textual import reactive as tr
+from textual import widgets as tw
+
+from src.nordvpn import log
+
+from ..state import NordvpnState
+
+logger = log.get_logger(__name__)
+
+RATE_UNITS = ("B/s", "KiB/s", "MiB/s", "GiB/s")
+
+
+def format_rate(rate: float) -> str:
+    """Bytes per second in the biggest unit below 1024, like "1.5 MiB/s"."""
+    for unit in RATE_UNITS[:-1]:
+        if abs(rate) < 1024:
+            return f"{rate:.1f} {unit}"
+        rate /= 1024
+    return f"{rate:.1f} {RATE_UNITS[-1]}"
+
+
+class TransferGraph(tw.Static):
+    """Sparklines of the download and upload throughput while connected."""
+
+    state = tr.reactive(NordvpnState())
+
+    def on_mount(self) -> None:
+        self.state = self.app.state
+
+    def watch_state(self, val: NordvpnState):
+        self.display = bool(val.connected and val.received_rates)
+        self._show("received", val.received_rates)
+        self._show("sent", val.sent_rates)
+
+    def _show(self, name: str, rates: tuple[float, ...]) -> None:
+        graph = self.query_one(f"#{name}-graph", tw.Sparkline)
+        if graph.data != list(rates):
+            graph.data = list(rates)
+            label = format_rate(rates[-1]) if rates else "-"
+            self.query_one(f"#{name}-rate", tw.Label).update(label)
+
+    def compose(self) -> ta.ComposeResult:
+        for name, arrow in (("received", "↓"), ("sent", "↑")):
+            with tc.Horizontal(classes="transfer-row"):
+                yield tw.Label(arrow, classes="transfer-arrow")
+                yield tw.Sparkline([], id=f"{name}-graph")
+                yield tw.Label("-", id=f"{name}-rate", classes="transfer-rate")